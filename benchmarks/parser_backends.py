@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Compare the HTML parser backends on the test fixtures.
+
+For every installed backend, parses each page under
+tests/fixtures/perfume_pages and runs the full extraction
+(scrape_perfume_page + extract_links). Reports pages/sec plus peak memory.
+The "bytes" rows run scrape_perfume_bytes on the encoded page instead,
+falling back to the named backend only for fields it cannot read itself
+(links are not extracted there, as in brand mode).
+Each backend runs in its own subprocess so the peak RSS figures do not leak
+into each other. The Python-heap peak from tracemalloc misses the C trees
+built by lxml and lexbor, so look at RSS for those.
+
+Usage:
+    python benchmarks/parser_backends.py [--seconds 3] [--pad-reviews 400]
+
+--pad-reviews adds that many nested review blocks to each fixture, which
+gets closer to the size of a real perfume page (~0.5 MB).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from fragrantica_scraper.html_backend import HAS_LXML, HAS_SELECTOLAX, parse_html  # noqa: E402
+from fragrantica_scraper.network import extract_links  # noqa: E402
+from fragrantica_scraper.parsing import scrape_perfume_bytes, scrape_perfume_page  # noqa: E402
+
+FIXTURES = ROOT / "tests" / "fixtures" / "perfume_pages"
+URL = "https://www.fragrantica.com/perfume/Chanel/Chance-Eau-de-Parfum-610.html"
+REVIEW = (
+    '<div class="review"><div class="flex"><div class="cell"><div class="body">'
+    '<div itemprop="reviewBody"><p>Lovely scent, lasts all day. Review {i}.</p>'
+    '<a href="/member/{i}">member {i}</a><span>5 stars</span></div></div></div></div></div>'
+)
+
+
+def load_pages(pad_reviews: int) -> list[str]:
+    padding = "".join(REVIEW.format(i=i) for i in range(pad_reviews))
+    pages = []
+    for path in sorted(FIXTURES.glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        pages.append(html.replace("</body>", padding + "</body>", 1))
+    return pages
+
+
+def run_one(backend: str, pages: list[str], seconds: float) -> dict:
+    def once(html: str) -> None:
+        if backend.startswith("bytes+"):
+            scrape_perfume_bytes(URL, html.encode("utf-8"), "utf-8", backend[len("bytes+"):])
+            return
+        doc = parse_html(html, backend)
+        scrape_perfume_page(URL, doc)
+        extract_links(URL, doc)
+
+    # Warm-up pass, then the Python heap peak for one pass over the corpus
+    for html in pages:
+        once(html)
+    tracemalloc.start()
+    for html in pages:
+        once(html)
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    done = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        for html in pages:
+            once(html)
+        done += len(pages)
+    elapsed = time.perf_counter() - started
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    return {
+        "backend": backend,
+        "pages_per_sec": done / elapsed,
+        "py_peak_mb": py_peak / (1024 * 1024),
+        "peak_rss_mb": rss_mb,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends.")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Timed run length per backend.")
+    parser.add_argument("--pad-reviews", type=int, default=400, help="Review blocks added to each page.")
+    parser.add_argument("--only", help=argparse.SUPPRESS)  # child process mode
+    args = parser.parse_args()
+
+    pages = load_pages(args.pad_reviews)
+    if args.only:
+        print(json.dumps(run_one(args.only, pages, args.seconds)))
+        return
+
+    backends = ["bs4"] + (["lxml"] if HAS_LXML else []) + (["selectolax"] if HAS_SELECTOLAX else [])
+    backends += [f"bytes+{backends[-1]}"]
+    avg_kb = sum(len(p) for p in pages) / len(pages) / 1024
+    print(f"{len(pages)} pages, {avg_kb:.0f} KB on average\n")
+    print(f"{'backend':<18}{'pages/sec':>12}{'peak RSS MB':>14}{'py heap MB':>13}")
+    for backend in backends:
+        out = subprocess.run(
+            [sys.executable, __file__, "--only", backend,
+             "--seconds", str(args.seconds), "--pad-reviews", str(args.pad_reviews)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f"{r['backend']:<18}{r['pages_per_sec']:>12.1f}{r['peak_rss_mb']:>14.1f}{r['py_peak_mb']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
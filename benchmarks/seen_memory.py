@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Memory of the free crawl's seen-set on a synthetic million-link graph.
+
+Starts a local stand-in server whose pages each link to --links random
+perfume and designer pages (absolute fragrantica.com URLs, so
+extract_links treats them like the real thing), then crawls --pages of
+them the way the free crawl does (fetch, parse_html, extract_links,
+enqueue unseen links). With the defaults that is 5,000 pages x 200 links
+= 1,000,000 discovered links.
+
+Two modes, each in its own subprocess so peak RSS does not leak between them:
+
+    set        collections.deque + set of URL strings (the old crawl())
+    frontier   Frontier: SeenSet (perfume-ID bitmap + scalable Bloom
+               filter) and a bounded in-memory window, queue on disk
+
+Reports the memory held by the seen structure itself and how much the peak
+RSS grew during the crawl (tracemalloc would slow the crawl down ~7x).
+
+Usage:
+    python benchmarks/seen_memory.py [--pages 5000] [--links 200]
+"""
+from __future__ import annotations
+
+import argparse
+import collections
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from fragrantica_scraper.frontier import Frontier  # noqa: E402
+from fragrantica_scraper.html_backend import parse_html  # noqa: E402
+from fragrantica_scraper.network import extract_links  # noqa: E402
+
+SITE = "https://www.fragrantica.com"
+PERFUME_IDS = 10_000_000
+DESIGNERS = 1_000_000
+
+
+def _page(path: str, links: int) -> bytes:
+    rng = random.Random(path)  # same page every time it is asked for
+    anchors = []
+    for _ in range(links):
+        if rng.random() < 0.8:
+            i = rng.randrange(1, PERFUME_IDS)
+            anchors.append(f'<a href="{SITE}/perfume/Brand-{i % 5000}/Perfume-{i}.html">p</a>')
+        else:
+            anchors.append(f'<a href="{SITE}/designers/Designer-{rng.randrange(DESIGNERS)}.html">d</a>')
+    return f"<html><body><h1>{path}</h1>{''.join(anchors)}</body></html>".encode()
+
+
+def serve(links: int) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            body = _page(self.path, links)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _set_bytes(seen: set) -> int:
+    return sys.getsizeof(seen) + sum(sys.getsizeof(u) for u in seen)
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_one(mode: str, pages: int, links: int) -> dict:
+    server = serve(links)
+    local = f"http://127.0.0.1:{server.server_address[1]}"
+    session = requests.Session()
+    seed = f"{SITE}/designers/Designer-0.html"
+    tmp = tempfile.TemporaryDirectory()
+
+    if mode == "set":
+        queue, seen = collections.deque([seed]), {seed}
+
+        def add(url: str) -> None:
+            if url not in seen:
+                seen.add(url)
+                queue.append(url)
+
+        pop = queue.popleft
+        seen_bytes = lambda: _set_bytes(seen)  # noqa: E731
+        seen_count = lambda: len(seen)  # noqa: E731
+    else:
+        frontier = Frontier(str(Path(tmp.name) / "frontier.sqlite3"), checkpoint_every=1000)
+        frontier.add(seed)
+        add, pop = frontier.add, frontier.pop
+        seen_bytes = frontier.seen.memory_bytes
+        seen_count = lambda: len(frontier.seen)  # noqa: E731
+
+    rss_before = _max_rss_mb()
+    discovered = 0
+    started = time.perf_counter()
+    for _ in range(pages):
+        url = pop()
+        if url is None:
+            break
+        resp = session.get(local + urlparse(url).path, timeout=10)
+        found = extract_links(url, parse_html(resp.text))
+        discovered += len(found)
+        for link in found:
+            add(link)
+        if mode == "frontier":
+            frontier.done(url)
+    elapsed = time.perf_counter() - started
+    result = {
+        "mode": mode,
+        "pages_per_sec": pages / elapsed,
+        "discovered": discovered,
+        "seen": seen_count(),
+        "seen_mb": seen_bytes() / (1024 * 1024),
+        "rss_growth_mb": _max_rss_mb() - rss_before,
+        "peak_rss_mb": _max_rss_mb(),
+    }
+    if mode == "frontier":
+        frontier.close()
+    server.shutdown()
+    tmp.cleanup()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark seen-set memory on a synthetic crawl.")
+    parser.add_argument("--pages", type=int, default=5000, help="Pages to crawl per mode.")
+    parser.add_argument("--links", type=int, default=200, help="Links on every page.")
+    parser.add_argument("--only", help=argparse.SUPPRESS)  # child process mode
+    args = parser.parse_args()
+
+    if args.only:
+        print(json.dumps(run_one(args.only, args.pages, args.links)))
+        return
+
+    print(f"{args.pages} pages x {args.links} links = {args.pages * args.links:,} links\n")
+    print(f"{'mode':<10}{'pages/sec':>11}{'unique seen':>13}{'seen MB':>10}{'RSS growth MB':>15}{'peak RSS MB':>13}")
+    for mode in ("set", "frontier"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--only", mode, "--pages", str(args.pages), "--links", str(args.links)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(
+            f"{r['mode']:<10}{r['pages_per_sec']:>11.1f}{r['seen']:>13,}{r['seen_mb']:>10.1f}"
+            f"{r['rss_growth_mb']:>15.1f}{r['peak_rss_mb']:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,25 @@ Reads each row from the CSV, visits the fragrance URL, parses the opening
 description (e.g. "is a Woody Chypre fragrance for women and men."), and
 writes the extracted data back.  Uses the same proxy rotation, session breaks,
 and retry logic as the main crawler.
+
+With --refresh every row is re-checked and rating/votes are updated. Pages are
+revalidated against the response cache (ETag / Last-Modified), so a page the
+server reports as unchanged (304) costs no body download and no parsing.
+
+Edits go to an append-only log next to the CSV (<csv>.patches.jsonl) as each
+row is processed, and are applied to the CSV in a single rewrite when the run
+ends. An interrupted run leaves the log behind; the next run applies it and
+carries on with the rows it does not list.
+
+With --async-fetch the rows are spread over the proxies, one worker per
+proxy (the same engine as the crawler's brand mode); the writer and the log
+stay single, so a row is only marked processed once its result is applied.
 """
 from __future__ import annotations
 
 import argparse
 import csv
+import datetime as dt
 import os
 import random
 import shutil
@@ -20,17 +34,34 @@ import time
 from typing import Optional
 
 import requests
-from bs4 import BeautifulSoup
 
-from fragrantica_scraper.config import DEFAULT_UAS, DEFAULT_ACCEPT_LANGS
-from fragrantica_scraper.network import build_session, polite_sleep, session_sleep
-from fragrantica_scraper.parsing import parse_category_and_sex
+from fragrantica_scraper.async_fetch import ASYNC_BACKEND, AsyncFetchEngine, FetchResult
+from fragrantica_scraper.cache import ResponseCache, build_response_cache
+from fragrantica_scraper.config import DEFAULT_CACHE_DIR, DEFAULT_UAS
+from fragrantica_scraper.html_backend import HTML_BACKEND, HTML_BACKENDS
+from fragrantica_scraper.network import RateLimiter, SessionPool, build_rate_limiter, fetch, response_latency
+from fragrantica_scraper.proxies import ProxyPool, build_proxy_pool
+from fragrantica_scraper.negative_cache import (
+    DEFAULT_NEGATIVE_CACHE,
+    ENRICH_REASONS,
+    NO_CATEGORY,
+    NOT_FOUND,
+    REFRESH_REASONS,
+    NegativeCache,
+    build_negative_cache,
+)
+from fragrantica_scraper.normalize import normalize_row
+from fragrantica_scraper.parsing import category_and_sex_from_bytes, scrape_perfume_bytes
+from fragrantica_scraper.pipeline import ParsePipeline, default_parse_workers
+from fragrantica_scraper.storage import PatchLog, apply_patches
 
 # ---------------------------------------------------------------------------
 # CSV helpers
 # ---------------------------------------------------------------------------
 
 EXPECTED_FIELDS = ["brand", "name", "rating", "votes", "url", "last_crawled", "sex", "fragrance_category"]
+# Handed to the pipeline's writer in place of a parsed page for a 304
+UNCHANGED = object()
 
 
 def _read_csv(path: str) -> list[dict]:
@@ -67,30 +98,73 @@ def _write_csv(path: str, rows: list[dict]) -> None:
         raise
 
 
-# ---------------------------------------------------------------------------
-# Proxy helpers  (mirrors crawler.py logic)
-# ---------------------------------------------------------------------------
+def _compact(csv_path: str, rows: list[dict], patch_log: PatchLog, keep_markers: Optional[dict]) -> None:
+    """Write the patched rows back to the CSV and retire the patch log.
+
+    ``keep_markers`` (URL -> fields) leaves those URLs in the log as
+    processed, for resuming; None deletes the log.
+    """
+    patch_log.close()
+    print(f"[save] Applying {patch_log.path} to {csv_path}...")
+    _write_csv(csv_path, rows)
+    if keep_markers:
+        patch_log.reset(keep_markers.keys())
+    else:
+        patch_log.discard()
+
+
+def _enrich_concurrently(
+    args: argparse.Namespace,
+    rows: list[dict],
+    to_enrich: list[int],
+    pool: ProxyPool,
+    limiter: RateLimiter,
+    cache: Optional[ResponseCache],
+    pipeline: ParsePipeline,
+    negative: Optional[NegativeCache] = None,
+) -> int:
+    """--async-fetch: fetch the rows with one polite worker per proxy.
+
+    Each proxy keeps its own pacing, rests on its own after its session and
+    retries the same way as the sequential loop (a blocked or failed URL goes
+    back to the queue for whichever proxy frees up first). Pages go through
+    ``pipeline`` to the single writer, and so do the pages that did not change
+    (304), so the rows and the patch log are only touched there, in the order
+    pages come in. Returns the rows left unchanged.
+    """
+    by_url: dict[str, list[dict]] = {}
+    for row_idx in to_enrich:
+        url = rows[row_idx].get("url", "").strip()
+        if url:
+            by_url.setdefault(url, []).append(rows[row_idx])
+        else:
+            print("[skip] No URL in row")
+
+    engine = AsyncFetchEngine(pool, user_agent=args.user_agent, timeout=args.timeout, limiter=limiter, cache=cache)
+    print(f"[async] [{ASYNC_BACKEND}] {len(by_url)} pages over {len(engine.proxies)} worker(s)")
+    done = 0
+    unchanged = 0
+
+    def on_result(result: FetchResult) -> None:
+        nonlocal done, unchanged
+        done += 1
+        prefix = f"[{done}/{len(by_url)}]"
+        if not result.ok:
+            print(f"{prefix} [skip] {result.url} ({result.error or f'Status {result.status}'})")
+            if result.status == 404 and negative is not None:
+                negative.add(result.url, NOT_FOUND)
+            return
+        for row in by_url[result.url]:
+            if args.refresh and result.not_modified:
+                unchanged += 1
+                pipeline.submit_parsed((row, result.proxy), UNCHANGED)
+            elif args.refresh:
+                pipeline.submit((row, result.proxy), result.url, result.content, result.encoding, args.html_parser)
+            else:
+                pipeline.submit((row, result.proxy), result.content, result.encoding, args.html_parser)
 
-def _load_proxies(args: argparse.Namespace) -> list[str]:
-    proxies: list[str] = []
-    if getattr(args, "proxy", None):
-        proxies.append(args.proxy.strip())
-    if getattr(args, "proxies_file", None):
-        try:
-            with open(args.proxies_file, "r", encoding="utf-8") as pf:
-                for line in pf:
-                    line = line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-                    proxies.append(line)
-            if proxies:
-                print(f"[proxy] Loaded {len(proxies)} proxy(ies) from {args.proxies_file}")
-        except FileNotFoundError:
-            if args.proxies_file != "proxies.txt":
-                print(f"[warn] Proxies file not found: {args.proxies_file}")
-        except Exception as e:
-            print(f"[warn] Could not read proxies file {args.proxies_file}: {e}")
-    return proxies
+    engine.run(by_url, on_result)
+    return unchanged
 
 
 # ---------------------------------------------------------------------------
@@ -106,20 +180,50 @@ def enrich(args: argparse.Namespace) -> int:
     rows = _read_csv(csv_path)
     print(f"[csv] Loaded {len(rows)} rows from {csv_path}")
 
+    # Edits from an earlier, unfinished run: apply them and skip those rows
+    patch_log = PatchLog(csv_path)
+    patches = patch_log.load()
+    if patches:
+        applied = apply_patches(rows, patches)
+        print(f"[resume] {len(patches)} rows already processed ({applied} with changes) in {patch_log.path}")
+    if args.compact or (patches and args.no_resume):
+        _compact(csv_path, rows, patch_log, patches if args.compact else None)
+        patches = {}
+        if args.compact:
+            return 0
+
     # Find rows that need enrichment
     to_enrich: list[int] = []
     for i, row in enumerate(rows):
+        if row.get("url", "").strip() in patches:
+            continue
         needs_category = not row.get("fragrance_category", "").strip()
         needs_sex = not row.get("sex", "").strip()
-        if needs_category or needs_sex:
+        if args.refresh or needs_category or needs_sex:
             to_enrich.append(i)
 
-    print(f"[enrich] {len(to_enrich)} rows need enrichment (out of {len(rows)} total)")
+    if args.refresh:
+        print(f"[refresh] Re-checking all {len(to_enrich)} rows")
+    else:
+        print(f"[enrich] {len(to_enrich)} rows need enrichment (out of {len(rows)} total)")
+
+    # Pages that had nothing to give on a recent visit wait for their retry-after time
+    negative = build_negative_cache(args)
+    if negative is not None:
+        reasons = REFRESH_REASONS if args.refresh else ENRICH_REASONS
+        kept = [i for i in to_enrich if not negative.skip(rows[i].get("url", "").strip(), reasons)]
+        if len(kept) < len(to_enrich):
+            print(f"[negative] Skipping {len(to_enrich) - len(kept)} rows whose page was empty on a recent visit")
+        to_enrich = kept
 
     if not to_enrich:
         print("[done] Nothing to enrich.")
+        if negative is not None:
+            negative.close()
         return 0
 
+    pending_total = len(to_enrich)
+
     # Skip rows (resume from a specific position in the work queue)
     if args.skip_rows > 0:
         skipped = min(args.skip_rows, len(to_enrich))
@@ -131,165 +235,70 @@ def enrich(args: argparse.Namespace) -> int:
         to_enrich = to_enrich[: args.max_pages]
         print(f"[limit] Processing first {len(to_enrich)} rows (--max-pages={args.max_pages})")
 
-    # Proxy setup
-    proxies = _load_proxies(args)
-    proxy_index = -1
-    proxy_failures: dict[str, int] = {}
-
-    def get_next_proxy() -> Optional[str]:
-        nonlocal proxy_index
-        if not proxies:
-            return None
-        max_attempts = len(proxies) * 2
-        attempts = 0
-        while attempts < max_attempts:
-            proxy_index = (proxy_index + 1) % len(proxies)
-            candidate = proxies[proxy_index]
-            if proxy_failures.get(candidate, 0) < 3:
-                return candidate
-            attempts += 1
-        print("[warn] All proxies have failures, resetting failure counts")
-        proxy_failures.clear()
-        proxy_index = (proxy_index + 1) % len(proxies)
-        return proxies[proxy_index]
-
-    # Build initial session
+    # Proxy setup (each proxy rests on its own after --session-size enriched rows)
+    pool = build_proxy_pool(args)
+    proxies = pool.proxies
+    limiter = build_rate_limiter(args)
+    if args.refresh and not args.cache_dir:
+        # Validators live in the response cache; without one every page is a full download
+        args.cache_dir = DEFAULT_CACHE_DIR
+    cache = build_response_cache(args)
+    if cache is not None:
+        print(f"[cache] {cache.report()}")
+
+    # Build initial session (sessions are pooled per proxy and reused on rotation)
     is_default_ua = args.user_agent == "Mozilla/5.0 (compatible; PerfumeBot/1.0; +https://example.com/botinfo)"
-    ua = random.choice(DEFAULT_UAS) if is_default_ua else args.user_agent
-    accept_lang = random.choice(DEFAULT_ACCEPT_LANGS)
-    current_proxy = get_next_proxy()
-    session = build_session(ua, args.timeout, proxy=current_proxy, accept_language=accept_lang)
-    print(f"[identity] UA={ua[:50]}... Proxy={'<none>' if not current_proxy else current_proxy}")
+    sessions = SessionPool(args.timeout)
 
-    enriched_count = 0
-    enriched_since_break = 0
-    requests_since_rotate = 0
-    save_every = 10  # flush CSV every N successful enrichments
-
-    for progress_idx, row_idx in enumerate(to_enrich, 1):
-        row = rows[row_idx]
-        url = row.get("url", "").strip()
-        if not url:
-            print(f"[{progress_idx}/{len(to_enrich)}] [skip] No URL in row")
-            continue
+    def _choose_ua() -> str:
+        return random.choice(DEFAULT_UAS) if is_default_ua else args.user_agent
 
-        print(f"[{progress_idx}/{len(to_enrich)}] Fetching: {url}")
-
-        # Proxy rotation check
-        if args.rotate_every > 0 and requests_since_rotate >= args.rotate_every:
-            print(f"[rotate] Switching proxy after {requests_since_rotate} requests")
-            current_proxy = get_next_proxy()
-            ua = random.choice(DEFAULT_UAS) if is_default_ua else args.user_agent
-            accept_lang = random.choice(DEFAULT_ACCEPT_LANGS)
-            session = build_session(ua, args.timeout, proxy=current_proxy, accept_language=accept_lang)
-            print(f"[identity] New: UA={ua[:50]}... Proxy={'<none>' if not current_proxy else current_proxy}")
-            requests_since_rotate = 0
-
-        # Delay before each request (except first)
-        if progress_idx > 1:
-            delay = random.uniform(args.delay_seconds, args.delay_seconds + 2.0)
-            print(f"[wait] {delay:.1f}s")
-            time.sleep(delay)
-
-        # Fetch with retries
-        max_retries = 3
-        success = False
-        soup = None
-
-        for attempt in range(1, max_retries + 1):
-            try:
-                resp = session.get(url, timeout=args.timeout)
-
-                if resp.status_code in (429, 403):
-                    print(f"[{resp.status_code}] Rate limited/blocked (attempt {attempt}/{max_retries})")
-                    if current_proxy:
-                        proxy_failures[current_proxy] = proxy_failures.get(current_proxy, 0) + 1
-                    if attempt < max_retries and proxies:
-                        current_proxy = get_next_proxy()
-                        ua = random.choice(DEFAULT_UAS) if is_default_ua else args.user_agent
-                        accept_lang = random.choice(DEFAULT_ACCEPT_LANGS)
-                        session = build_session(ua, args.timeout, proxy=current_proxy, accept_language=accept_lang)
-                        print(f"[identity] Rotated: Proxy={'<none>' if not current_proxy else current_proxy}")
-                        requests_since_rotate = 0
-                        wait_time = 5 * (2 ** (attempt - 1))
-                        print(f"[backoff] Waiting {wait_time}s...")
-                        time.sleep(wait_time)
-                        continue
-                    elif attempt < max_retries:
-                        wait_time = 30 * (2 ** (attempt - 1))
-                        print(f"[backoff] Waiting {wait_time}s...")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        print(f"[skip] Giving up after {max_retries} retries")
-                        break
-
-                if resp.status_code != 200:
-                    print(f"[skip] Status {resp.status_code}")
-                    break
-
-                if current_proxy and current_proxy in proxy_failures:
-                    proxy_failures[current_proxy] = max(0, proxy_failures[current_proxy] - 1)
-
-                soup = BeautifulSoup(resp.text, "lxml")
-                success = True
-                break
-
-            except requests.exceptions.ProxyError as e:
-                print(f"[error] Proxy error (attempt {attempt}/{max_retries}): {e}")
-                if current_proxy:
-                    proxy_failures[current_proxy] = proxy_failures.get(current_proxy, 0) + 1
-                if attempt < max_retries and proxies:
-                    current_proxy = get_next_proxy()
-                    ua = random.choice(DEFAULT_UAS) if is_default_ua else args.user_agent
-                    accept_lang = random.choice(DEFAULT_ACCEPT_LANGS)
-                    session = build_session(ua, args.timeout, proxy=current_proxy, accept_language=accept_lang)
-                    print(f"[identity] Rotated to: Proxy={'<none>' if not current_proxy else current_proxy}")
-                    requests_since_rotate = 0
-                    time.sleep(2 * attempt)
-                    continue
-                break
-
-            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
-                print(f"[error] Connection error (attempt {attempt}/{max_retries}): {e}")
-                if current_proxy:
-                    proxy_failures[current_proxy] = proxy_failures.get(current_proxy, 0) + 1
-                if attempt < max_retries and proxies:
-                    current_proxy = get_next_proxy()
-                    session = build_session(ua, args.timeout, proxy=current_proxy, accept_language=accept_lang)
-                    print(f"[identity] Rotated to: Proxy={'<none>' if not current_proxy else current_proxy}")
-                    requests_since_rotate = 0
-                    time.sleep(2 * attempt)
-                    continue
-                break
-
-            except Exception as e:
-                print(f"[error] Request failed (attempt {attempt}/{max_retries}): {e}")
-                if attempt < max_retries:
-                    time.sleep(5 * attempt)
-                    continue
-                break
-
-        if not success or not soup:
-            continue
-
-        requests_since_rotate += 1
-
-        # Parse category and sex
-        category, sex = parse_category_and_sex(soup)
+    enriched_count = 0
+    unchanged_count = 0
+
+    def store(job: tuple, parsed, error) -> None:
+        """Apply a parsed page to its row; runs on the pipeline's writer thread."""
+        nonlocal enriched_count
+        row, proxy = job
+        if error is not None:
+            print(f"[error] Could not parse {row.get('url', '?')}: {error}")
+            return
+        if parsed is UNCHANGED:
+            # Logged so a resumed run skips this row too
+            patch_log.append(row.get("url", "").strip(), {})
+            print(f"[unchanged] {row.get('brand', '?')} — {row.get('name', '?')} (304)")
+            return
+        if args.refresh:
+            data = parsed
+            category, sex = data["fragrance_category"] or None, data["sex"] or None
+        else:
+            category, sex = parsed
 
         # Update row
-        updated = False
+        changes: dict = {}
+        if args.refresh:
+            for field in ("rating", "votes"):
+                if data[field] is not None and str(data[field]) != row.get(field, ""):
+                    changes[field] = data[field]
+            if changes:
+                changes["last_crawled"] = dt.datetime.utcnow().isoformat()
         if category and not row.get("fragrance_category", "").strip():
-            row["fragrance_category"] = category
-            updated = True
+            changes["fragrance_category"] = category
         if sex and not row.get("sex", "").strip():
-            row["sex"] = sex
-            updated = True
+            changes["sex"] = sex
+        # Rows saved before ingest-time normalization are fixed as they come by
+        normalized = dict(row, **changes)
+        changes.update(normalize_row(normalized))
+        row.update(changes)
+        # Logged even when nothing changed, so a resumed run skips this row
+        patch_log.append(row.get("url", "").strip(), changes)
+        updated = bool(changes)
+        if negative is not None and not row.get("fragrance_category", "").strip():
+            negative.add(row.get("url", "").strip(), NO_CATEGORY)
 
         if updated:
             enriched_count += 1
-            enriched_since_break += 1
+            pool.record_save(proxy)
             print(f"[enriched] {row.get('brand', '?')} — {row.get('name', '?')} | category={category or '?'} sex={sex or '?'}")
         else:
             # Check what's still missing vs what the parser returned
@@ -303,34 +312,167 @@ def enrich(args: argparse.Namespace) -> int:
             else:
                 print(f"[ok] Already complete: category={row.get('fragrance_category', '')}, sex={row.get('sex', '')}")
 
-        # Periodic save
-        if enriched_count > 0 and enriched_count % save_every == 0:
-            print(f"[save] Writing CSV ({enriched_count} enriched so far)...")
-            _write_csv(csv_path, rows)
-
-        # Session break
-        if args.session_size > 0 and enriched_since_break >= args.session_size:
-            remaining = len(to_enrich) - progress_idx
-            if remaining > 0:
-                mins = int(args.session_break_seconds // 60)
-                secs = int(args.session_break_seconds % 60)
-                print(f"\n[pause] Session limit reached ({args.session_size}). "
-                      f"{remaining} remaining. Cooling down for ~{mins}m{secs}s...\n")
-                session_sleep(args.session_break_seconds, jitter_ratio=0.15)
-                enriched_since_break = 0
-                # Rotate identity
-                ua = random.choice(DEFAULT_UAS) if is_default_ua else args.user_agent
-                accept_lang = random.choice(DEFAULT_ACCEPT_LANGS)
-                current_proxy = get_next_proxy()
-                session = build_session(ua, args.timeout, proxy=current_proxy, accept_language=accept_lang)
+    workers = args.parse_workers if args.parse_workers is None or args.parse_workers >= 0 else None
+    pipeline = ParsePipeline(
+        scrape_perfume_bytes if args.refresh else category_and_sex_from_bytes, store, workers=workers
+    )
+
+    if args.async_fetch:
+        unchanged_count = _enrich_concurrently(
+            args, rows, to_enrich, pool, limiter, cache, pipeline, negative
+        )
+    else:
+        current_proxy = pool.next_proxy()
+        session, ua, accept_lang = sessions.session_for(current_proxy, _choose_ua)
+        print(f"[identity] UA={ua[:50]}... Proxy={'<none>' if not current_proxy else current_proxy}")
+        requests_since_rotate = 0
+
+        for progress_idx, row_idx in enumerate(to_enrich, 1):
+            row = rows[row_idx]
+            url = row.get("url", "").strip()
+            if not url:
+                print(f"[{progress_idx}/{len(to_enrich)}] [skip] No URL in row")
+                continue
+
+            # A resting proxy hands over to the next one; wait only when all of them rest
+            # (saves land a page or two behind the fetches, so check before each request)
+            if pool.rest_remaining(current_proxy) > 0:
+                current_proxy, wait = pool.ready(current_proxy)
+                if wait > 0:
+                    remaining = len(to_enrich) - progress_idx + 1
+                    print(f"\n[pause] Every identity is resting. {remaining} remaining. "
+                          f"Waiting ~{int(wait // 60)}m{int(wait % 60)}s...\n")
+                    time.sleep(wait)
+                session, ua, accept_lang = sessions.session_for(current_proxy, _choose_ua)
                 print(f"[identity] New session: UA={ua[:50]}... Proxy={'<none>' if not current_proxy else current_proxy}")
 
-    # Final save
-    if enriched_count > 0:
-        print(f"[save] Final CSV write ({enriched_count} enriched total)...")
-        _write_csv(csv_path, rows)
+            print(f"[{progress_idx}/{len(to_enrich)}] Fetching: {url}")
+
+            # Proxy rotation check
+            if args.rotate_every > 0 and requests_since_rotate >= args.rotate_every:
+                print(f"[rotate] Switching proxy after {requests_since_rotate} requests")
+                current_proxy = pool.next_proxy(exclude=current_proxy)
+                session, ua, accept_lang = sessions.session_for(current_proxy, _choose_ua)
+                print(f"[identity] New: UA={ua[:50]}... Proxy={'<none>' if not current_proxy else current_proxy}")
+                requests_since_rotate = 0
+
+            # Fetch with retries (pacing is handled by the rate limiter)
+            max_retries = 3
+            success = False
+            page = None
+
+            for attempt in range(1, max_retries + 1):
+                try:
+                    resp = fetch(session, url, timeout=args.timeout, limiter=limiter, identity=current_proxy, cache=cache)
+
+                    if resp.status_code in (429, 403):
+                        print(f"[{resp.status_code}] Rate limited/blocked (attempt {attempt}/{max_retries})")
+                        pool.record_block(current_proxy, resp.status_code)
+                        if attempt < max_retries and proxies:
+                            wait_time = 5 * (2 ** (attempt - 1))
+                            print(f"[backoff] Cooling down {current_proxy or '<none>'} for {wait_time}s")
+                            limiter.penalize(current_proxy, wait_time)
+                            sessions.discard(current_proxy)
+                            current_proxy = pool.next_proxy(exclude=current_proxy)
+                            session, ua, accept_lang = sessions.session_for(current_proxy, _choose_ua)
+                            print(f"[identity] Rotated: Proxy={'<none>' if not current_proxy else current_proxy}")
+                            requests_since_rotate = 0
+                            continue
+                        elif attempt < max_retries:
+                            wait_time = 30 * (2 ** (attempt - 1))
+                            print(f"[backoff] Waiting {wait_time}s...")
+                            limiter.penalize(current_proxy, wait_time)
+                            continue
+                        else:
+                            print(f"[skip] Giving up after {max_retries} retries")
+                            break
+
+                    if resp.status_code != 200:
+                        print(f"[skip] Status {resp.status_code}")
+                        if resp.status_code == 404 and negative is not None:
+                            negative.add(url, NOT_FOUND)
+                        break
+
+                    pool.record_success(current_proxy, response_latency(resp))
+
+                    if args.refresh and getattr(resp, "not_modified", False):
+                        # 304: the page has not changed since we last stored it
+                        success = True
+                        break
+
+                    page = resp
+                    success = True
+                    break
+
+                except requests.exceptions.ProxyError as e:
+                    print(f"[error] Proxy error (attempt {attempt}/{max_retries}): {e}")
+                    pool.record_failure(current_proxy)
+                    if attempt < max_retries and proxies:
+                        limiter.penalize(current_proxy, 2 * attempt)
+                        current_proxy = pool.next_proxy(exclude=current_proxy)
+                        session, ua, accept_lang = sessions.session_for(current_proxy, _choose_ua)
+                        print(f"[identity] Rotated to: Proxy={'<none>' if not current_proxy else current_proxy}")
+                        requests_since_rotate = 0
+                        continue
+                    break
+
+                except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                    print(f"[error] Connection error (attempt {attempt}/{max_retries}): {e}")
+                    pool.record_failure(current_proxy)
+                    if attempt < max_retries and proxies:
+                        limiter.penalize(current_proxy, 2 * attempt)
+                        current_proxy = pool.next_proxy(exclude=current_proxy)
+                        session, ua, accept_lang = sessions.session_for(current_proxy, _choose_ua)
+                        print(f"[identity] Rotated to: Proxy={'<none>' if not current_proxy else current_proxy}")
+                        requests_since_rotate = 0
+                        continue
+                    break
+
+                except Exception as e:
+                    print(f"[error] Request failed (attempt {attempt}/{max_retries}): {e}")
+                    if attempt < max_retries:
+                        limiter.penalize(current_proxy, 5 * attempt)
+                        continue
+                    break
+
+            if not success:
+                continue
+
+            requests_since_rotate += 1
+
+            if page is None:
+                unchanged_count += 1
+                pipeline.submit_parsed((row, current_proxy), UNCHANGED)
+                continue
+
+            # Parse category and sex (and rating/votes when refreshing) off this thread
+            if args.refresh:
+                pipeline.submit((row, current_proxy), url, page.content, page.encoding, args.html_parser)
+            else:
+                pipeline.submit((row, current_proxy), page.content, page.encoding, args.html_parser)
+
+    pipeline.close()
+    print(f"[pipeline] {pipeline.report()}")
+
+    # Apply the log to the CSV in one rewrite. If rows are still pending
+    # (--max-pages / --skip-rows), keep "processed" markers to resume from.
+    finished = len(to_enrich) == pending_total
+    if patch_log.written or patches:
+        _compact(csv_path, rows, patch_log, None if finished else patch_log.load())
 
     print(f"\n[done] Enriched {enriched_count} rows out of {len(to_enrich)} attempted")
+    if args.refresh:
+        print(f"[refresh] {unchanged_count} pages unchanged since the last visit")
+    for line in pool.report():
+        print(f"[proxy] {line}")
+    print(f"[sessions] {sessions.report()}")
+    sessions.close()
+    if cache is not None:
+        print(f"[cache] {cache.report()}")
+        cache.prune()
+    if negative is not None:
+        negative.close()
+        print(f"[negative] {negative.report()}")
     print(f"[csv] {csv_path}")
     return 0
 
@@ -354,13 +496,33 @@ def main() -> None:
     )
     parser.add_argument(
         "--skip-rows", type=int, default=0,
-        help="Skip the first N pending rows before starting (for resuming). "
-             "Matches the progress counter shown in logs, e.g. --skip-rows 6683 starts at [6684/...].",
+        help="Skip the first N pending rows before starting. Rarely needed: rows already processed "
+             "are recorded in <csv>.patches.jsonl and skipped automatically when a run is resumed.",
+    )
+    parser.add_argument(
+        "--compact", action="store_true",
+        help="Apply <csv>.patches.jsonl to the CSV now and exit (runs also do this when they finish).",
+    )
+    parser.add_argument(
+        "--no-resume", action="store_true",
+        help="Apply any leftover patch log, then start over instead of skipping rows it lists.",
     )
     parser.add_argument(
         "--delay-seconds", type=float, default=5.0,
         help="Base politeness delay between requests.",
     )
+    parser.add_argument(
+        "--rate-per-proxy", type=float, default=None,
+        help="Requests/second allowed per proxy (default: one per --delay-seconds).",
+    )
+    parser.add_argument(
+        "--global-rate", type=float, default=0.0,
+        help="Requests/second allowed across all proxies. 0 = no global cap.",
+    )
+    parser.add_argument(
+        "--burst", type=float, default=1.0,
+        help="Token-bucket capacity: requests a rested proxy may send back-to-back.",
+    )
     parser.add_argument("--timeout", type=float, default=20.0, help="HTTP timeout in seconds.")
     parser.add_argument(
         "--user-agent",
@@ -369,11 +531,11 @@ def main() -> None:
     )
     parser.add_argument(
         "--session-size", type=int, default=30,
-        help="Rows enriched before cooldown break.",
+        help="Rows a proxy enriches before it rests.",
     )
     parser.add_argument(
         "--session-break-seconds", type=float, default=900,
-        help="Cooldown duration after each session (default 900s / 15 min).",
+        help="How long a proxy rests after each session (default 900s / 15 min).",
     )
     parser.add_argument("--proxy", help="Single proxy URL.")
     parser.add_argument(
@@ -384,6 +546,49 @@ def main() -> None:
         "--rotate-every", type=int, default=30,
         help="Rotate proxy after N requests.",
     )
+    parser.add_argument(
+        "--async-fetch", action="store_true",
+        help="Fetch rows concurrently, one polite worker per proxy. Each proxy keeps its own pacing and "
+             "session rests; results still go through one writer and the patch log, so resuming works as usual.",
+    )
+    parser.add_argument(
+        "--html-parser", choices=("auto",) + HTML_BACKENDS, default="auto",
+        help=f"HTML parser backend (auto = {HTML_BACKEND}).",
+    )
+    parser.add_argument(
+        "--parse-workers", type=int, default=None,
+        help=f"Parser processes behind the fetcher (default {default_parse_workers()}; 0 = parse on the writer thread).",
+    )
+    parser.add_argument(
+        "--refresh", action="store_true",
+        help="Re-check every row and update rating/votes. Uses conditional requests, so "
+             f"unchanged pages are skipped (implies --cache-dir {DEFAULT_CACHE_DIR} unless given).",
+    )
+    parser.add_argument(
+        "--cache-dir", default=None,
+        help=f"Keep every fetched page in this compressed on-disk cache (e.g. {DEFAULT_CACHE_DIR}).",
+    )
+    parser.add_argument(
+        "--replay", action="store_true",
+        help="Offline mode: serve pages only from the cache, never touch the network.",
+    )
+    parser.add_argument(
+        "--negative-cache", default=None,
+        help="Pages that had no category (or were 404) on a recent visit, skipped until their retry-after "
+             f"time; shared with the crawler (default {DEFAULT_NEGATIVE_CACHE}).",
+    )
+    parser.add_argument(
+        "--no-negative-cache", action="store_true",
+        help="Fetch every row, whatever the negative cache says, and record nothing.",
+    )
+    parser.add_argument(
+        "--cache-max-mb", type=float, default=0.0,
+        help="Prune the cache to this size after a run. 0 = unlimited.",
+    )
+    parser.add_argument(
+        "--cache-max-age-days", type=float, default=0.0,
+        help="Drop cached pages older than this after a run. 0 = keep forever.",
+    )
 
     args = parser.parse_args()
     sys.exit(enrich(args))
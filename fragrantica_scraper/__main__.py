@@ -0,0 +1,25 @@
+"""``python -m fragrantica_scraper``.
+
+``enqueue``, ``worker`` and ``status`` are the shared-queue commands (see
+worker.py); anything else goes to the regular CLI in main.py.
+"""
+from __future__ import annotations
+
+import sys
+
+from .worker import COMMANDS, main as worker_main
+
+
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(worker_main(sys.argv[1:]))
+    try:
+        from main import main as cli_main  # main.py in the repository root
+    except ImportError:
+        print("[error] Run from the repository root, or use one of: " + ", ".join(COMMANDS), file=sys.stderr)
+        sys.exit(2)
+    cli_main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""Asyncio fetch engine: one polite worker per proxy.
+
+Brand mode knows every perfume URL up front, so instead of walking the list
+one page at a time we fan it out over the available proxies. Each proxy gets
+exactly one worker, paced by the same per-identity rate limiter as the
+sequential loop, so the rate seen from any single proxy is unchanged while
+the total throughput scales with the number of proxies.
+
+Backends, in order of preference:
+    * curl_cffi ``AsyncSession`` (same Chrome impersonation as ``build_session``)
+    * aiohttp ``ClientSession``
+    * the synchronous session from ``build_session`` run in a worker thread
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .cache import ResponseCache
+from .config import DEFAULT_ACCEPT_LANGS
+from .network import CURL_CFFI_IMPERSONATE, CURL_CFFI_UA, RateLimiter, build_session
+from .proxies import ProxyPool
+
+try:
+    from curl_cffi.requests import AsyncSession as CurlAsyncSession  # type: ignore
+    HAS_CURL_ASYNC = True
+except ImportError:
+    CurlAsyncSession = None  # type: ignore[assignment,misc]
+    HAS_CURL_ASYNC = False
+
+try:
+    import aiohttp  # type: ignore
+except ImportError:
+    aiohttp = None  # type: ignore[assignment]
+
+# Which async backend is active (for logging)
+ASYNC_BACKEND: str = (
+    "curl-cffi" if HAS_CURL_ASYNC else
+    "aiohttp" if aiohttp is not None else
+    "threads"
+)
+
+
+@dataclass
+class FetchResult:
+    """Outcome of fetching one URL through the engine."""
+
+    url: str
+    final_url: str = ""
+    status: int = 0
+    text: str = ""
+    proxy: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    latency: Optional[float] = None
+    content: bytes = b""
+    headers: Optional[Dict[str, str]] = None
+    encoding: Optional[str] = None
+    from_cache: bool = False
+    not_modified: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status == 200
+
+
+def _result_from_response(url: str, resp) -> FetchResult:
+    """FetchResult for a requests-style response (requests, curl_cffi, cache)."""
+    return FetchResult(
+        url=url,
+        final_url=str(resp.url),
+        status=resp.status_code,
+        text=resp.text,
+        content=resp.content,
+        headers=dict(resp.headers),
+        encoding=resp.encoding,
+        from_cache=getattr(resp, "from_cache", False),
+        not_modified=getattr(resp, "not_modified", False),
+    )
+
+
+class _WorkerSession:
+    """Thin async wrapper that hides the differences between backends."""
+
+    def __init__(self, proxy: Optional[str], user_agent: str, timeout: float) -> None:
+        self.proxy = proxy
+        self.timeout = timeout
+        self.accept_language = random.choice(DEFAULT_ACCEPT_LANGS)
+        self.user_agent = user_agent
+        self._session = None
+
+    async def open(self) -> None:
+        if HAS_CURL_ASYNC:
+            self._session = CurlAsyncSession(
+                impersonate=CURL_CFFI_IMPERSONATE,
+                proxies={"http": self.proxy, "https": self.proxy} if self.proxy else None,
+                headers={"User-Agent": CURL_CFFI_UA, "Accept-Language": self.accept_language},
+            )
+        elif aiohttp is not None:
+            self._session = aiohttp.ClientSession(
+                headers={"User-Agent": self.user_agent, "Accept-Language": self.accept_language},
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        else:
+            self._session = build_session(
+                self.user_agent, self.timeout, proxy=self.proxy, accept_language=self.accept_language
+            )
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        started = time.monotonic()
+        result = await self._get(url, headers or None)
+        result.latency = time.monotonic() - started
+        return result
+
+    async def _get(self, url: str, headers: Optional[Dict[str, str]]) -> FetchResult:
+        if HAS_CURL_ASYNC:
+            resp = await self._session.get(url, timeout=self.timeout, headers=headers)
+            return _result_from_response(url, resp)
+        if aiohttp is not None:
+            async with self._session.get(url, proxy=self.proxy, headers=headers) as resp:
+                content = await resp.read()
+                encoding = resp.get_encoding()
+                return FetchResult(
+                    url=url,
+                    final_url=str(resp.url),
+                    status=resp.status,
+                    text=content.decode(encoding, errors="replace"),
+                    content=content,
+                    headers=dict(resp.headers),
+                    encoding=encoding,
+                )
+        resp = await asyncio.to_thread(self._session.get, url, timeout=self.timeout, headers=headers)
+        return _result_from_response(url, resp)
+
+    async def close(self) -> None:
+        if self._session is None:
+            return
+        try:
+            if HAS_CURL_ASYNC or aiohttp is not None:
+                await self._session.close()
+            else:
+                self._session.close()
+        except Exception:
+            pass
+        self._session = None
+
+
+class AsyncFetchEngine:
+    """Fetch a list of URLs with one polite worker per proxy.
+
+    ``on_result`` is called for every URL that either succeeded or exhausted
+    its retries, in completion order, one at a time on a single hand-off
+    thread. It may block (``ParsePipeline.submit`` does while the writer is
+    behind): that holds back the worker whose result it is, while the event
+    loop, the other workers and their rate-limit timers keep going. Rests
+    are per proxy: each worker sits out ``pool.wait_time`` for its own proxy.
+
+    With a ``cache``, responses are recorded; in replay mode the network and
+    the rate limiter are skipped entirely.
+    """
+
+    def __init__(
+        self,
+        pool: ProxyPool,
+        *,
+        user_agent: str,
+        timeout: float,
+        limiter: RateLimiter,
+        max_retries: int = 3,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
+        # No proxies still means one worker, going out directly
+        self.pool = pool
+        self.proxies: List[Optional[str]] = list(pool.proxies) or [None]
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.cache = cache
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._handoff: Optional[ThreadPoolExecutor] = None
+
+    @staticmethod
+    def _call_handler(on_result: Callable[[FetchResult], None], result: FetchResult) -> None:
+        # A failing handler must not take the worker down with it, or the
+        # queue would never drain.
+        try:
+            on_result(result)
+        except Exception as e:
+            print(f"[error] Result handler failed for {result.url}: {e}")
+
+    async def _report(self, on_result: Callable[[FetchResult], None], result: FetchResult) -> None:
+        """Hand ``result`` over without blocking the loop; waits for its turn."""
+        assert self._loop is not None
+        await self._loop.run_in_executor(self._handoff, self._call_handler, on_result, result)
+
+    async def _worker(
+        self,
+        proxy: Optional[str],
+        queue: "asyncio.Queue[tuple[str, int]]",
+        on_result: Callable[[FetchResult], None],
+    ) -> None:
+        session = _WorkerSession(proxy, self.user_agent, self.timeout)
+        await session.open()
+        try:
+            while True:
+                # A proxy the pool has benched, or that is resting after its
+                # session, sits out until it may go again, leaving the queued
+                # URLs to the other workers.
+                wait = self.pool.wait_time(proxy)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                url, attempt = await queue.get()
+                try:
+                    if self.cache is not None and self.cache.replay:
+                        resp = self.cache.get(url) or self.cache.miss(url)
+                        await self._report(on_result, _result_from_response(url, resp))
+                        continue
+
+                    await self.limiter.acquire_async(proxy)
+
+                    conditional = self.cache.validators(url) if self.cache is not None else None
+                    try:
+                        result = await session.get(url, conditional)
+                    except Exception as e:
+                        self.pool.record_failure(proxy)
+                        print(f"[error] [{proxy or '<none>'}] Request failed (attempt {attempt}/{self.max_retries}): {e}")
+                        if attempt < self.max_retries:
+                            # Hand the URL to whichever worker frees up first
+                            queue.put_nowait((url, attempt + 1))
+                            self.limiter.penalize(proxy, 2 * attempt)
+                        else:
+                            failed = FetchResult(url=url, proxy=proxy, error=str(e), attempts=attempt)
+                            await self._report(on_result, failed)
+                        continue
+
+                    result.proxy = proxy
+                    result.attempts = attempt
+                    if self.cache is not None and result.status == 304:
+                        cached = self.cache.revalidate(url, result.headers)
+                        if cached is not None:
+                            latency = result.latency
+                            result = _result_from_response(url, cached)
+                            result.proxy, result.attempts, result.latency = proxy, attempt, latency
+                    elif self.cache is not None:
+                        try:
+                            self.cache.put(
+                                url,
+                                status=result.status,
+                                content=result.content,
+                                final_url=result.final_url,
+                                headers=result.headers,
+                                encoding=result.encoding,
+                            )
+                        except OSError as e:
+                            print(f"[warn] Could not cache {url}: {e}")
+                    if result.status in (429, 403):
+                        self.pool.record_block(proxy, result.status)
+                    elif result.status < 500:
+                        self.pool.record_success(proxy, result.latency)
+                    if result.status in (429, 403) and attempt < self.max_retries:
+                        wait_time = 5 * (2 ** (attempt - 1))
+                        print(f"[{result.status}] [{proxy or '<none>'}] Rate limited/blocked, requeueing "
+                              f"(attempt {attempt}/{self.max_retries}); backing off {wait_time}s")
+                        queue.put_nowait((url, attempt + 1))
+                        self.limiter.penalize(proxy, wait_time)
+                        continue
+                    await self._report(on_result, result)
+                finally:
+                    queue.task_done()
+        finally:
+            await session.close()
+
+    async def _run(self, urls: Iterable[str], on_result: Callable[[FetchResult], None]) -> None:
+        self._loop = asyncio.get_running_loop()
+        queue: "asyncio.Queue[tuple[str, int]]" = asyncio.Queue()
+        for url in urls:
+            queue.put_nowait((url, 1))
+        if queue.empty():
+            return
+        # One thread, so results reach on_result one at a time and in order
+        self._handoff = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fetch-results")
+        workers = [
+            asyncio.create_task(self._worker(proxy, queue, on_result))
+            for proxy in self.proxies
+        ]
+        try:
+            await queue.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._handoff.shutdown(wait=True)
+            self._handoff = None
+            self._loop = None
+
+    def run(self, urls: Iterable[str], on_result: Callable[[FetchResult], None]) -> None:
+        """Fetch every URL, blocking until all of them have been reported."""
+        asyncio.run(self._run(urls, on_result))
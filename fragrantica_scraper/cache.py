@@ -0,0 +1,376 @@
+"""On-disk HTTP response cache with an offline replay mode.
+
+Raw HTML used to be thrown away right after parsing, so every change to
+``parsing.py`` meant re-crawling. The cache keeps every fetched page:
+
+    <root>/entries/<ab>/<sha256(normalized url)>.json   metadata per URL
+    <root>/blobs/<cd>/<sha256(body)>.zst|.gz             compressed body
+
+Bodies are content-addressed, so identical pages share one blob. Entries
+record the final URL, status, fetch time and the response validators
+(``ETag``/``Last-Modified``). zstd is used when ``zstandard`` is installed,
+gzip otherwise; both are always readable.
+
+In replay mode ``network.fetch`` reads only from the cache and answers misses
+with a synthetic 504, the same thing HTTP's ``only-if-cached`` does. Otherwise
+cached pages are revalidated: the stored validators go out as
+``If-None-Match``/``If-Modified-Since`` and a 304 is answered from the cache
+with ``not_modified`` set, so callers can skip parsing an unchanged page.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import urlparse, urlunparse
+
+try:
+    import zstandard  # type: ignore
+    HAS_ZSTD = True
+except ImportError:
+    zstandard = None  # type: ignore[assignment]
+    HAS_ZSTD = False
+
+from .config import DEFAULT_CACHE_DIR
+from .network import normalize_url
+
+# Only statuses that describe the page itself are worth keeping; 403/429/5xx
+# say something about us or the server at that moment.
+CACHEABLE_STATUSES = (200, 404, 410)
+
+# Response headers kept alongside the body
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class CachedResponse:
+    """Just enough of ``requests.Response`` for the crawler and enricher."""
+
+    from_cache = True
+    elapsed = None
+    not_modified = False  # set when the server answered 304 to a revalidation
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        content: bytes = b"",
+        headers: Optional[Dict[str, str]] = None,
+        encoding: Optional[str] = None,
+        fetched_at: Optional[str] = None,
+    ) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = dict(headers or {})
+        self.encoding = encoding or "utf-8"
+        self.fetched_at = fetched_at
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def close(self) -> None:
+        pass
+
+
+def cache_key(url: str) -> str:
+    """Stable key for a URL: normalized (www host, no fragment, lowercased host) then hashed."""
+    norm = normalize_url(url) or url
+    u = urlparse(norm)
+    norm = urlunparse(u._replace(scheme=u.scheme.lower(), netloc=u.netloc.lower()))
+    return hashlib.sha256(norm.encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ResponseCache:
+    """Content-addressed, compressed store of fetched pages.
+
+    ``max_bytes`` and ``max_age_seconds`` (0 = unlimited) bound the cache;
+    :meth:`prune` enforces them, dropping the oldest entries first.
+    """
+
+    def __init__(
+        self,
+        root: str = DEFAULT_CACHE_DIR,
+        *,
+        max_bytes: int = 0,
+        max_age_seconds: float = 0.0,
+        replay: bool = False,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.revalidated = 0
+        os.makedirs(os.path.join(root, "entries"), exist_ok=True)
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+
+    # -- paths ---------------------------------------------------------------
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.root, "entries", key[:2], f"{key}.json")
+
+    def _blob_path(self, digest: str, codec: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], f"{digest}.{codec}")
+
+    # -- compression ---------------------------------------------------------
+
+    @staticmethod
+    def _compress(content: bytes) -> Tuple[bytes, str]:
+        if HAS_ZSTD:
+            return zstandard.ZstdCompressor(level=10).compress(content), "zst"
+        return gzip.compress(content, compresslevel=6), "gz"
+
+    @staticmethod
+    def _decompress(data: bytes, codec: str) -> bytes:
+        if codec == "zst":
+            if not HAS_ZSTD:
+                raise RuntimeError("Cache entry is zstd-compressed; install zstandard to read it")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    # -- public API ----------------------------------------------------------
+
+    def entry(self, url: str) -> Optional[dict]:
+        """Metadata for ``url`` (no body), or None when not cached."""
+        try:
+            with open(self._entry_path(cache_key(url)), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        resp = self._load(url)
+        if resp is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return resp
+
+    def _load(self, url: str) -> Optional[CachedResponse]:
+        """The cached response for ``url``, without counting a hit or miss."""
+        meta = self.entry(url)
+        if meta is None:
+            return None
+        try:
+            with open(self._blob_path(meta["blob"], meta["codec"]), "rb") as f:
+                content = self._decompress(f.read(), meta["codec"])
+        except (FileNotFoundError, OSError, KeyError):
+            return None
+        return CachedResponse(
+            meta.get("final_url") or url,
+            int(meta.get("status", 200)),
+            content,
+            headers=meta.get("headers"),
+            encoding=meta.get("encoding"),
+            fetched_at=meta.get("fetched_at"),
+        )
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Conditional request headers for a cached 200, empty when there is nothing to revalidate."""
+        meta = self.entry(url)
+        if meta is None or meta.get("status") != 200:
+            return {}
+        headers = meta.get("headers") or {}
+        conditional = {}
+        if headers.get("ETag"):
+            conditional["If-None-Match"] = headers["ETag"]
+        if headers.get("Last-Modified"):
+            conditional["If-Modified-Since"] = headers["Last-Modified"]
+        return conditional
+
+    def revalidate(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[CachedResponse]:
+        """Handle a 304 for ``url``: refresh the entry and return the cached page.
+
+        Returns None when the body is gone (e.g. pruned meanwhile). Counted
+        as ``revalidated``, not as a hit.
+        """
+        resp = self._load(url)
+        if resp is None:
+            return None
+        path = self._entry_path(cache_key(url))
+        with open(path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        # A 304 may carry updated validators
+        lowered = {k.lower(): v for k, v in (headers or {}).items()}
+        for name in ("ETag", "Last-Modified"):
+            if lowered.get(name.lower()):
+                meta.setdefault("headers", {})[name] = lowered[name.lower()]
+        meta["fetched_at"] = dt.datetime.utcnow().isoformat()
+        meta["fetched_ts"] = time.time()
+        _atomic_write(path, json.dumps(meta).encode("utf-8"))
+        self.revalidated += 1
+        resp.not_modified = True
+        return resp
+
+    def miss(self, url: str) -> CachedResponse:
+        """Synthetic response for a URL that replay mode cannot serve."""
+        return CachedResponse(url, 504, b"", headers={"X-Cache": "miss"})
+
+    def put(
+        self,
+        url: str,
+        *,
+        status: int,
+        content: bytes,
+        final_url: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        encoding: Optional[str] = None,
+    ) -> bool:
+        """Store one response. Returns False for statuses that are not cached."""
+        if status not in CACHEABLE_STATUSES:
+            return False
+        digest = hashlib.sha256(content).hexdigest()
+        codec = "zst" if HAS_ZSTD else "gz"
+        blob_path = self._blob_path(digest, codec)
+        if os.path.exists(blob_path):
+            size = os.path.getsize(blob_path)
+        else:
+            data, codec = self._compress(content)
+            _atomic_write(blob_path, data)
+            size = len(data)
+        # Header names are case-insensitive (and lowercase over HTTP/2)
+        lowered = {k.lower(): v for k, v in (headers or {}).items()}
+        kept = {}
+        for name in KEPT_HEADERS:
+            value = lowered.get(name.lower())
+            if value:
+                kept[name] = value
+        meta = {
+            "url": url,
+            "final_url": final_url or url,
+            "status": status,
+            "fetched_at": dt.datetime.utcnow().isoformat(),
+            "fetched_ts": time.time(),
+            "blob": digest,
+            "codec": codec,
+            "size": size,
+            "encoding": encoding,
+            "headers": kept,
+        }
+        _atomic_write(self._entry_path(cache_key(url)), json.dumps(meta).encode("utf-8"))
+        self.stored += 1
+        return True
+
+    def store_response(self, url: str, resp) -> bool:
+        """``put`` for a requests/curl_cffi response object."""
+        if getattr(resp, "from_cache", False):
+            return False
+        try:
+            headers = {k: v for k, v in resp.headers.items()}
+        except Exception:
+            headers = {}
+        return self.put(
+            url,
+            status=resp.status_code,
+            content=resp.content,
+            final_url=str(getattr(resp, "url", "") or url),
+            headers=headers,
+            encoding=getattr(resp, "encoding", None),
+        )
+
+    def iter_entries(self) -> Iterator[Tuple[str, dict]]:
+        """Yield (entry path, metadata) for every cached URL."""
+        base = os.path.join(self.root, "entries")
+        for dirpath, _, filenames in os.walk(base):
+            for name in filenames:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        yield path, json.load(f)
+                except (OSError, ValueError):
+                    continue
+
+    def prune(self) -> Tuple[int, int]:
+        """Enforce the age and size limits. Returns (entries removed, blob bytes freed)."""
+        if self.max_bytes <= 0 and self.max_age_seconds <= 0:
+            return 0, 0
+        entries = sorted(self.iter_entries(), key=lambda e: e[1].get("fetched_ts", 0.0))
+        now = time.time()
+        keep: list = []
+        removed = 0
+        for path, meta in entries:
+            if self.max_age_seconds > 0 and now - meta.get("fetched_ts", 0.0) > self.max_age_seconds:
+                os.unlink(path)
+                removed += 1
+            else:
+                keep.append((path, meta))
+
+        # Size limit counts each blob once, since bodies are shared
+        if self.max_bytes > 0:
+            blob_sizes: Dict[str, int] = {}
+            blob_refs: Dict[str, int] = {}
+            for _, meta in keep:
+                blob_sizes[meta["blob"]] = meta.get("size", 0)
+                blob_refs[meta["blob"]] = blob_refs.get(meta["blob"], 0) + 1
+            total = sum(blob_sizes.values())
+            oldest = 0
+            while oldest < len(keep) and total > self.max_bytes:
+                path, meta = keep[oldest]
+                oldest += 1
+                os.unlink(path)
+                removed += 1
+                blob_refs[meta["blob"]] -= 1
+                if blob_refs[meta["blob"]] == 0:
+                    total -= blob_sizes.pop(meta["blob"], 0)
+            keep = keep[oldest:]
+
+        # Drop blobs no entry points at any more
+        live = {meta["blob"] for _, meta in keep}
+        freed = 0
+        for dirpath, _, filenames in os.walk(os.path.join(self.root, "blobs")):
+            for name in filenames:
+                if name.split(".", 1)[0] not in live:
+                    path = os.path.join(dirpath, name)
+                    freed += os.path.getsize(path)
+                    os.unlink(path)
+        return removed, freed
+
+    def report(self) -> str:
+        mode = "replay" if self.replay else "record"
+        return (
+            f"{mode} mode, {self.hits} hits, {self.misses} misses, {self.stored} stored, "
+            f"{self.revalidated} not modified ({self.root})"
+        )
+
+
+def build_response_cache(args) -> Optional[ResponseCache]:
+    """Create the cache described by ``--cache-dir`` / ``--replay`` (None when disabled)."""
+    replay = bool(getattr(args, "replay", False))
+    root = getattr(args, "cache_dir", None)
+    if not root:
+        if not replay:
+            return None
+        root = DEFAULT_CACHE_DIR
+    max_mb = float(getattr(args, "cache_max_mb", 0) or 0)
+    max_days = float(getattr(args, "cache_max_age_days", 0) or 0)
+    return ResponseCache(
+        root,
+        max_bytes=int(max_mb * 1024 * 1024),
+        max_age_seconds=max_days * 86400,
+        replay=replay,
+    )
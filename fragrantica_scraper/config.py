@@ -5,6 +5,7 @@ configuration values to avoid duplication and circular imports.
 """
 from __future__ import annotations
 
+import os
 import re
 from typing import Final, List, Tuple
 
@@ -41,6 +42,14 @@ DESIGNER_LABEL_RE: Final[re.Pattern[str]] = re.compile(r"^\s*Designer\s*", re.IG
 # CSV fields
 CSV_FIELDS: Final[List[str]] = ["brand", "name", "rating", "votes", "url", "last_crawled", "sex", "fragrance_category"]
 
+# On-disk response cache (see cache.py)
+DEFAULT_CACHE_DIR: Final[str] = ".http_cache"
+
+# Brand CSVs live here (relative to the working directory)
+SAVED_DATA_DIR: Final[str] = "Saved Data"
+# Crawl state shared between runs (ID index, ...)
+STATE_DIR: Final[str] = os.path.join(SAVED_DATA_DIR, ".state")
+
 # Defaults for networking
 DEFAULT_UAS: Final[List[str]] = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
@@ -7,40 +7,49 @@ configuration are delegated to dedicated modules to improve maintainability.
 """
 from __future__ import annotations
 
-import collections
 import datetime as dt
 import os
 import random
 import re
 import sys
+import threading
 import time
 from typing import Optional
 from argparse import Namespace
 from urllib.parse import urlparse
 
 import requests
-from bs4 import BeautifulSoup
 import urllib.robotparser as robotparser
 
 from .config import (
     DOMAIN,
     PERFUME_URL_RE,
     DEFAULT_UAS,
-    DEFAULT_ACCEPT_LANGS,
 )
 from .network import (
-    build_session,
+    SessionPool,
     can_fetch,
     normalize_url,
     extract_links,
     polite_sleep,
-    session_sleep,
-    backoff_sleep,
+    backoff_delay,
+    build_rate_limiter,
+    fetch,
     HTTP_BACKEND,
     CURL_CFFI_UA,
+    RateLimiter,
+    response_latency,
 )
-from .parsing import parse_brand_name_from_url, scrape_perfume_page
-from .storage import ensure_csv_with_header, load_existing_urls, append_row
+from .async_fetch import ASYNC_BACKEND, AsyncFetchEngine, FetchResult
+from .cache import ResponseCache, build_response_cache
+from .frontier import PRIORITY_DESIGNER, PRIORITY_OTHER, PRIORITY_PERFUME, Frontier, default_frontier_path
+from .html_backend import parse_html
+from .id_index import open_id_index
+from .parsing import parse_brand_name_from_url, scrape_perfume_bytes, scrape_perfume_page
+from .pipeline import ParsePipeline
+from .negative_cache import CRAWL_REASONS, NO_RATINGS, NOT_FOUND, NegativeCache, build_negative_cache
+from .proxies import ProxyPool, build_proxy_pool
+from .storage import Store, build_store
 
 def _normalize_brand_compare(s: Optional[str]) -> Optional[str]:
     if s is None:
@@ -74,6 +83,17 @@ def _brand_to_designers_slug(brand: str) -> str:
     return s
 
 
+def _link_priority(url: str, existing_urls, designer_slug: Optional[str]) -> int:
+    """Frontier priority: unsaved perfumes, then the target designer(s), then the rest."""
+    if PERFUME_URL_RE.match(url):
+        return PRIORITY_OTHER if url in existing_urls else PRIORITY_PERFUME
+    path = urlparse(url).path
+    if path.startswith("/designers/"):
+        if designer_slug is None or path[len("/designers/"):].rsplit(".", 1)[0].casefold() == designer_slug:
+            return PRIORITY_DESIGNER
+    return PRIORITY_OTHER
+
+
 def _brand_to_perfume_slug(brand: str) -> str:
     # Convert to slug used in /perfume/<Brand>/<Name>-<id>.html
     # Remove accents first (Hermès -> Hermes)
@@ -82,35 +102,13 @@ def _brand_to_perfume_slug(brand: str) -> str:
     return "-".join(words)
 
 
-def _load_proxies(args: Namespace) -> list[str]:
-    """Load proxies from file and/or command-line argument."""
-    proxies = []
-    if getattr(args, "proxy", None):
-        proxies.append(args.proxy.strip())
-    if getattr(args, "proxies_file", None):
-        try:
-            with open(args.proxies_file, "r", encoding="utf-8") as pf:
-                for line in pf:
-                    line = line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-                    proxies.append(line)
-            if proxies:
-                print(f"[proxy] Loaded {len(proxies)} proxy(ies) from {args.proxies_file}")
-        except FileNotFoundError:
-            if args.proxies_file != "proxies.txt":  # Only warn if user explicitly specified a file
-                print(f"[warn] Proxies file not found: {args.proxies_file}")
-        except Exception as e:
-            print(f"[warn] Could not read proxies file {args.proxies_file}: {e}")
-    return proxies
-
-
 def _scrape_brand_simple(
     args: Namespace,
     brand_input: str,
     out_csv: str,
-    mirror_csv: str,
-    existing_urls: set
+    store: Store,
+    existing_urls: set,
+    negative: Optional[NegativeCache] = None,
 ) -> int:
     """
     Simplified brand scraping: fetch brand page once, extract all perfume URLs,
@@ -118,30 +116,16 @@ def _scrape_brand_simple(
     """
     print(f"[brand] Starting simplified scrape for: {brand_input}")
 
-    # Load proxies
-    proxies = _load_proxies(args)
-    proxy_index = -1
-    proxy_failures = {}  # Track failures per proxy
-
-    def get_next_proxy() -> Optional[str]:
-        nonlocal proxy_index
-        if not proxies:
-            return None
-        # Skip proxies that have failed too many times recently
-        max_attempts = len(proxies) * 2  # Avoid infinite loop
-        attempts = 0
-        while attempts < max_attempts:
-            proxy_index = (proxy_index + 1) % len(proxies)
-            candidate = proxies[proxy_index]
-            # Allow proxy if it has fewer than 3 recent failures
-            if proxy_failures.get(candidate, 0) < 3:
-                return candidate
-            attempts += 1
-        # If all proxies are bad, reset failures and try again
-        print("[warn] All proxies have failures, resetting failure counts")
-        proxy_failures.clear()
-        proxy_index = (proxy_index + 1) % len(proxies)
-        return proxies[proxy_index]
+    # Load proxies (--parallel-brands and multi-brand runs hand over one pool)
+    pool = build_proxy_pool(args)
+    proxies = pool.proxies
+    # --parallel-brands hands every brand the same limiter and cache
+    limiter = getattr(args, "shared_limiter", None) or build_rate_limiter(args)
+    sessions = SessionPool(args.timeout)
+    cache = getattr(args, "shared_cache", None) or build_response_cache(args)
+    html_parser = getattr(args, "html_parser", None)
+    if cache is not None:
+        print(f"[cache] {cache.report()}")
 
     # Build brand designer page URL
     designers_slug = _brand_to_designers_slug(brand_input)
@@ -156,11 +140,9 @@ def _scrape_brand_simple(
         return args.user_agent
 
     # Create session with realistic headers
-    ua = _choose_ua()
-    accept_lang = random.choice(DEFAULT_ACCEPT_LANGS)
-    current_proxy = get_next_proxy()
+    current_proxy = pool.next_proxy()
 
-    session = build_session(ua, args.timeout, proxy=current_proxy, accept_language=accept_lang)
+    session, ua, accept_lang = sessions.session_for(current_proxy, _choose_ua)
     print(f"[identity] [{HTTP_BACKEND}] UA={ua[:50]}... Accept-Language={accept_lang} Proxy={'<none>' if not current_proxy else current_proxy}")
 
     # Fetch brand page with retry on 403/429 (Cloudflare may need a proxy rotation)
@@ -168,27 +150,28 @@ def _scrape_brand_simple(
     resp = None
     for brand_attempt in range(1, 4):
         try:
-            r = session.get(brand_url, timeout=args.timeout)
+            r = fetch(session, brand_url, timeout=args.timeout, limiter=limiter, identity=current_proxy, cache=cache)
             if r.status_code == 200:
+                pool.record_success(current_proxy, response_latency(r))
                 resp = r
                 break
             if r.status_code in (403, 429) and brand_attempt < 3:
                 wait = 15 * brand_attempt
-                print(f"[{r.status_code}] Brand page blocked (attempt {brand_attempt}/3) — rotating proxy, waiting {wait}s")
-                if current_proxy:
-                    proxy_failures[current_proxy] = proxy_failures.get(current_proxy, 0) + 1
-                current_proxy = get_next_proxy()
-                accept_lang = random.choice(DEFAULT_ACCEPT_LANGS)
-                session = build_session(ua, args.timeout, proxy=current_proxy, accept_language=accept_lang)
+                print(f"[{r.status_code}] Brand page blocked (attempt {brand_attempt}/3) — rotating proxy, cooling it down {wait}s")
+                pool.record_block(current_proxy, r.status_code)
+                limiter.penalize(current_proxy, wait)
+                sessions.discard(current_proxy)
+                current_proxy = pool.next_proxy(exclude=current_proxy)
+                session, ua, accept_lang = sessions.session_for(current_proxy, _choose_ua)
                 print(f"[rotate] New proxy: {'<none>' if not current_proxy else current_proxy}")
-                time.sleep(wait)
             else:
                 print(f"[error] Failed to fetch brand page (status {r.status_code})")
                 return 0
         except Exception as e:
             if brand_attempt < 3:
                 print(f"[error] Brand page exception (attempt {brand_attempt}/3): {e} — retrying")
-                time.sleep(5 * brand_attempt)
+                pool.record_failure(current_proxy)
+                limiter.penalize(current_proxy, 5 * brand_attempt)
             else:
                 print(f"[error] Exception fetching brand page: {e}")
                 return 0
@@ -197,14 +180,14 @@ def _scrape_brand_simple(
         print("[error] Failed to fetch brand page after 3 attempts")
         return 0
 
-    soup = BeautifulSoup(resp.text, "lxml")
+    doc = parse_html(resp.text, html_parser)
     print(f"[ok] Brand page loaded successfully")
 
     # Verify the page actually loaded real content (not a Cloudflare challenge)
     page_text_raw = resp.text
-    all_a_tags = soup.find_all("a", href=True)
+    all_hrefs = doc.links()
     html_preview = " ".join(page_text_raw[:500].split())
-    print(f"[debug] Brand page has {len(all_a_tags)} total <a> tags, {len(page_text_raw)} bytes")
+    print(f"[debug] Brand page has {len(all_hrefs)} total <a> tags, {len(page_text_raw)} bytes")
     print(f"[debug] HTML preview: {html_preview[:300]}")
 
     # Only flag as a challenge if the page is structurally empty.
@@ -212,7 +195,7 @@ def _scrape_brand_simple(
     # these are normal English words / Cloudflare analytics snippets that appear
     # in real pages too (e.g. Fragrantica includes CF Insights JS on every page).
     # A real brand page always has many navigation + perfume <a> links.
-    is_challenge = len(page_text_raw) < 5000 or len(all_a_tags) < 5
+    is_challenge = len(page_text_raw) < 5000 or len(all_hrefs) < 5
     if is_challenge:
         print("[warn] Page looks like a Cloudflare challenge or empty — very few links/content")
         if HTTP_BACKEND != "curl-cffi":
@@ -223,11 +206,10 @@ def _scrape_brand_simple(
     # The brand slug should match the URL path for brand filtering
     expected_brand_slug = _brand_to_perfume_slug(brand_input).casefold()
 
-    def _extract_urls_from_soup(s: BeautifulSoup) -> list:
-        """Extract new perfume URLs for this brand from a soup object."""
+    def _extract_perfume_urls(hrefs: list) -> list:
+        """Extract new perfume URLs for this brand from a page's links."""
         urls = []
-        for a in s.find_all("a", href=True):
-            href = a["href"]
+        for href in hrefs:
             if href.startswith("/perfume/"):
                 href = f"https://{DOMAIN}{href}"
             if not PERFUME_URL_RE.match(href):
@@ -248,7 +230,7 @@ def _scrape_brand_simple(
     # page adds nothing new (handles brands whose page doesn't actually paginate).
     seen_in_batch: set = set()
     perfume_urls: list = []
-    for url in _extract_urls_from_soup(soup):
+    for url in _extract_perfume_urls(all_hrefs):
         if url not in seen_in_batch:
             seen_in_batch.add(url)
             perfume_urls.append(url)
@@ -259,13 +241,16 @@ def _scrape_brand_simple(
     for page_num in range(2, MAX_BRAND_PAGES + 1):
         page_url = f"{brand_url}?p={page_num}"
         try:
-            time.sleep(random.uniform(args.delay_seconds * 0.4, args.delay_seconds * 0.8))
-            page_resp = session.get(page_url, timeout=args.timeout)
+            # Listing pages are cheap to serve; charge them less of the budget
+            page_resp = fetch(
+                session, page_url, timeout=args.timeout, limiter=limiter, identity=current_proxy, cost=0.6,
+                cache=cache,
+            )
             if page_resp.status_code != 200:
                 print(f"[page {page_num}] Status {page_resp.status_code} — stopping pagination")
                 break
-            page_soup = BeautifulSoup(page_resp.text, "lxml")
-            new_on_page = [u for u in _extract_urls_from_soup(page_soup) if u not in seen_in_batch]
+            page_links = parse_html(page_resp.text, html_parser).links()
+            new_on_page = [u for u in _extract_perfume_urls(page_links) if u not in seen_in_batch]
             print(f"[page {page_num}] Found {len(new_on_page)} new perfume URLs")
             if not new_on_page:
                 # Page returned only already-known URLs — no real pagination here
@@ -280,6 +265,12 @@ def _scrape_brand_simple(
 
     perfume_urls = unique_perfume_urls
 
+    if negative is not None:
+        fresh = [u for u in perfume_urls if not negative.skip(u, CRAWL_REASONS)]
+        if len(fresh) < len(perfume_urls):
+            print(f"[negative] Skipping {len(perfume_urls) - len(fresh)} perfumes that were empty on a recent visit")
+        perfume_urls = fresh
+
     print(f"[found] {len(perfume_urls)} perfume URLs to scrape (excluding already saved)")
 
     if not perfume_urls:
@@ -291,66 +282,75 @@ def _scrape_brand_simple(
         perfume_urls = perfume_urls[:args.max_pages]
         print(f"[limit] Processing first {len(perfume_urls)} perfumes (max_pages={args.max_pages})")
 
-    # Process each perfume one by one
-    saved_count = 0
-    saved_since_break = int(getattr(args, "saved_since_break", 0) or 0)
+    if getattr(args, "async_fetch", False):
+        return _scrape_perfumes_async(
+            args, brand_input, perfume_urls, pool, limiter, cache, out_csv, store, existing_urls, negative
+        )
+
+    # Fetch one by one; parsing and saving happen behind the pipeline so the
+    # next request does not wait for them
+    saver = _BrandSaver(store, existing_urls, pool, negative)
+    pipeline = ParsePipeline(scrape_perfume_bytes, saver, workers=_parse_workers(args))
     requests_since_rotate = 0
     failed_urls = []  # Track failed URLs for retry
-    proxy_failures = {}  # Track failures per proxy to blacklist bad ones
 
     for idx, url in enumerate(perfume_urls, 1):
+        # A proxy that saved --session-size pages rests on its own; move on to
+        # the next one and only wait when every identity is resting. Saves land
+        # a page or two behind the fetches, so check before each request.
+        if pool.rest_remaining(current_proxy) > 0:
+            current_proxy, wait = pool.ready(current_proxy)
+            if wait > 0:
+                remaining = len(perfume_urls) - idx + 1
+                print(f"\n[pause] Every identity is resting. {remaining} perfumes remaining. "
+                      f"Waiting ~{int(wait // 60)}m{int(wait % 60)}s...\n")
+                store.flush()
+                time.sleep(wait)
+            session, ua, accept_lang = sessions.session_for(current_proxy, _choose_ua)
+            print(f"[identity] New session: UA={ua[:50]}... Accept-Language={accept_lang} Proxy={'<none>' if not current_proxy else current_proxy}")
+            requests_since_rotate = 0
+
         print(f"[{idx}/{len(perfume_urls)}] Fetching: {url}")
 
         # Check if we need to rotate proxy (independent of session breaks)
         if args.rotate_every > 0 and requests_since_rotate >= args.rotate_every:
             print(f"[rotate] Switching proxy after {requests_since_rotate} requests")
-            current_proxy = get_next_proxy()
-            ua = _choose_ua()
-            accept_lang = random.choice(DEFAULT_ACCEPT_LANGS)
-            session = build_session(ua, args.timeout, proxy=current_proxy, accept_language=accept_lang)
+            current_proxy = pool.next_proxy(exclude=current_proxy)
+            session, ua, accept_lang = sessions.session_for(current_proxy, _choose_ua)
             print(f"[identity] New: UA={ua[:50]}... Accept-Language={accept_lang} Proxy={'<none>' if not current_proxy else current_proxy}")
             requests_since_rotate = 0
 
-        # Delay before each request (except first)
-        if idx > 1:
-            delay = random.uniform(args.delay_seconds, args.delay_seconds + 2.0)
-            print(f"[wait] {delay:.1f}s")
-            time.sleep(delay)
-
-        # Fetch perfume page with retry logic
+        # Fetch perfume page with retry logic (pacing is handled by the rate limiter)
         max_retries = 3
         success = False
-        soup = None
+        fetched = None
 
         for attempt in range(1, max_retries + 1):
             try:
-                resp = session.get(url, timeout=args.timeout)
+                resp = fetch(session, url, timeout=args.timeout, limiter=limiter, identity=current_proxy, cache=cache)
 
                 # Handle 429 or 403: force immediate proxy rotation
                 if resp.status_code in (429, 403):
                     print(f"[{resp.status_code}] Rate limited/blocked, forcing proxy rotation (attempt {attempt}/{max_retries})")
+                    pool.record_block(current_proxy, resp.status_code)
                     if attempt < max_retries and proxies:
-                        # Mark current proxy as problematic
-                        if current_proxy:
-                            proxy_failures[current_proxy] = proxy_failures.get(current_proxy, 0) + 1
+                        # Cool the blocked proxy down (5s, 10s, 20s); the next one can be used straight away.
+                        wait_time = 5 * (2 ** (attempt - 1))
+                        print(f"[backoff] Cooling down {current_proxy or '<none>'} for {wait_time}s")
+                        limiter.penalize(current_proxy, wait_time)
+                        sessions.discard(current_proxy)
                         # Force proxy rotation
-                        current_proxy = get_next_proxy()
-                        ua = _choose_ua()
-                        accept_lang = random.choice(DEFAULT_ACCEPT_LANGS)
-                        session = build_session(ua, args.timeout, proxy=current_proxy, accept_language=accept_lang)
+                        current_proxy = pool.next_proxy(exclude=current_proxy)
+                        session, ua, accept_lang = sessions.session_for(current_proxy, _choose_ua)
                         print(f"[identity] Rotated: UA={ua[:50]}... Proxy={'<none>' if not current_proxy else current_proxy}")
                         # Reset rotation counter
                         requests_since_rotate = 0
-                        # Shorter backoff for rate limiting (5s, 10s, 20s)
-                        wait_time = 5 * (2 ** (attempt - 1))
-                        print(f"[backoff] Waiting {wait_time}s before retry...")
-                        time.sleep(wait_time)
                         continue
                     elif attempt < max_retries:
                         # No proxies available, just backoff
                         wait_time = 30 * (2 ** (attempt - 1))
                         print(f"[backoff] Waiting {wait_time}s before retry...")
-                        time.sleep(wait_time)
+                        limiter.penalize(current_proxy, wait_time)
                         continue
                     else:
                         print(f"[skip] Giving up after {max_retries} retries")
@@ -358,49 +358,45 @@ def _scrape_brand_simple(
 
                 if resp.status_code != 200:
                     print(f"[skip] Status {resp.status_code}")
+                    if resp.status_code == 404 and negative is not None:
+                        negative.add(url, NOT_FOUND)
                     break
 
                 # Success - clear proxy failure counter if using proxy
-                if current_proxy and current_proxy in proxy_failures:
-                    proxy_failures[current_proxy] = max(0, proxy_failures[current_proxy] - 1)
+                pool.record_success(current_proxy, response_latency(resp))
 
-                soup = BeautifulSoup(resp.text, "lxml")
+                fetched = resp
                 success = True
                 break
 
             except requests.exceptions.ProxyError as e:
                 # Proxy connection failed (502, tunnel errors, etc.)
                 print(f"[error] Proxy error (attempt {attempt}/{max_retries}): {e}")
-                if current_proxy:
-                    proxy_failures[current_proxy] = proxy_failures.get(current_proxy, 0) + 1
-                    print(f"[proxy] Marked {current_proxy} as problematic ({proxy_failures[current_proxy]} failures)")
+                pool.record_failure(current_proxy)
 
                 # Immediately rotate proxy on proxy errors, don't retry with same proxy
                 if attempt < max_retries and proxies:
-                    current_proxy = get_next_proxy()
-                    ua = _choose_ua()
-                    accept_lang = random.choice(DEFAULT_ACCEPT_LANGS)
-                    session = build_session(ua, args.timeout, proxy=current_proxy, accept_language=accept_lang)
+                    # Short cooldown for the failing proxy (2s, 4s, 6s)
+                    limiter.penalize(current_proxy, 2 * attempt)
+                    current_proxy = pool.next_proxy(exclude=current_proxy)
+                    session, ua, accept_lang = sessions.session_for(current_proxy, _choose_ua)
                     print(f"[identity] Rotated to: Proxy={'<none>' if not current_proxy else current_proxy}")
                     requests_since_rotate = 0
-                    # Short delay before retry (2s, 4s, 8s)
-                    time.sleep(2 * attempt)
                     continue
                 break
 
             except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
                 # Connection timeout or failure - likely proxy issue
                 print(f"[error] Connection error (attempt {attempt}/{max_retries}): {e}")
-                if current_proxy:
-                    proxy_failures[current_proxy] = proxy_failures.get(current_proxy, 0) + 1
+                pool.record_failure(current_proxy)
 
                 # Rotate proxy on connection errors
                 if attempt < max_retries and proxies:
-                    current_proxy = get_next_proxy()
-                    session = build_session(ua, args.timeout, proxy=current_proxy, accept_language=accept_lang)
+                    limiter.penalize(current_proxy, 2 * attempt)
+                    current_proxy = pool.next_proxy(exclude=current_proxy)
+                    session, ua, accept_lang = sessions.session_for(current_proxy, _choose_ua)
                     print(f"[identity] Rotated to: Proxy={'<none>' if not current_proxy else current_proxy}")
                     requests_since_rotate = 0
-                    time.sleep(2 * attempt)
                     continue
                 break
 
@@ -408,67 +404,20 @@ def _scrape_brand_simple(
                 # Other errors - less aggressive rotation
                 print(f"[error] Request failed (attempt {attempt}/{max_retries}): {e}")
                 if attempt < max_retries:
-                    time.sleep(5 * attempt)
+                    limiter.penalize(current_proxy, 5 * attempt)
                     continue
                 break
 
-        if not success or not soup:
+        if not success or fetched is None:
             failed_urls.append(url)
             continue
 
         # Increment request counter after each successful or failed request
         requests_since_rotate += 1
 
-        # Parse and save
-        data = scrape_perfume_page(url, soup)
-
-        # Check if we got redirected to a different perfume (ID mismatch)
-        if url != resp.url:
-            print(f"[redirect] {url} -> {resp.url}")
-            # Update URL to the final one after redirect
-            url = resp.url
-
-        if data["brand"] and data["name"]:
-            # Check if rating/votes are missing
-            if data["rating"] is None or data["votes"] is None:
-                print(f"[skip] {data['brand']} — {data['name']} | No ratings yet (new perfume)")
-            else:
-                row = {
-                    "brand": data["brand"],
-                    "name": data["name"],
-                    "rating": data["rating"],
-                    "votes": data["votes"],
-                    "url": url,
-                    "last_crawled": dt.datetime.utcnow().isoformat(),
-                    "sex": data.get("sex", ""),
-                    "fragrance_category": data.get("fragrance_category", ""),
-                }
-                append_row(out_csv, row)
-                append_row(mirror_csv, row)
-                existing_urls.add(url)
-                saved_count += 1
-                saved_since_break += 1
-                print(f"[saved] {data['brand']} — {data['name']} | {data['rating']} (votes: {data['votes']})")
-        else:
-            print(f"[skip] Missing brand or name fields")
-
-        # Session break after N saves
-        if args.session_size > 0 and saved_since_break >= args.session_size:
-            remaining = len(perfume_urls) - idx
-            if remaining > 0:
-                mins = int(args.session_break_seconds // 60)
-                secs = int(args.session_break_seconds % 60)
-                print(f"\n[pause] Session save limit reached ({args.session_size} fragrances).")
-                print(f"[pause] {remaining} perfumes remaining. Cooling down for ~{mins}m{secs}s...\n")
-                time.sleep(args.session_break_seconds)
-                saved_since_break = 0
-
-                # Rotate identity (including proxy)
-                ua = _choose_ua()
-                accept_lang = random.choice(DEFAULT_ACCEPT_LANGS)
-                current_proxy = get_next_proxy()
-                session = build_session(ua, args.timeout, proxy=current_proxy, accept_language=accept_lang)
-                print(f"[identity] New session: UA={ua[:50]}... Accept-Language={accept_lang} Proxy={'<none>' if not current_proxy else current_proxy}")
+        # Parse and save off this thread; a redirect to another perfume is
+        # stored under the final URL
+        pipeline.submit(("", url, fetched.url, current_proxy), url, fetched.content, fetched.encoding, html_parser)
 
     # Retry failed URLs once
     if failed_urls:
@@ -476,52 +425,209 @@ def _scrape_brand_simple(
         for retry_idx, url in enumerate(failed_urls, 1):
             print(f"[retry {retry_idx}/{len(failed_urls)}] {url}")
 
-            # Brief delay before retry
-            time.sleep(random.uniform(args.delay_seconds, args.delay_seconds + 2.0))
-
             # Try once more with fresh session/proxy
-            current_proxy = get_next_proxy()
-            ua = _choose_ua()
-            accept_lang = random.choice(DEFAULT_ACCEPT_LANGS)
-            session = build_session(ua, args.timeout, proxy=current_proxy, accept_language=accept_lang)
+            current_proxy = pool.next_proxy(exclude=current_proxy)
+            session, ua, accept_lang = sessions.session_for(current_proxy, _choose_ua)
 
             try:
-                resp = session.get(url, timeout=args.timeout)
+                resp = fetch(session, url, timeout=args.timeout, limiter=limiter, identity=current_proxy, cache=cache)
+                if resp.status_code in (403, 429):
+                    pool.record_block(current_proxy, resp.status_code)
                 if resp.status_code == 200:
-                    soup = BeautifulSoup(resp.text, "lxml")
-                    data = scrape_perfume_page(url, soup)
-
-                    if data["brand"] and data["name"] and data["rating"] is not None and data["votes"] is not None:
-                        row = {
-                            "brand": data["brand"],
-                            "name": data["name"],
-                            "rating": data["rating"],
-                            "votes": data["votes"],
-                            "url": url,
-                            "last_crawled": dt.datetime.utcnow().isoformat(),
-                            "sex": data.get("sex", ""),
-                            "fragrance_category": data.get("fragrance_category", ""),
-                        }
-                        append_row(out_csv, row)
-                        append_row(mirror_csv, row)
-                        existing_urls.add(url)
-                        saved_count += 1
-                        print(f"[saved] {data['brand']} — {data['name']} | {data['rating']} (votes: {data['votes']})")
-                    else:
-                        print(f"[skip] Missing data or no ratings")
+                    pool.record_success(current_proxy, response_latency(resp))
+                    pipeline.submit(("", url, resp.url, current_proxy), url, resp.content, resp.encoding, html_parser)
                 else:
                     print(f"[skip] Status {resp.status_code}")
             except Exception as e:
+                pool.record_failure(current_proxy)
                 print(f"[error] Retry failed: {e}")
 
-    # Store counter for multi-brand runs
-    args.saved_since_break_end = saved_since_break
+    pipeline.close()
+    print(f"[pipeline] {pipeline.report()}")
+    saved_count = saver.saved_count
 
     print(f"\n[done] Saved {saved_count} new perfumes for {brand_input}")
     if failed_urls:
         still_failed = len(failed_urls) - (saved_count - (len(perfume_urls) - len(failed_urls)))
         if still_failed > 0:
             print(f"[warn] {still_failed} URLs could not be saved after retry")
+    for line in pool.report():
+        print(f"[proxy] {line}")
+    print(f"[sessions] {sessions.report()}")
+    sessions.close()
+    _finish_cache(cache, args)
+    print(f"[csv] {out_csv}")
+    return saved_count
+
+
+def _finish_cache(cache: Optional[ResponseCache], args: Namespace) -> None:
+    if cache is None or cache is getattr(args, "shared_cache", None):
+        return  # a shared cache is reported and pruned once, by its owner
+    print(f"[cache] {cache.report()}")
+    removed, freed = cache.prune()
+    if removed or freed:
+        print(f"[cache] Pruned {removed} entries, freed {freed / 1024 / 1024:.1f} MB")
+
+
+def _make_row(data: dict, url: str) -> dict:
+    """Build a CSV row from scraped page data."""
+    return {
+        "brand": data["brand"],
+        "name": data["name"],
+        "rating": data["rating"],
+        "votes": data["votes"],
+        "url": url,
+        "last_crawled": dt.datetime.utcnow().isoformat(),
+        "sex": data.get("sex", ""),
+        "fragrance_category": data.get("fragrance_category", ""),
+    }
+
+
+class _BrandSaver:
+    """Store step of the brand-mode pipeline; only ever runs on its writer thread."""
+
+    def __init__(
+        self, store: Store, existing_urls: set, pool: ProxyPool, negative: Optional[NegativeCache] = None
+    ) -> None:
+        self.store = store
+        self.existing_urls = existing_urls
+        self.saved_count = 0
+        self.pool = pool
+        self.negative = negative
+        self.show_via = False
+        self.failed_urls: list = []
+        self.on_saved = None  # optional hook, called after every save
+        self._lock = threading.Lock()
+
+    def __call__(self, job: tuple, data: Optional[dict], error: Optional[BaseException]) -> None:
+        prefix, url, final_url, proxy = job
+        if error is not None:
+            print(f"{prefix}[error] Could not parse {url}: {error}")
+            self.failed_urls.append(url)
+            return
+        source_url = url
+        if final_url and url != final_url:
+            print(f"[redirect] {url} -> {final_url}")
+            # The listing keeps linking the old URL; remember where it goes
+            self.store.record_redirect(url, final_url)
+            url = final_url
+
+        if not (data["brand"] and data["name"]):
+            print(f"{prefix}[skip] Missing brand or name fields")
+            return
+        if data["rating"] is None or data["votes"] is None:
+            print(f"{prefix}[skip] {data['brand']} — {data['name']} | No ratings yet (new perfume)")
+            if self.negative is not None:
+                self.negative.add(url, NO_RATINGS)
+            return
+
+        # Added before the upsert: with the ID index, the ID reaches its log
+        # when the store flushes the batch holding this row (PerfumeIdIndex.log_saved)
+        self.existing_urls.add(url)
+        if source_url != url:
+            self.existing_urls.add(source_url)
+        self.store.upsert(_make_row(data, url))
+        if self.negative is not None:
+            self.negative.discard(url)
+        with self._lock:
+            self.saved_count += 1
+        # Counts toward the session of the identity that fetched the page
+        self.pool.record_save(proxy)
+        suffix = f" via {proxy or '<none>'}" if self.show_via else ""
+        print(f"{prefix}[saved] {data['brand']} — {data['name']} | {data['rating']} (votes: {data['votes']}){suffix}")
+        if self.on_saved is not None:
+            self.on_saved()
+
+
+
+def _parse_workers(args: Namespace) -> Optional[int]:
+    workers = getattr(args, "parse_workers", None)
+    return None if workers is None or workers < 0 else workers
+
+
+def _scrape_perfumes_async(
+    args: Namespace,
+    brand_input: str,
+    perfume_urls: list,
+    pool: ProxyPool,
+    limiter: RateLimiter,
+    cache: Optional[ResponseCache],
+    out_csv: str,
+    store: Store,
+    existing_urls: set,
+    negative: Optional[NegativeCache] = None,
+) -> int:
+    """Brand mode with the asyncio engine: one polite worker per proxy.
+
+    Responses are handed to a ParsePipeline: parsing runs in the parser pool
+    and saving on its single writer thread, so the CSV files and counters
+    are still only ever touched from one place.
+    """
+    engine = AsyncFetchEngine(
+        pool,
+        user_agent=args.user_agent,
+        timeout=args.timeout,
+        limiter=limiter,
+        cache=cache,
+    )
+    print(f"[async] [{ASYNC_BACKEND}] {len(perfume_urls)} perfumes over {len(engine.proxies)} worker(s)")
+
+    replaying = cache is not None and cache.replay
+    html_parser = getattr(args, "html_parser", None)
+    # A save puts the proxy that fetched it toward its session rest; its
+    # worker sits the rest out (see AsyncFetchEngine._worker), the others go on
+    saver = _BrandSaver(store, existing_urls, pool, negative)
+    saver.show_via = True
+    done = 0
+    failed_urls: list = []
+
+    pipeline = ParsePipeline(scrape_perfume_bytes, saver, workers=_parse_workers(args))
+
+    def on_result(result: FetchResult) -> None:
+        nonlocal done
+        done += 1
+        prefix = f"[{done}/{len(perfume_urls)}]"
+        if not result.ok:
+            reason = result.error or f"Status {result.status}"
+            print(f"{prefix} [skip] {result.url} ({reason})")
+            if result.status == 404 and negative is not None:
+                negative.add(result.url, NOT_FOUND)
+            else:
+                failed_urls.append(result.url)
+            return
+        # Runs on the engine's hand-off thread: while the parsers are behind
+        # this blocks only the worker whose page it is, which is the backpressure
+        pipeline.submit(
+            (f"{prefix} ", result.url, result.final_url, result.proxy),
+            result.url, result.content, result.encoding, html_parser,
+        )
+
+    engine.run(perfume_urls, on_result)
+
+    # Give the failures one more pass, single attempt each (a replay miss stays a miss)
+    pipeline.join()
+    failed_urls.extend(saver.failed_urls)
+    saver.failed_urls.clear()
+    if failed_urls and not replaying:
+        retry_urls = list(failed_urls)
+        failed_urls.clear()
+        print(f"\n[retry] {len(retry_urls)} URLs failed. Retrying once...")
+        engine.max_retries = 1
+        done = 0
+        perfume_urls = retry_urls
+        engine.run(retry_urls, on_result)
+
+    pipeline.close()
+    print(f"[pipeline] {pipeline.report()}")
+    failed_urls.extend(saver.failed_urls)
+    saved_count = saver.saved_count
+
+    print(f"\n[done] Saved {saved_count} new perfumes for {brand_input}")
+    if failed_urls:
+        print(f"[warn] {len(failed_urls)} URLs could not be saved after retry")
+    for line in pool.report():
+        print(f"[proxy] {line}")
+    _finish_cache(cache, args)
     print(f"[csv] {out_csv}")
     return saved_count
 
@@ -551,42 +657,80 @@ def crawl(args: Namespace) -> int:
         else:
             out_csv = f"{safe_name}.csv"
 
-    ensure_csv_with_header(out_csv)
     # Also mirror CSV to the Desktop data folder as requested
     mirror_dir = "/Users/jakubjborkala/Desktop/PROJEKTY/PERFUMY APLIKACJA/Data"
     mirror_csv = os.path.join(mirror_dir, os.path.basename(out_csv))
-    ensure_csv_with_header(mirror_csv)
-
-    existing_urls = load_existing_urls(out_csv)
 
-    # NEW SIMPLIFIED APPROACH: Direct brand scraping
-    if brand_input:
-        return _scrape_brand_simple(args, brand_input, out_csv, mirror_csv, existing_urls)
+    store = build_store(args, out_csv, [mirror_csv])
+    # Saved perfumes across every brand CSV, by ID (falls back to this CSV's URLs);
+    # --parallel-brands opens one for all brands and closes it itself
+    shared_index = getattr(args, "shared_id_index", None)
+    if shared_index is not None:
+        index = shared_index
+    else:
+        index = None if getattr(args, "no_id_index", False) else open_id_index(
+            getattr(args, "id_index", None), out_csv, aliases=store.aliases
+        )
+    if index is not None:
+        # An ID is only logged as saved once the store has flushed its row
+        store.on_flush = index.log_saved
+    # Pages that were empty on a recent visit (no ratings, 404, ...) are not fetched again yet
+    negative = build_negative_cache(args)
+    try:
+        existing_urls = index if index is not None else store.urls()
+
+        # NEW SIMPLIFIED APPROACH: Direct brand scraping
+        if brand_input:
+            return _scrape_brand_simple(args, brand_input, out_csv, store, existing_urls, negative)
+        frontier = Frontier(
+            getattr(args, "frontier", None) or default_frontier_path(out_csv),
+            fresh=getattr(args, "fresh_frontier", False),
+        )
+        try:
+            return _crawl_links(args, brand_input, brand_filter_cmp, out_csv, store, existing_urls, frontier, negative)
+        finally:
+            # Also on Ctrl-C: the page in flight is queued again next run
+            frontier.close()
+            print(f"[frontier] {frontier.report()}")
+    finally:
+        store.close()
+        print(f"[store] {store.report()}")
+        if negative is not None:
+            negative.close()
+            print(f"[negative] {negative.report()}")
+        if index is not None:
+            # Everything in the CSV went through index.add (or was read at startup)
+            index.mark_current([out_csv])
+            if index is not shared_index:
+                index.close()
+                print(f"[index] {index.added} new perfume IDs, {len(index)} total")
+
+
+def _crawl_links(
+    args: Namespace,
+    brand_input: str,
+    brand_filter_cmp: Optional[str],
+    out_csv: str,
+    store: Store,
+    existing_urls: set,
+    frontier: Frontier,
+    negative: Optional[NegativeCache] = None,
+) -> int:
+    """Free crawl: follow links from the seed URLs, saving perfume pages.
 
+    The queue lives in ``frontier``; a run that finds it unfinished continues
+    from there instead of from the seeds.
+    """
     # Build proxy list
-    proxies = _load_proxies(args)
-    proxy_index = -1
-    proxy_failures = {}  # Track failures per proxy
-
-    def get_next_proxy() -> Optional[str]:
-        nonlocal proxy_index
-        if not proxies:
-            return None
-        # Skip proxies that have failed too many times recently
-        max_attempts = len(proxies) * 2  # Avoid infinite loop
-        attempts = 0
-        while attempts < max_attempts:
-            proxy_index = (proxy_index + 1) % len(proxies)
-            candidate = proxies[proxy_index]
-            # Allow proxy if it has fewer than 3 recent failures
-            if proxy_failures.get(candidate, 0) < 3:
-                return candidate
-            attempts += 1
-        # If all proxies are bad, reset failures and try again
-        print("[warn] All proxies have failures, resetting failure counts")
-        proxy_failures.clear()
-        proxy_index = (proxy_index + 1) % len(proxies)
-        return proxies[proxy_index]
+    pool = build_proxy_pool(args)
+    proxies = pool.proxies
+    limiter = build_rate_limiter(args)
+    sessions = SessionPool(args.timeout)
+    cache = build_response_cache(args)
+    replaying = cache is not None and cache.replay
+    html_parser = getattr(args, "html_parser", None)
+    if cache is not None:
+        print(f"[cache] {cache.report()}")
 
     # Current identity state
     current_accept_language = None
@@ -595,18 +739,19 @@ def crawl(args: Namespace) -> int:
 
     session = None
 
+    def _choose_ua() -> str:
+        # If user used placeholder default, rotate; else keep provided UA
+        if args.user_agent == "Mozilla/5.0 (compatible; PerfumeBot/1.0; +https://example.com/botinfo)":
+            return random.choice(DEFAULT_UAS)
+        return args.user_agent
+
     def rotate_identity(per_session: bool = False):
         nonlocal session, ua, current_accept_language, current_proxy
         # Advance proxy if any
-        current_proxy = get_next_proxy()
-        # Choose UA: if user used placeholder default, rotate; else keep provided UA
-        if args.user_agent == "Mozilla/5.0 (compatible; PerfumeBot/1.0; +https://example.com/botinfo)":
-            ua = random.choice(DEFAULT_UAS)
-        else:
-            ua = args.user_agent
-        # Rotate Accept-Language from a small pool
-        current_accept_language = random.choice(DEFAULT_ACCEPT_LANGS)
-        session = build_session(ua, args.timeout, proxy=current_proxy, accept_language=current_accept_language)
+        current_proxy = pool.next_proxy(exclude=current_proxy)
+        # Each proxy keeps its UA/Accept-Language and pooled session, so coming
+        # back to it reuses the warm connection instead of a new handshake.
+        session, ua, current_accept_language = sessions.session_for(current_proxy, _choose_ua)
         if per_session:
             print("[identity] New session identity:",
                   f"proxy={'<none>' if not current_proxy else current_proxy}",
@@ -623,7 +768,7 @@ def crawl(args: Namespace) -> int:
         # Create a temporary session just for robots.txt fetch
         temp_session = requests.Session()
         temp_session.headers.update({"User-Agent": args.user_agent})
-        robots_resp = temp_session.get(robots_url, timeout=10.0)
+        robots_resp = fetch(temp_session, robots_url, timeout=10.0, limiter=limiter, cache=cache)
         if robots_resp.status_code == 200:
             # Parse the robots.txt content
             rp.parse(robots_resp.text.splitlines())
@@ -632,10 +777,12 @@ def crawl(args: Namespace) -> int:
     except Exception as e:
         print(f"[warn] Could not read robots.txt ({e}); proceeding with caution.", file=sys.stderr)
 
-    queue = collections.deque()
-    seen = set()
+    designer_slug = _brand_to_designers_slug(brand_input).casefold() if brand_filter_cmp else None
 
-    # Seed URLs
+    if frontier.resumed:
+        print(f"[frontier] Resuming: {frontier.resumed} URLs still queued from the last run")
+
+    # Seed URLs (already-seen ones are ignored by the frontier)
     seeds = list(args.start_url or [])
     if not seeds and brand_filter_cmp:
         designers_slug = _brand_to_designers_slug(brand_input)
@@ -648,10 +795,9 @@ def crawl(args: Namespace) -> int:
         if urlparse(su).netloc != DOMAIN:
             print(f"[skip] Out-of-domain seed: {su}")
             continue
-        queue.append(su)
-        seen.add(su)
+        frontier.add(su, _link_priority(su, existing_urls, designer_slug))
 
-    if not queue:
+    if not frontier:
         print("[error] No seed URL provided and brand not specified; nothing to crawl.", file=sys.stderr)
         sys.exit(2)
 
@@ -659,29 +805,31 @@ def crawl(args: Namespace) -> int:
     rotate_identity(per_session=True)
 
     # Small initial delay to simulate natural browsing
-    polite_sleep(1.0, 3.0)
+    if not replaying:
+        polite_sleep(1.0, 3.0)
 
     pages_processed = 0
     requests_since_rotate = 0  # Track requests for proxy rotation (independent of session breaks)
 
-    # Carry "saved since last long break" across crawl() invocations (e.g., multi-brand mode).
-    # This lets the cooldown happen exactly when the global save counter reaches session_size,
-    # even if it happens mid-way through the next brand.
-    saved_since_break = int(getattr(args, "saved_since_break", 0) or 0)
-
     # Precompute expected brand slug for URL filtering
     expected_brand_slug = _brand_to_perfume_slug(brand_input).casefold() if brand_filter_cmp else None
 
-    while queue and (args.max_pages <= 0 or pages_processed < args.max_pages):
-        url = queue.popleft()
+    while frontier and (args.max_pages <= 0 or pages_processed < args.max_pages):
+        url = popped = frontier.pop()
 
         if not can_fetch(rp, ua, url):
             print(f"[robots] Disallowed: {url}")
+            frontier.done(popped)
             continue
 
         # Skip URLs already saved in the CSV if they look like perfume pages
         if PERFUME_URL_RE.match(url) and url in existing_urls:
             # Already saved from a previous run
+            frontier.done(popped)
+            continue
+        # ...and those that had nothing to save on a recent visit
+        if negative is not None and negative.skip(url, CRAWL_REASONS):
+            frontier.done(popped)
             continue
 
         # Check if we need to rotate proxy (independent of session breaks)
@@ -695,7 +843,7 @@ def crawl(args: Namespace) -> int:
         RETRY_STATUSES = {500, 502, 503, 504}
         attempt = 1
         success = False
-        soup = None
+        doc = None
         while True:
             try:
                 # Add referer header for more realistic requests
@@ -710,20 +858,30 @@ def crawl(args: Namespace) -> int:
                     headers["Referer"] = f"https://{DOMAIN}/"
                     headers["Sec-Fetch-Site"] = "same-origin"
 
-                resp = session.get(url, timeout=args.timeout, headers=headers, allow_redirects=True)
+                # Designer pages are heavy (many links); charge them more so the
+                # next request on this identity waits ~1.75x the usual delay.
+                resp = fetch(
+                    session,
+                    url,
+                    timeout=args.timeout,
+                    limiter=limiter,
+                    identity=current_proxy,
+                    cost=1.75 if url.startswith(f"https://{DOMAIN}/designers/") else 1.0,
+                    cache=cache,
+                    headers=headers,
+                    allow_redirects=True,
+                )
             except requests.exceptions.ProxyError as e:
                 # Proxy connection failed (502, tunnel errors, etc.)
                 print(f"[error] Proxy error (attempt {attempt}/{MAX_RETRIES}): {e}")
-                if current_proxy:
-                    proxy_failures[current_proxy] = proxy_failures.get(current_proxy, 0) + 1
-                    print(f"[proxy] Marked {current_proxy} as problematic ({proxy_failures[current_proxy]} failures)")
+                pool.record_failure(current_proxy)
 
                 # Immediately rotate proxy on proxy errors
                 if attempt < MAX_RETRIES and proxies:
+                    # Short cooldown for the failing proxy (2s, 4s, 6s)
+                    limiter.penalize(current_proxy, 2 * attempt)
                     rotate_identity()
                     requests_since_rotate = 0
-                    # Short delay before retry (2s, 4s, 8s)
-                    time.sleep(2 * attempt)
                     attempt += 1
                     continue
                 print(f"[error] Request failed (give up): {url} ({e})")
@@ -732,14 +890,13 @@ def crawl(args: Namespace) -> int:
             except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
                 # Connection timeout or failure - likely proxy issue
                 print(f"[error] Connection error (attempt {attempt}/{MAX_RETRIES}): {e}")
-                if current_proxy:
-                    proxy_failures[current_proxy] = proxy_failures.get(current_proxy, 0) + 1
+                pool.record_failure(current_proxy)
 
                 # Rotate proxy on connection errors
                 if attempt < MAX_RETRIES and proxies:
+                    limiter.penalize(current_proxy, 2 * attempt)
                     rotate_identity()
                     requests_since_rotate = 0
-                    time.sleep(2 * attempt)
                     attempt += 1
                     continue
                 print(f"[error] Request failed (give up): {url} ({e})")
@@ -751,7 +908,7 @@ def crawl(args: Namespace) -> int:
                     print(f"[error] Request failed (give up): {url} ({e})")
                     break
                 print(f"[warn] Request exception, retrying {attempt}/{MAX_RETRIES}: {url} ({e})")
-                backoff_sleep(resp=None, base_delay=args.delay_seconds, attempt=attempt)
+                limiter.penalize(current_proxy, backoff_delay(None, base_delay=args.delay_seconds, attempt=attempt))
                 attempt += 1
                 continue
 
@@ -761,45 +918,47 @@ def crawl(args: Namespace) -> int:
             if resp.status_code in (429, 403):
                 if attempt < MAX_RETRIES:
                     print(f"[{resp.status_code}] Rate limited/blocked, forcing proxy rotation (attempt {attempt}/{MAX_RETRIES}): {url}")
-                    if current_proxy:
-                        proxy_failures[current_proxy] = proxy_failures.get(current_proxy, 0) + 1
+                    pool.record_block(current_proxy, resp.status_code)
+                    # Shorter backoff (5s, 10s, 20s), only for the identity that got blocked
+                    limiter.penalize(current_proxy, 5 * (2 ** (attempt - 1)))
+                    sessions.discard(current_proxy)
                     if proxies:
                         # Force proxy rotation and reset counter
                         rotate_identity()
                         requests_since_rotate = 0
                         print(f"[identity] Rotated to next proxy")
-                    # Shorter backoff (5s, 10s, 20s)
-                    time.sleep(5 * (2 ** (attempt - 1)))
                     attempt += 1
                     continue
                 print(f"[skip] Status {resp.status_code} after {MAX_RETRIES} retries: {url}")
-                polite_sleep(args.delay_seconds, args.delay_seconds + 1.0)
                 break
 
             if resp.status_code in RETRY_STATUSES:
+                if getattr(resp, "from_cache", False):
+                    print(f"[replay] Not in cache: {url}")
+                    break
                 if attempt < MAX_RETRIES:
                     print(f"[wait] Status {resp.status_code}, retrying {attempt}/{MAX_RETRIES}: {url}")
-                    backoff_sleep(resp, base_delay=args.delay_seconds, attempt=attempt)
+                    limiter.penalize(current_proxy, backoff_delay(resp, base_delay=args.delay_seconds, attempt=attempt))
                     attempt += 1
                     continue
                 print(f"[skip] Non-HTML or status {resp.status_code}: {url}")
-                polite_sleep(args.delay_seconds, args.delay_seconds + 1.0)
                 break
             if resp.status_code != 200 or "text/html" not in content_type:
                 print(f"[skip] Non-HTML or status {resp.status_code}: {url}")
-                polite_sleep(args.delay_seconds, args.delay_seconds + 1.0)
+                if resp.status_code == 404 and negative is not None:
+                    negative.add(url, NOT_FOUND)
                 break
 
             # Success - clear proxy failure counter if using proxy
-            if current_proxy and current_proxy in proxy_failures:
-                proxy_failures[current_proxy] = max(0, proxy_failures[current_proxy] - 1)
+            pool.record_success(current_proxy, response_latency(resp))
 
-            soup = BeautifulSoup(resp.text, "lxml")
+            doc = parse_html(resp.text, html_parser)
             success = True
             break
 
         if not success:
             # Could not fetch this URL successfully; move on
+            frontier.done(popped)
             continue
 
         # Increment request counter after each request (successful or not)
@@ -813,9 +972,10 @@ def crawl(args: Namespace) -> int:
             final_url = resp.url
             if url != final_url:
                 print(f"[redirect] {url} -> {final_url}")
+                store.record_redirect(url, final_url)
                 url = final_url
 
-            data = scrape_perfume_page(url, soup)
+            data = scrape_perfume_page(url, doc)
             # Apply brand filter if provided
             if brand_filter_cmp:
                 page_brand_cmp = _normalize_brand_compare(data.get("brand"))
@@ -829,6 +989,8 @@ def crawl(args: Namespace) -> int:
                     if data["brand"] and data["name"]:
                         if data["rating"] is None or data["votes"] is None:
                             print(f"[skip] {data['brand']} — {data['name']} | No ratings yet")
+                            if negative is not None:
+                                negative.add(url, NO_RATINGS)
                         elif url in existing_urls:
                             print(f"[skip] Already saved: {url}")
                         else:
@@ -842,9 +1004,8 @@ def crawl(args: Namespace) -> int:
                                 "sex": data.get("sex", ""),
                                 "fragrance_category": data.get("fragrance_category", ""),
                             }
-                            append_row(out_csv, row)
-                            append_row(mirror_csv, row)
-                            existing_urls.add(url)
+                            existing_urls.add(url)  # before the upsert, see _BrandSaver
+                            store.upsert(row)
                             saved_incremented = True
                             print(f"[saved] {data['brand']} — {data['name']} | {data['rating']} (votes: {data['votes']})")
                     else:
@@ -855,6 +1016,8 @@ def crawl(args: Namespace) -> int:
                 if data["brand"] and data["name"]:
                     if data["rating"] is None or data["votes"] is None:
                         print(f"[skip] {data['brand']} — {data['name']} | No ratings yet")
+                        if negative is not None:
+                            negative.add(url, NO_RATINGS)
                     elif url in existing_urls:
                         print(f"[skip] Already saved: {url}")
                     else:
@@ -868,9 +1031,8 @@ def crawl(args: Namespace) -> int:
                             "sex": data.get("sex", ""),
                             "fragrance_category": data.get("fragrance_category", ""),
                         }
-                        append_row(out_csv, row)
-                        append_row(mirror_csv, row)
-                        existing_urls.add(url)
+                        existing_urls.add(url)  # before the upsert, see _BrandSaver
+                        store.upsert(row)
                         saved_incremented = True
                         print(f"[saved] {data['brand']} — {data['name']} | {data['rating']} (votes: {data['votes']})")
                 else:
@@ -878,58 +1040,50 @@ def crawl(args: Namespace) -> int:
                 pages_processed += 1
                 processed_incremented = True
 
-        # Track how many *new* fragrances were saved since the last long break.
-        if saved_incremented:
-            saved_since_break += 1
-
-        # Take a longer break after each session_size *saved* perfume pages.
-        # This uses the carried counter so multi-brand runs cool down globally, not per brand.
-        if saved_incremented and args.session_size > 0 and saved_since_break >= args.session_size:
-            # If we still have work to do (queue not empty and budget not exhausted), pause
-            if queue and (args.max_pages <= 0 or pages_processed < args.max_pages):
-                mins = int(args.session_break_seconds // 60)
-                secs = int(args.session_break_seconds % 60)
-                print(
-                    f"[pause] Session save limit reached ({args.session_size} new fragrances). "
-                    f"Cooling down for ~{mins}m{secs}s…"
-                )
-                session_sleep(args.session_break_seconds, jitter_ratio=0.15)
-                saved_since_break = 0
-                # Switch identity for next session
+        # After session_size *saved* pages the proxy that fetched them rests on
+        # its own; the crawl carries on through the next one that is not resting.
+        # The pool is shared by the brands of a multi-brand run.
+        if saved_incremented and pool.record_save(current_proxy) > 0:
+            # If we still have work to do (queue not empty and budget not exhausted), switch
+            if frontier and (args.max_pages <= 0 or pages_processed < args.max_pages):
+                store.flush()
+                frontier.checkpoint()
                 rotate_identity(per_session=True)
-
-        # Enqueue more links to continue crawling (only if we still have budget)
-        if (args.max_pages <= 0 or pages_processed < args.max_pages):
-            # Limit perfume links from designer pages to avoid overwhelming the queue
-            # This prevents 100+ URLs being added at once, which causes rapid rate limiting
-            is_designer_page = url.startswith(f"https://{DOMAIN}/designers/")
-            link_limit = 20 if is_designer_page else 0  # Limit to 20 perfume links per designer page
-            
-            for link in extract_links(url, soup, limit_perfume_links=link_limit):
-                if link in seen:
-                    continue
-                if brand_filter_cmp and expected_brand_slug:
-                    # Allow designer pages for navigation, but filter perfume pages by brand
-                    if PERFUME_URL_RE.match(link):
-                        # Only traverse perfume pages for this brand
-                        u_brand, _ = parse_brand_name_from_url(link)
-                        if (u_brand or ""):
-                            if _brand_to_perfume_slug(u_brand).casefold() != expected_brand_slug:
-                                continue
-                    # Designer pages are always allowed for navigation
-                seen.add(link)
-                queue.append(link)
-
-        # Use longer delay after designer pages (they contain many links)
-        if url.startswith(f"https://{DOMAIN}/designers/"):
-            polite_sleep(args.delay_seconds * 1.5, args.delay_seconds * 2.0)
-        else:
-            polite_sleep(args.delay_seconds, args.delay_seconds + 1.5)
-
-    # Expose session counter for callers (e.g., main multi-brand loop).
-    args.saved_since_break_end = saved_since_break
+                # Only when every identity is resting is there anything to wait for
+                wait = pool.rest_remaining(current_proxy)
+                if wait > 0:
+                    print(f"[pause] Every identity is resting. Waiting ~{int(wait // 60)}m{int(wait % 60)}s…")
+                    time.sleep(wait)
+
+        # Enqueue more links, even once the budget is spent: the next run picks them up
+        # Limit perfume links from designer pages to avoid overwhelming the queue
+        # This prevents 100+ URLs being added at once, which causes rapid rate limiting
+        is_designer_page = url.startswith(f"https://{DOMAIN}/designers/")
+        link_limit = 20 if is_designer_page else 0  # Limit to 20 perfume links per designer page
+
+        for link in extract_links(url, doc, limit_perfume_links=link_limit):
+            if link in frontier:
+                continue
+            if brand_filter_cmp and expected_brand_slug:
+                # Allow designer pages for navigation, but filter perfume pages by brand
+                if PERFUME_URL_RE.match(link):
+                    # Only traverse perfume pages for this brand
+                    u_brand, _ = parse_brand_name_from_url(link)
+                    if (u_brand or ""):
+                        if _brand_to_perfume_slug(u_brand).casefold() != expected_brand_slug:
+                            continue
+                # Designer pages are always allowed for navigation
+            frontier.add(link, _link_priority(link, existing_urls, designer_slug))
+
+        # Its links are queued; a restart will not fetch this page again
+        frontier.done(popped)
 
     print(f"\nDone. Pages processed (perfume pages saved/attempted): {pages_processed}")
+    for line in pool.report():
+        print(f"[proxy] {line}")
+    print(f"[sessions] {sessions.report()}")
+    sessions.close()
+    _finish_cache(cache, args)
     print(f"CSV path: {out_csv}")
     return pages_processed
 
@@ -0,0 +1,67 @@
+"""Flat document events for single-pass extraction.
+
+A parsed page is turned into a stream of ``(event, value, extra)`` tuples:
+
+    (START, tag name, (attrs, text kind))
+    (TEXT,  raw string, string kind)
+    (END,   tag name, None)
+
+in document order. ``parsing.PageText`` consumes the stream once instead of
+searching the tree again for every field.
+
+String kinds mirror BeautifulSoup's ``get_text`` rules: ``MAIN`` for ordinary
+text and CDATA (what ``get_text`` returns), otherwise the name of the string
+class (``Comment``, ``Script``, ``Stylesheet``, ...). A tag's text kind is
+the kind its own ``get_text`` collects: ``MAIN`` for ordinary tags, the
+container kind for ``<script>``, ``<style>``, ``<template>`` and friends.
+"""
+from __future__ import annotations
+
+from typing import Any, Iterator, Tuple
+
+from bs4 import BeautifulSoup
+from bs4.element import CData, NavigableString, Tag
+
+START, TEXT, END = 0, 1, 2
+MAIN = "main"
+
+Event = Tuple[int, Any, Any]
+
+
+def _string_kind(node: NavigableString) -> str:
+    cls = type(node)
+    if cls is NavigableString or cls is CData:
+        return MAIN
+    return cls.__name__
+
+
+def _tag_kind(tag: Tag) -> str:
+    types = tag.interesting_string_types
+    if types is None or types is Tag.MAIN_CONTENT_STRING_TYPES or types == Tag.MAIN_CONTENT_STRING_TYPES:
+        return MAIN
+    if isinstance(types, type):
+        return types.__name__
+    return next(iter(types)).__name__
+
+
+def iter_soup_events(soup: BeautifulSoup) -> Iterator[Event]:
+    """Walk a BeautifulSoup tree once, yielding START/TEXT/END events.
+
+    The document node itself is not reported; its text is everything.
+    """
+    stack = [(None, iter(soup.contents))]
+    while stack:
+        name, children = stack[-1]
+        for node in children:
+            if isinstance(node, Tag):
+                yield START, node.name, (node.attrs, _tag_kind(node))
+                stack.append((node.name, iter(node.contents)))
+                break
+            yield TEXT, node, _string_kind(node)
+        else:
+            stack.pop()
+            if name is not None:
+                yield END, name, None
+
+
+__all__ = ["START", "TEXT", "END", "MAIN", "Event", "iter_soup_events"]
@@ -0,0 +1,221 @@
+"""Disk-backed crawl frontier for the free crawl.
+
+The free crawl used to keep its queue in a deque and its seen-set in a set,
+so a crash, Ctrl-C or reboot (say during a 15-minute session break) lost
+every discovered link and the next run started again from the seeds.
+
+``Frontier`` keeps both in a small SQLite database (WAL) and pops URLs in
+priority order, FIFO within a priority (see seen.py for how membership is
+kept small in memory):
+
+    PRIORITY_PERFUME   perfume pages not saved yet
+    PRIORITY_DESIGNER  designer pages of the target brand(s)
+    PRIORITY_OTHER     everything else
+
+Each URL is queued, taken (popped, being fetched) or done. Writes are
+committed every ``checkpoint_every`` changes or ``checkpoint_seconds``
+seconds, on ``checkpoint()`` and on ``close()``. A page is marked done only
+after its links were added, so a restart continues with the same queue:
+pages that were taken but never finished are queued again and pages already
+done, designer pages included, are not fetched again. Once everything is
+done the next run starts over from the seeds.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from .config import STATE_DIR
+from .seen import SeenSet
+
+PRIORITY_PERFUME = 0
+PRIORITY_DESIGNER = 1
+PRIORITY_OTHER = 2
+
+QUEUED, TAKEN, DONE = 0, 1, 2
+
+
+def default_frontier_path(out_csv: str) -> str:
+    """One frontier per output CSV, under ``STATE_DIR``."""
+    name = os.path.splitext(os.path.basename(out_csv))[0] or "perfumes"
+    return os.path.join(STATE_DIR, "frontier", f"{name}.sqlite3")
+
+
+class Frontier:
+    """Priority queue of URLs to crawl plus the set of URLs ever queued.
+
+    Only ``window`` queued URLs per priority are held in memory; the rest
+    wait in the database and are read back in ``seq`` order as the window
+    drains. Membership is a ``SeenSet`` rather than a set of strings, so
+    memory stays flat however many links the crawl discovers.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        checkpoint_every: int = 50,
+        checkpoint_seconds: float = 30.0,
+        fresh: bool = False,
+        window: int = 5000,
+    ) -> None:
+        self.path = path
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.checkpoint_seconds = checkpoint_seconds
+        self.window = max(1, window)
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS frontier ("
+                "url TEXT PRIMARY KEY, priority INTEGER NOT NULL, seq INTEGER NOT NULL, "
+                "state INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS frontier_queue ON frontier (state, priority, seq)")
+        self.seen = SeenSet()
+        # priority -> queued URLs in memory (FIFO), last seq read, more on disk?
+        self._windows: Dict[int, Deque[str]] = {}
+        self._cursor: Dict[int, int] = {}
+        self._spilled: Dict[int, bool] = {}
+        self._taken: Set[str] = set()
+        self._inserts: List[Tuple[str, int, int, int]] = []  # written in batches
+        self._seq = 0
+        self._queued = 0
+        self.done_count = 0
+        self._changes = 0
+        self._last_checkpoint = time.monotonic()
+        self.checkpoints = 0
+        self.resumed = 0  # URLs still queued from an earlier run
+        self._load(fresh)
+
+    def _load(self, fresh: bool) -> None:
+        unfinished = self.conn.execute("SELECT COUNT(*) FROM frontier WHERE state != ?", (DONE,)).fetchone()[0]
+        if fresh or not unfinished:
+            # Nothing left from the last run: start over from the seeds
+            with self.conn:
+                self.conn.execute("DELETE FROM frontier")
+            return
+        with self.conn:
+            # In flight when the last run stopped
+            self.conn.execute("UPDATE frontier SET state = ? WHERE state = ?", (QUEUED, TAKEN))
+        for url, seq, state in self.conn.execute("SELECT url, seq, state FROM frontier"):
+            self.seen.add(url)
+            self._seq = max(self._seq, seq)
+            if state == DONE:
+                self.done_count += 1
+        for (priority,) in self.conn.execute("SELECT DISTINCT priority FROM frontier WHERE state = ?", (QUEUED,)):
+            self._spilled[priority] = True
+        self._queued = self.resumed = unfinished
+
+    # -- queue -----------------------------------------------------------------
+
+    def add(self, url: str, priority: int = PRIORITY_OTHER) -> bool:
+        """Queue ``url`` unless it was ever queued before; returns True if added."""
+        if not self.seen.add(url):
+            return False
+        self._seq += 1
+        self._inserts.append((url, priority, self._seq, QUEUED))
+        self._changes += 1  # committed with the page that found it, see _set
+        window = self._windows.setdefault(priority, deque())
+        if not self._spilled.get(priority) and len(window) < self.window:
+            window.append(url)
+            self._cursor[priority] = self._seq
+        else:
+            self._spilled[priority] = True  # read back once the window drains
+        self._queued += 1
+        return True
+
+    def _write_inserts(self) -> None:
+        if self._inserts:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, priority, seq, state) VALUES (?, ?, ?, ?)", self._inserts
+            )
+            self._inserts.clear()
+
+    def _refill(self, priority: int) -> None:
+        self._write_inserts()
+        rows = self.conn.execute(
+            "SELECT url, seq FROM frontier WHERE state = ? AND priority = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (QUEUED, priority, self._cursor.get(priority, 0), self.window),
+        ).fetchall()
+        window = self._windows.setdefault(priority, deque())
+        window.extend(url for url, _ in rows)
+        if rows:
+            self._cursor[priority] = rows[-1][1]
+        self._spilled[priority] = len(rows) == self.window
+
+    def pop(self) -> Optional[str]:
+        """Take the most urgent queued URL (None when empty)."""
+        for priority in sorted(set(self._windows) | set(self._spilled)):
+            window = self._windows.get(priority)
+            if not window and self._spilled.get(priority):
+                self._refill(priority)
+                window = self._windows[priority]
+            if window:
+                url = window.popleft()
+                self._queued -= 1
+                self._taken.add(url)
+                self._set(url, TAKEN)
+                return url
+        return None
+
+    def done(self, url: str) -> None:
+        """Mark a popped URL finished (fetched, skipped or failed)."""
+        if url in self._taken:
+            self._taken.discard(url)
+            self.done_count += 1
+            self._set(url, DONE)
+
+    def _set(self, url: str, state: int) -> None:
+        self._write_inserts()
+        self.conn.execute("UPDATE frontier SET state = ? WHERE url = ?", (state, url))
+        self._changed()
+
+    def __contains__(self, url: object) -> bool:
+        return url in self.seen
+
+    def __len__(self) -> int:
+        return self._queued
+
+    # -- persistence -----------------------------------------------------------
+
+    def _changed(self) -> None:
+        self._changes += 1
+        if self._changes >= self.checkpoint_every or time.monotonic() - self._last_checkpoint >= self.checkpoint_seconds:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Commit everything queued, taken and done so far."""
+        self._last_checkpoint = time.monotonic()
+        if not self._changes:
+            return
+        self._write_inserts()
+        self.conn.commit()
+        self._changes = 0
+        self.checkpoints += 1
+
+    def close(self) -> None:
+        self.checkpoint()
+        self.conn.close()
+
+    def report(self) -> str:
+        return (
+            f"{len(self)} queued, {self.done_count} done, {len(self.seen)} seen "
+            f"({self.seen.memory_bytes() / 1024:.0f} KB), {self.checkpoints} checkpoints ({self.path})"
+        )
+
+
+__all__ = [
+    "Frontier",
+    "PRIORITY_DESIGNER",
+    "PRIORITY_OTHER",
+    "PRIORITY_PERFUME",
+    "default_frontier_path",
+]
@@ -0,0 +1,199 @@
+"""Pluggable HTML parser backends.
+
+``BeautifulSoup(text, "lxml")`` builds a Python object for every node of a
+~500 KB page, only for the scraper to read a handful of strings and links
+out of it. The backends here parse into a C tree and expose just what
+``parsing.PageText`` and the link extractors need:
+
+    * ``selectolax`` (lexbor) when installed
+    * ``lxml`` (lxml.html, links via XPath)
+    * ``bs4``, BeautifulSoup with the lxml parser, as the fallback
+
+``parse_html`` returns an ``HtmlDocument`` with ``events()`` (see events.py)
+and ``links()``. Code that already holds a BeautifulSoup object can wrap it
+with ``as_document``.
+"""
+from __future__ import annotations
+
+from typing import Any, Iterator, List, Optional, Union
+
+from bs4 import BeautifulSoup
+
+from .events import END, MAIN, START, TEXT, Event, iter_soup_events
+
+try:
+    import lxml.html  # type: ignore
+    from lxml import etree  # type: ignore
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser  # type: ignore
+    HAS_SELECTOLAX = True
+except ImportError:
+    LexborHTMLParser = None  # type: ignore[assignment,misc]
+    HAS_SELECTOLAX = False
+
+HTML_BACKENDS = ("selectolax", "lxml", "bs4")
+
+# Which parser backend is used by default (for logging)
+HTML_BACKEND: str = "selectolax" if HAS_SELECTOLAX else "lxml" if HAS_LXML else "bs4"
+
+# Tags whose text BeautifulSoup keeps out of get_text(), by string kind
+STRING_CONTAINERS = {
+    "script": "Script",
+    "style": "Stylesheet",
+    "template": "TemplateString",
+    "rt": "RubyTextString",
+    "rp": "RubyParenthesisString",
+}
+
+
+class HtmlDocument:
+    """A parsed page, whatever the backend."""
+
+    backend = ""
+
+    def events(self) -> Iterator[Event]:
+        raise NotImplementedError
+
+    def links(self) -> List[str]:
+        """``href`` of every ``<a href>``, in document order."""
+        raise NotImplementedError
+
+
+class SoupDocument(HtmlDocument):
+    backend = "bs4"
+
+    def __init__(self, soup: BeautifulSoup) -> None:
+        self.soup = soup
+
+    def events(self) -> Iterator[Event]:
+        return iter_soup_events(self.soup)
+
+    def links(self) -> List[str]:
+        return [a["href"] for a in self.soup.find_all("a", href=True)]
+
+
+class LxmlDocument(HtmlDocument):
+    backend = "lxml"
+
+    def __init__(self, root: Any) -> None:
+        self.root = root
+
+    def events(self) -> Iterator[Event]:
+        root = self.root
+        if root is None:
+            return
+        # Comments before/after <html> are siblings of the root element
+        top = [*reversed(list(root.itersiblings(preceding=True))), root, *root.itersiblings()]
+        # Each frame: (tag name, children iterator, text kind inside it, element)
+        stack: List[tuple] = [(None, iter(top), MAIN, None)]
+        while stack:
+            name, children, text_kind, el = stack[-1]
+            for child in children:
+                tag = child.tag
+                if isinstance(tag, str):
+                    kind = STRING_CONTAINERS.get(tag, MAIN)
+                    yield START, tag, (child.attrib, kind)
+                    inner_kind = kind if kind != MAIN else text_kind
+                    if child.text:
+                        yield TEXT, child.text, inner_kind
+                    stack.append((tag, iter(child), inner_kind, child))
+                    break
+                # Comment or processing instruction; its tail is ordinary text
+                yield TEXT, child.text or "", "Comment" if tag is etree.Comment else "ProcessingInstruction"
+                if child.tail:
+                    yield TEXT, child.tail, text_kind
+            else:
+                stack.pop()
+                if el is not None:
+                    yield END, name, None
+                    if el.tail:
+                        yield TEXT, el.tail, stack[-1][2]
+
+    def links(self) -> List[str]:
+        if self.root is None:
+            return []
+        return [str(href) for href in self.root.xpath("//a[@href]/@href")]
+
+
+class SelectolaxDocument(HtmlDocument):
+    """lexbor tree. Follows HTML5 parsing, so ``<template>`` content is not walked."""
+
+    backend = "selectolax"
+
+    def __init__(self, tree: Any) -> None:
+        self.tree = tree
+
+    def events(self) -> Iterator[Event]:
+        root = self.tree.root
+        if root is None:
+            return
+        start = root.parent if root.parent is not None else root
+        stack: List[tuple] = [(None, start.child, MAIN)]
+        while stack:
+            name, node, text_kind = stack.pop()
+            while node is not None:
+                tag = node.tag
+                if tag is None:
+                    pass
+                elif tag == "-text":
+                    yield TEXT, node.text_content or "", text_kind
+                elif tag == "-comment":
+                    yield TEXT, node.comment_content or "", "Comment"
+                elif tag.startswith(("-", "#", "!")):
+                    pass  # doctype and other non-element nodes
+                else:
+                    kind = STRING_CONTAINERS.get(tag, MAIN)
+                    yield START, tag, (node.attributes, kind)
+                    # Resume with the next sibling once this element is done
+                    stack.append((name, node.next, text_kind))
+                    name, node, text_kind = tag, node.child, kind if kind != MAIN else text_kind
+                    continue
+                node = node.next
+            if name is not None:
+                yield END, name, None
+
+    def links(self) -> List[str]:
+        return [node.attributes.get("href") or "" for node in self.tree.css("a[href]")]
+
+
+def _parse_lxml(text: str) -> LxmlDocument:
+    try:
+        try:
+            return LxmlDocument(lxml.html.document_fromstring(text))
+        except ValueError:
+            # str input with an XML encoding declaration is refused; hand lxml bytes
+            return LxmlDocument(lxml.html.document_fromstring(text.encode("utf-8")))
+    except etree.ParserError:
+        return LxmlDocument(None)  # empty document
+
+
+def parse_html(text: str, backend: Optional[str] = None) -> HtmlDocument:
+    """Parse ``text`` with ``backend`` (default: the fastest one installed)."""
+    backend = backend if backend and backend != "auto" else HTML_BACKEND
+    if backend == "selectolax" and HAS_SELECTOLAX:
+        return SelectolaxDocument(LexborHTMLParser(text))
+    if backend in ("selectolax", "lxml") and HAS_LXML:
+        return _parse_lxml(text)
+    return SoupDocument(BeautifulSoup(text, "lxml"))
+
+
+def as_document(doc: Union[HtmlDocument, BeautifulSoup]) -> HtmlDocument:
+    """Accept either a parsed document or a BeautifulSoup object."""
+    if isinstance(doc, HtmlDocument):
+        return doc
+    return SoupDocument(doc)
+
+
+__all__ = [
+    "HAS_LXML",
+    "HAS_SELECTOLAX",
+    "HTML_BACKEND",
+    "HTML_BACKENDS",
+    "HtmlDocument",
+    "as_document",
+    "parse_html",
+]
@@ -0,0 +1,229 @@
+"""Persistent index of saved perfume IDs, across every brand CSV.
+
+Every perfume URL ends in ``-<id>.html`` (see ``PERFUME_URL_RE``). The
+index keeps one bit per ID, so ~200k perfumes fit in 25 KB, load in well
+under a millisecond and answer ``url in index`` in O(1) no matter which
+brand file the perfume was saved to.
+
+On disk (under ``STATE_DIR`` by default):
+
+    perfume_ids.bin          bitmap, rewritten atomically on ``close``
+    perfume_ids.bin.log      IDs added since then, 4 bytes each (array 'I'),
+                             appended once the store has committed the row
+                             (``log_saved``), so a crash loses nothing and
+                             never leaves an ID without its row
+    perfume_ids.bin.sources  size/mtime of each CSV already folded in
+
+``sync_sources`` folds in CSVs that are new or changed since they were last
+read, so the index follows edits made outside the crawler. IDs are never
+removed. With ``aliases`` (a ``storage.AliasMap``), the old URL of a perfume
+that moved counts as saved once the perfume is saved under its new one.
+"""
+from __future__ import annotations
+
+import csv
+import glob
+import json
+import os
+import re
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from .config import PERFUME_URL_RE, SAVED_DATA_DIR, STATE_DIR
+
+DEFAULT_ID_INDEX: str = os.path.join(STATE_DIR, "perfume_ids.bin")
+
+_ID_RE = re.compile(r"-(\d+)\.html$", re.IGNORECASE)
+_MAGIC = b"FIDX1\n"
+
+
+def perfume_id(url: str) -> Optional[int]:
+    """Numeric ID of a perfume URL, or None for anything else."""
+    if not url or not PERFUME_URL_RE.match(url):
+        return None
+    m = _ID_RE.search(url)
+    return int(m.group(1)) if m else None
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class PerfumeIdIndex:
+    """Bitmap of perfume IDs; usable wherever a set of saved URLs was."""
+
+    def __init__(self, path: str = DEFAULT_ID_INDEX) -> None:
+        self.path = path
+        self.bits = bytearray()
+        self.added = 0  # IDs new to the index in this run
+        self._sources: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+        self._log = None
+        self._unlogged: Set[int] = set()  # added, but their rows not yet flushed by the store
+        self.aliases = None  # storage.AliasMap, when redirects are tracked
+        self._load()
+
+    # -- persistence -----------------------------------------------------------
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+            if data.startswith(_MAGIC):
+                self.bits = bytearray(data[len(_MAGIC):])
+        except OSError:
+            pass
+        try:
+            ids = array("I")
+            with open(f"{self.path}.log", "rb") as f:
+                raw = f.read()
+            ids.frombytes(raw[: len(raw) - len(raw) % ids.itemsize])  # ignore a torn last record
+            for i in ids:
+                self._set(i)
+        except OSError:
+            pass
+        try:
+            with open(f"{self.path}.sources", "r", encoding="utf-8") as f:
+                self._sources = json.load(f)
+        except (OSError, ValueError):
+            self._sources = {}
+
+    def save(self) -> None:
+        """Write the bitmap and source stamps, then empty the log."""
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with self._lock:
+            _atomic_write(self.path, _MAGIC + bytes(self.bits))
+            _atomic_write(f"{self.path}.sources", json.dumps(self._sources).encode("utf-8"))
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            open(f"{self.path}.log", "wb").close()
+            self._unlogged.clear()
+
+    def close(self) -> None:
+        self.save()
+
+    # -- membership ------------------------------------------------------------
+
+    def _set(self, i: int) -> bool:
+        byte, bit = i >> 3, 1 << (i & 7)
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte + 1 - len(self.bits) + 1024))
+        if self.bits[byte] & bit:
+            return False
+        self.bits[byte] |= bit
+        return True
+
+    def has_id(self, i: int) -> bool:
+        byte = i >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] & (1 << (i & 7)))
+
+    def __contains__(self, url: object) -> bool:
+        i = perfume_id(url) if isinstance(url, str) else None
+        if i is None:
+            return False
+        if self.has_id(i):
+            return True
+        return self.aliases is not None and self.has_id(self.aliases.canonical_id(i))
+
+    def add(self, url: Union[str, int]) -> bool:
+        """Record a perfume (URL or ID) as saved for this run.
+
+        Call it before handing the row to the store: the ID only reaches the
+        log through ``log_saved`` once the store has flushed the row (or the
+        bitmap on ``save``), so a crash never marks an unsaved row as saved.
+        """
+        i = url if isinstance(url, int) else perfume_id(url)
+        if i is None:
+            return False
+        with self._lock:
+            if not self._set(i):
+                return False
+            self.added += 1
+            self._unlogged.add(i)
+        return True
+
+    def log_saved(self, urls: Iterable[str]) -> int:
+        """Append the IDs of rows the store has just flushed to the log (a store ``on_flush`` hook)."""
+        with self._lock:
+            ids = [i for i in map(perfume_id, urls) if i is not None and i in self._unlogged]
+            if not ids:
+                return 0
+            self._unlogged.difference_update(ids)
+            if self._log is None:
+                parent = os.path.dirname(self.path)
+                if parent:
+                    os.makedirs(parent, exist_ok=True)
+                self._log = open(f"{self.path}.log", "ab")
+            self._log.write(array("I", ids).tobytes())
+            self._log.flush()
+        return len(ids)
+
+    def __len__(self) -> int:
+        return int.from_bytes(self.bits, "little").bit_count()
+
+    # -- sources ---------------------------------------------------------------
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[List[int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    def sync_sources(self, paths: Iterable[str]) -> int:
+        """Fold in every CSV that changed since it was last read; returns files read."""
+        read = 0
+        for path in paths:
+            key = os.path.abspath(path)
+            stamp = self._stamp(path)
+            if stamp is None or self._sources.get(key) == stamp:
+                continue
+            try:
+                with open(path, "r", newline="", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        i = perfume_id((row.get("url") or "").strip())
+                        if i is not None:
+                            with self._lock:
+                                self._set(i)
+            except (OSError, csv.Error, UnicodeDecodeError) as e:
+                print(f"[index] Could not read {path}: {e}")
+                continue
+            self._sources[key] = stamp
+            read += 1
+        return read
+
+    def mark_current(self, paths: Iterable[str]) -> None:
+        """Note CSVs whose rows all went through ``add`` as up to date."""
+        for path in paths:
+            stamp = self._stamp(path)
+            if stamp is not None:
+                self._sources[os.path.abspath(path)] = stamp
+
+
+def corpus_csvs(*extra: str) -> List[str]:
+    """Every brand CSV under ``SAVED_DATA_DIR`` plus ``extra`` paths."""
+    paths = sorted(glob.glob(os.path.join(SAVED_DATA_DIR, "*.csv")))
+    for p in extra:
+        if p and os.path.abspath(p) not in {os.path.abspath(q) for q in paths}:
+            paths.append(p)
+    return paths
+
+
+def open_id_index(path: Optional[str] = None, *extra_sources: str, aliases=None) -> PerfumeIdIndex:
+    """Load the index and bring it up to date with the CSVs on disk."""
+    index = PerfumeIdIndex(path or DEFAULT_ID_INDEX)
+    index.aliases = aliases
+    read = index.sync_sources(corpus_csvs(*extra_sources))
+    print(f"[index] {len(index)} perfume IDs known" + (f" ({read} CSV files re-read)" if read else ""))
+    return index
+
+
+__all__ = ["DEFAULT_ID_INDEX", "PerfumeIdIndex", "corpus_csvs", "open_id_index", "perfume_id"]
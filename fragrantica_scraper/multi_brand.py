@@ -0,0 +1,131 @@
+"""Several brands at once (``main.py --parallel-brands N``).
+
+``main.py`` runs ``crawl()`` for one brand after another, handing one
+ProxyPool from one to the next so every proxy's session carries over.
+With ``--parallel-brands N`` up to N brands run side by side, each on its
+own thread and its own slice of the proxies, so no proxy is ever used by
+two brands at once. What has to stay global is shared:
+
+    ProxyPool         one per slice, kept by the slot from brand to brand,
+                      so a proxy rests after --session-size saves whichever
+                      brands they were for (without proxies, one pool for
+                      the direct connection)
+    RateLimiter       one set of token buckets, so --global-rate still caps
+                      the whole run (and brands without proxies share one
+                      bucket for the direct connection)
+    PerfumeIdIndex    one dedupe index, opened and written once
+    AliasMap          one redirect map, read by the index and appended to
+                      by every brand's store
+    ResponseCache     one cache, pruned once at the end
+
+Per-brand namespaces are shallow copies: the shared objects hold locks and
+must not be deep-copied.
+"""
+from __future__ import annotations
+
+import queue
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional, Sequence
+
+from .cache import build_response_cache
+from .id_index import open_id_index
+from .network import build_rate_limiter
+from .proxies import build_proxy_pool, load_proxies
+from .storage import open_aliases
+
+
+def split_proxies(proxies: Sequence[str], parts: int) -> List[List[str]]:
+    """Deal ``proxies`` round-robin into ``parts`` disjoint lists."""
+    return [list(proxies[k::parts]) for k in range(parts)]
+
+
+def run_brands_parallel(
+    args: Namespace,
+    brands: Sequence[str],
+    crawl: Callable[[Namespace], int],
+    workers: Optional[int] = None,
+) -> int:
+    """Run ``crawl`` for every brand, up to ``workers`` at a time. Returns pages saved."""
+    workers = max(1, min(workers or args.parallel_brands, len(brands)))
+    proxies = load_proxies(args)
+    replaying = bool(getattr(args, "replay", False))
+    if proxies and len(proxies) < workers and not replaying:
+        print(f"[multi] Only {len(proxies)} proxies: running {len(proxies)} brands at a time")
+        workers = len(proxies)
+    # No proxies: every brand goes out directly through the shared limiter's
+    # single bucket, so the site sees the same pace as a sequential run
+    subsets = split_proxies(proxies, workers) if proxies else [[] for _ in range(workers)]
+
+    if proxies:
+        pools = [build_proxy_pool(args, subset) for subset in subsets]
+    else:
+        pools = [build_proxy_pool(args, [])] * workers
+    limiter = build_rate_limiter(args)
+    cache = build_response_cache(args)
+    # One alias map for every brand: redirects one brand records count for the others right away
+    aliases = open_aliases(args)
+    index = None if getattr(args, "no_id_index", False) else open_id_index(
+        getattr(args, "id_index", None), aliases=aliases
+    )
+
+    slots: "queue.Queue[int]" = queue.Queue()
+    for k in range(workers):
+        slots.put(k)
+
+    def run_one(i: int, brand: str) -> int:
+        slot = slots.get()
+        try:
+            per_brand_args = Namespace(**vars(args))
+            per_brand_args.brand = brand
+            per_brand_args.start_url = None
+            # Keep default so crawler auto-names to Saved Data/<brand>.csv
+            per_brand_args.out_csv = "perfumes.csv"
+            per_brand_args.proxy_list = subsets[slot]
+            per_brand_args.shared_proxy_pool = pools[slot]
+            per_brand_args.shared_limiter = limiter
+            per_brand_args.shared_cache = cache
+            per_brand_args.shared_id_index = index
+            per_brand_args.shared_aliases = aliases
+            print(f"\n[multi] Brand {i}/{len(brands)}: {brand} (slot {slot + 1}/{workers}, "
+                  f"{len(subsets[slot])} proxies)")
+            return crawl(per_brand_args) or 0
+        finally:
+            slots.put(slot)
+
+    print(f"[multi] {len(brands)} brands, {workers} at a time")
+    saved = 0
+    failed: List[str] = []
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="brand")
+    try:
+        futures = {executor.submit(run_one, i, brand): brand for i, brand in enumerate(brands, 1)}
+        for future in as_completed(futures):
+            try:
+                saved += future.result()
+            except Exception as e:
+                print(f"[multi] {futures[future]} failed: {e}")
+                failed.append(futures[future])
+    except KeyboardInterrupt:
+        # Brands already running finish their current page; the rest never start
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        executor.shutdown(wait=True)
+        if cache is not None:
+            print(f"[cache] {cache.report()}")
+            removed, freed = cache.prune()
+            if removed or freed:
+                print(f"[cache] Pruned {removed} entries, freed {freed / 1024 / 1024:.1f} MB")
+        if index is not None:
+            index.close()
+            print(f"[index] {index.added} new perfume IDs, {len(index)} total")
+        aliases.close()
+
+    rests = sum(pool.rests for pool in {id(p): p for p in pools}.values())
+    print(f"\n[multi] Saved {saved} new perfumes over {len(brands)} brands, {rests} proxy session rests")
+    if failed:
+        print(f"[warn] {len(failed)} brands failed: {', '.join(failed)}")
+    return saved
+
+
+__all__ = ["run_brands_parallel", "split_proxies"]
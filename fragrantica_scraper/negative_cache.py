@@ -0,0 +1,164 @@
+"""Perfume pages that were fetched recently and had nothing to give.
+
+Some pages come back empty every time: a new perfume with no ratings yet, a
+page whose description names no category, or a 404. Without a record of that, every run (and every
+``enrich.py --refresh``) fetches them again. The negative cache remembers
+them by perfume ID (see ``id_index.perfume_id``) with the reason and a
+retry-after time, and the crawlers check it before fetching.
+
+Each reason has its own TTL (``DEFAULT_TTLS``). A page that is still empty
+when it is retried gets twice the previous TTL, up to ``MAX_BACKOFF`` times
+the base one; a page that is saved after all is dropped from the cache.
+
+On disk it is one small SQLite table under ``STATE_DIR``, shared by every
+brand and by enrich.py. Replay runs neither read nor write it: reading the
+response cache costs nothing, and a re-parse is usually what replay is for.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Collection, Dict, Optional, Tuple
+
+from .config import STATE_DIR
+from .id_index import perfume_id
+
+DEFAULT_NEGATIVE_CACHE: str = os.path.join(STATE_DIR, "negative.sqlite3")
+
+NO_RATINGS = "no-ratings"
+NO_CATEGORY = "no-category"
+NOT_FOUND = "404"
+
+_DAY = 86400.0
+DEFAULT_TTLS: Dict[str, float] = {
+    NO_RATINGS: 7 * _DAY,  # new perfumes pick up votes quickly
+    NO_CATEGORY: 30 * _DAY,
+    NOT_FOUND: 30 * _DAY,
+}
+MAX_BACKOFF = 8
+
+# What makes a page not worth fetching for each kind of run. A page without
+# ratings may still name its category, and the other way round.
+CRAWL_REASONS = frozenset({NO_RATINGS, NOT_FOUND})
+ENRICH_REASONS = frozenset({NO_CATEGORY, NOT_FOUND})
+REFRESH_REASONS = frozenset({NOT_FOUND})
+
+
+class NegativeCache:
+    """Perfume ID -> (reason, retry-after) for pages known to be empty."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_NEGATIVE_CACHE,
+        *,
+        ttls: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.clock = clock
+        self.skipped = 0  # fetches saved this run
+        self.recorded = 0
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        # The brand-mode writer thread records while the fetch loop checks
+        self.conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS negative ("
+            "id INTEGER PRIMARY KEY, reason TEXT NOT NULL, url TEXT, misses INTEGER NOT NULL, "
+            "tried_at REAL NOT NULL, retry_after REAL NOT NULL)"
+        )
+        self.conn.commit()
+        self._lock = threading.Lock()
+        # Only the entries still in force; expired rows stay on disk for their miss count
+        self._entries: Dict[int, Tuple[str, float]] = {
+            pid: (reason, retry_after)
+            for pid, reason, retry_after in self.conn.execute(
+                "SELECT id, reason, retry_after FROM negative WHERE retry_after > ?", (self.clock(),)
+            )
+        }
+
+    def __len__(self) -> int:
+        now = self.clock()
+        return sum(1 for _, retry_after in self._entries.values() if retry_after > now)
+
+    def reason(self, url: str, reasons: Optional[Collection[str]] = None) -> Optional[str]:
+        """Why ``url`` is not worth fetching yet (limited to ``reasons``), or None."""
+        pid = perfume_id(url)
+        entry = self._entries.get(pid) if pid is not None else None
+        if entry is None or entry[1] <= self.clock():
+            return None
+        if reasons is not None and entry[0] not in reasons:
+            return None
+        return entry[0]
+
+    def skip(self, url: str, reasons: Optional[Collection[str]] = None) -> bool:
+        """``reason`` as a yes/no, counting the fetches it saves."""
+        if self.reason(url, reasons) is None:
+            return False
+        with self._lock:
+            self.skipped += 1
+        return True
+
+    def add(self, url: str, reason: str) -> float:
+        """Record that ``url`` came back empty; returns the TTL it got (0 if not a perfume URL)."""
+        pid = perfume_id(url)
+        if pid is None:
+            return 0.0
+        with self._lock:
+            now = self.clock()
+            row = self.conn.execute("SELECT reason, misses FROM negative WHERE id = ?", (pid,)).fetchone()
+            misses = row[1] + 1 if row is not None and row[0] == reason else 1
+            ttl = self.ttls[reason] * min(2 ** (misses - 1), MAX_BACKOFF)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO negative (id, reason, url, misses, tried_at, retry_after) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (pid, reason, url, misses, now, now + ttl),
+            )
+            self.conn.commit()
+            self._entries[pid] = (reason, now + ttl)
+            self.recorded += 1
+        return ttl
+
+    def discard(self, url: str) -> None:
+        """Forget ``url`` (it was saved after all)."""
+        pid = perfume_id(url)
+        if pid is None or pid not in self._entries:
+            return
+        with self._lock:
+            self.conn.execute("DELETE FROM negative WHERE id = ?", (pid,))
+            self.conn.commit()
+            self._entries.pop(pid, None)
+
+    def report(self) -> str:
+        return f"{len(self)} pages known empty, {self.skipped} fetches skipped, {self.recorded} recorded this run"
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+
+def build_negative_cache(args) -> Optional[NegativeCache]:
+    """The negative cache for a run, or None (--no-negative-cache, --replay)."""
+    if getattr(args, "no_negative_cache", False) or getattr(args, "replay", False):
+        return None
+    return NegativeCache(getattr(args, "negative_cache", None) or DEFAULT_NEGATIVE_CACHE)
+
+
+__all__ = [
+    "CRAWL_REASONS",
+    "DEFAULT_NEGATIVE_CACHE",
+    "DEFAULT_TTLS",
+    "ENRICH_REASONS",
+    "NOT_FOUND",
+    "NO_CATEGORY",
+    "NO_RATINGS",
+    "NegativeCache",
+    "REFRESH_REASONS",
+    "build_negative_cache",
+]
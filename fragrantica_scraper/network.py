@@ -1,14 +1,18 @@
 """Networking, session management, and politeness helpers.
 
-This module encapsulates HTTP session creation, header/proxy handling,
-robots.txt checks, URL normalization, link extraction, and various
-sleep/backoff utilities.
+This module encapsulates HTTP session creation and pooling, header/proxy
+handling, robots.txt checks, URL normalization, link extraction, the
+token-bucket rate limiter every fetch goes through, and various sleep/backoff
+utilities.
 """
 from __future__ import annotations
 
+import asyncio
+import collections
 import random
+import threading
 import time
-from typing import Optional, Set, TYPE_CHECKING
+from typing import Callable, Dict, Optional, Set, Tuple, TYPE_CHECKING, Union
 from urllib.parse import urljoin, urlparse, urlunparse
 
 import requests
@@ -52,6 +56,7 @@ from .config import (
     DOMAIN,
     PERFUME_PATH_RE,
 )
+from .html_backend import HtmlDocument, as_document
 
 
 def build_session(
@@ -146,6 +151,123 @@ def build_session(
     return s
 
 
+SessionKey = Tuple[Optional[str], str, str]
+
+
+class SessionPool:
+    """Reuse sessions per (proxy, User-Agent, Accept-Language).
+
+    Building a new session on every rotation throws away keep-alive
+    connections, TLS sessions and HTTP/2 streams, so the next request through
+    that proxy pays for a fresh handshake. The pool hands the same session back
+    whenever rotation returns to a proxy, and pins one UA/Accept-Language per
+    proxy so the key actually repeats. Sessions idle for longer than
+    ``max_idle_seconds`` are closed, as is the least recently used one once
+    ``max_size`` is reached.
+    """
+
+    def __init__(
+        self,
+        timeout: float,
+        *,
+        max_idle_seconds: float = 300.0,
+        max_size: int = 64,
+        factory: Callable[..., requests.Session] = None,  # type: ignore[assignment]
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.timeout = timeout
+        self.max_idle_seconds = max_idle_seconds
+        self.max_size = max_size
+        self.factory = factory or build_session
+        self.clock = clock
+        self._sessions: "collections.OrderedDict[SessionKey, Tuple[requests.Session, float]]" = collections.OrderedDict()
+        self._identities: Dict[Optional[str], Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        self.discarded = 0
+
+    def _close(self, session: requests.Session) -> None:
+        try:
+            session.close()
+        except Exception:
+            pass
+
+    def evict_idle(self) -> int:
+        """Close sessions idle for longer than ``max_idle_seconds``. Returns how many."""
+        now = self.clock()
+        with self._lock:
+            stale = [k for k, (_, last) in self._sessions.items() if now - last > self.max_idle_seconds]
+            for key in stale:
+                session, _ = self._sessions.pop(key)
+                self._close(session)
+            self.evicted += len(stale)
+        return len(stale)
+
+    def get(self, user_agent: str, proxy: Optional[str] = None, accept_language: Optional[str] = None) -> requests.Session:
+        """Return the cached session for this identity, creating it if needed."""
+        accept_language = accept_language or random.choice(DEFAULT_ACCEPT_LANGS)
+        key: SessionKey = (proxy, user_agent, accept_language)
+        self.evict_idle()
+        with self._lock:
+            entry = self._sessions.pop(key, None)
+            if entry is not None:
+                session = entry[0]
+                self.reused += 1
+            else:
+                session = self.factory(user_agent, self.timeout, proxy=proxy, accept_language=accept_language)
+                self.created += 1
+                while len(self._sessions) >= self.max_size:
+                    _, (old, _) = self._sessions.popitem(last=False)
+                    self._close(old)
+                    self.evicted += 1
+            self._sessions[key] = (session, self.clock())
+        return session
+
+    def identity(self, proxy: Optional[str], choose_ua: Callable[[], str]) -> Tuple[str, str]:
+        """The (User-Agent, Accept-Language) pinned to ``proxy``, chosen on first use."""
+        with self._lock:
+            ident = self._identities.get(proxy)
+            if ident is None:
+                ident = (choose_ua(), random.choice(DEFAULT_ACCEPT_LANGS))
+                self._identities[proxy] = ident
+            return ident
+
+    def session_for(self, proxy: Optional[str], choose_ua: Callable[[], str]) -> Tuple[requests.Session, str, str]:
+        """Convenience: pinned identity for ``proxy`` plus its pooled session."""
+        ua, accept_language = self.identity(proxy, choose_ua)
+        return self.get(ua, proxy, accept_language), ua, accept_language
+
+    def discard(self, proxy: Optional[str]) -> None:
+        """Drop every session and the pinned identity for ``proxy``.
+
+        Used after a ban: cookies and fingerprint tied to that session are
+        burnt, so the next visit through the proxy starts from scratch.
+        """
+        with self._lock:
+            for key in [k for k in self._sessions if k[0] == proxy]:
+                session, _ = self._sessions.pop(key)
+                self._close(session)
+                self.discarded += 1
+            self._identities.pop(proxy, None)
+
+    def close(self) -> None:
+        with self._lock:
+            for session, _ in self._sessions.values():
+                self._close(session)
+            self._sessions.clear()
+
+    def report(self) -> str:
+        total = self.created + self.reused
+        ratio = (self.reused / total * 100.0) if total else 0.0
+        return (
+            f"{self.created} created, {self.reused} reused ({ratio:.0f}% reuse), "
+            f"{self.evicted} evicted idle/LRU, {self.discarded} discarded after bans, "
+            f"{len(self._sessions)} open"
+        )
+
+
 def can_fetch(rp: robotparser.RobotFileParser, ua: str, url: str) -> bool:
     try:
         return rp.can_fetch(ua, url)
@@ -168,12 +290,14 @@ def normalize_url(url: str) -> Optional[str]:
         return None
 
 
-def extract_links(base_url: str, soup: BeautifulSoup, limit_perfume_links: int = 0) -> Set[str]:
+def extract_links(
+    base_url: str, doc: Union[HtmlDocument, BeautifulSoup], limit_perfume_links: int = 0
+) -> Set[str]:
     """Extract links from a page.
     
     Args:
         base_url: The URL of the page being parsed
-        soup: BeautifulSoup object of the page
+        doc: Parsed page (see html_backend.parse_html) or a BeautifulSoup object
         limit_perfume_links: If > 0, limit the number of perfume links extracted from designer pages
                             to avoid overwhelming the queue. Designer pages themselves are not limited.
     """
@@ -181,8 +305,8 @@ def extract_links(base_url: str, soup: BeautifulSoup, limit_perfume_links: int =
     perfume_links: list[str] = []
     designer_links: list[str] = []
     
-    for a in soup.find_all("a", href=True):
-        full = urljoin(base_url, a["href"])  # absolute
+    for href in as_document(doc).links():
+        full = urljoin(base_url, href)  # absolute
         full = normalize_url(full)
         if not full:
             continue
@@ -222,6 +346,198 @@ def extract_links(base_url: str, soup: BeautifulSoup, limit_perfume_links: int =
     return links
 
 
+class TokenBucket:
+    """Token bucket refilled at ``rate`` tokens/second, holding at most ``capacity``.
+
+    ``reserve`` always takes the tokens, letting the level go negative, and
+    returns how long the caller has to wait before its request may go out.
+    Callers therefore never race each other for the same token.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def _refill(self, now: float) -> None:
+        if self.rate > 0:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens and return the seconds to wait (0 if available now)."""
+        if self.rate <= 0:
+            return 0.0
+        now = self.clock()
+        self._refill(now)
+        self.tokens -= cost
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def defer(self, seconds: float) -> None:
+        """Push the bucket's schedule back by ``seconds``."""
+        if self.rate > 0:
+            self.tokens -= seconds * self.rate
+
+    def penalize(self, seconds: float) -> None:
+        """Make the bucket unavailable for at least ``seconds`` from now."""
+        if self.rate <= 0 or seconds <= 0:
+            return
+        self._refill(self.clock())
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class RateLimiter:
+    """Per-identity token buckets plus one global bucket for the domain.
+
+    An identity is whatever a request goes out through — in practice the proxy
+    URL, or ``None`` for direct connections. Each identity gets its own bucket
+    of ``per_identity_rate`` requests/second, so an idle proxy can be used
+    straight away, while the global bucket caps the combined rate against the
+    site. ``jitter`` adds a random 0..jitter seconds on top of any wait so the
+    request pattern does not look machine-timed.
+    """
+
+    def __init__(
+        self,
+        per_identity_rate: float,
+        global_rate: float = 0.0,
+        burst: float = 1.0,
+        jitter: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.per_identity_rate = per_identity_rate
+        self.burst = burst
+        self.jitter = jitter
+        self.clock = clock
+        self.sleep = sleep
+        self.global_bucket = TokenBucket(global_rate, capacity=burst, clock=clock)
+        self._buckets: Dict[Optional[str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, identity: Optional[str]) -> TokenBucket:
+        bucket = self._buckets.get(identity)
+        if bucket is None:
+            bucket = TokenBucket(self.per_identity_rate, capacity=self.burst, clock=self.clock)
+            self._buckets[identity] = bucket
+        return bucket
+
+    def reserve(self, identity: Optional[str] = None, cost: float = 1.0) -> float:
+        """Reserve a slot for one request and return the seconds to wait for it.
+
+        ``cost`` scales how much of the budget the request uses; heavier pages
+        (designer listings) can charge more than one token so the next request
+        on the same identity waits longer.
+        """
+        with self._lock:
+            bucket = self._bucket(identity)
+            wait = max(bucket.reserve(cost), self.global_bucket.reserve(1.0))
+            if wait > 0 and self.jitter > 0:
+                extra = random.uniform(0.0, self.jitter)
+                # Charge the jitter to the bucket too, otherwise the next
+                # request on this identity would get it back as a shorter wait.
+                bucket.defer(extra)
+                wait += extra
+        return wait
+
+    def penalize(self, identity: Optional[str], seconds: float) -> None:
+        """Back off one identity (e.g. after a 429) without stalling the others."""
+        with self._lock:
+            self._bucket(identity).penalize(seconds)
+
+    def acquire(self, identity: Optional[str] = None, cost: float = 1.0) -> float:
+        """Block until a request on ``identity`` is allowed. Returns the time waited."""
+        wait = self.reserve(identity, cost)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    async def acquire_async(self, identity: Optional[str] = None, cost: float = 1.0) -> float:
+        """Asyncio flavour of :meth:`acquire`."""
+        wait = self.reserve(identity, cost)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+def build_rate_limiter(args) -> RateLimiter:
+    """Create the limiter described by the CLI options.
+
+    By default each identity is paced at one request per ``--delay-seconds``
+    with up to 2s of jitter, which matches the historical
+    ``uniform(delay, delay + 2)`` spacing between requests.
+    """
+    delay = float(getattr(args, "delay_seconds", 5.0) or 0.0)
+    rate = getattr(args, "rate_per_proxy", None)
+    if rate is None:
+        rate = 1.0 / delay if delay > 0 else 0.0
+    return RateLimiter(
+        per_identity_rate=float(rate),
+        global_rate=float(getattr(args, "global_rate", 0.0) or 0.0),
+        burst=float(getattr(args, "burst", 1.0) or 1.0),
+        jitter=2.0 if delay > 0 else 0.0,
+    )
+
+
+def fetch(
+    session,
+    url: str,
+    *,
+    timeout: float,
+    limiter: Optional[RateLimiter] = None,
+    identity: Optional[str] = None,
+    cost: float = 1.0,
+    cache=None,
+    **kwargs,
+):
+    """GET ``url`` on ``session`` after waiting for the rate limiter.
+
+    With a ``cache`` (see cache.py) the response is recorded; in replay mode
+    the cache is the only source and nothing goes over the network. Cached
+    pages are revalidated with ``If-None-Match``/``If-Modified-Since``; on a
+    304 the cached page is returned with ``not_modified = True``.
+    """
+    if cache is not None and cache.replay:
+        return cache.get(url) or cache.miss(url)
+    if cache is not None:
+        conditional = cache.validators(url)
+        if conditional:
+            kwargs["headers"] = {**conditional, **(kwargs.get("headers") or {})}
+    if limiter is not None:
+        limiter.acquire(identity, cost)
+    resp = session.get(url, timeout=timeout, **kwargs)
+    if cache is not None:
+        try:
+            if resp.status_code == 304:
+                cached = cache.revalidate(url, resp.headers)
+                if cached is not None:
+                    cached.elapsed = getattr(resp, "elapsed", None)
+                    return cached
+            else:
+                cache.store_response(url, resp)
+        except OSError as e:
+            print(f"[warn] Could not cache {url}: {e}")
+    return resp
+
+
+def response_latency(resp) -> Optional[float]:
+    """Seconds the server took to answer, if the backend reports it."""
+    elapsed = getattr(resp, "elapsed", None)
+    if elapsed is None:
+        return None
+    try:
+        return float(elapsed.total_seconds())
+    except AttributeError:
+        try:
+            return float(elapsed)
+        except (TypeError, ValueError):
+            return None
+
+
 def polite_sleep(delay_min: float, delay_max: float) -> None:
     time.sleep(random.uniform(delay_min, delay_max))
 
@@ -234,8 +550,8 @@ def session_sleep(total_seconds: float, jitter_ratio: float = 0.1) -> None:
     time.sleep(random.uniform(max(0.0, total_seconds - jitter), total_seconds + jitter))
 
 
-def backoff_sleep(resp: Optional[requests.Response], base_delay: float, attempt: int) -> None:
-    """Honor Retry-After and apply exponential backoff with jitter."""
+def backoff_delay(resp: Optional[requests.Response], base_delay: float, attempt: int) -> float:
+    """Seconds to back off: honor Retry-After, else exponential backoff with jitter."""
     retry_after: Optional[str] = None
     if resp is not None:
         try:
@@ -244,12 +560,14 @@ def backoff_sleep(resp: Optional[requests.Response], base_delay: float, attempt:
             retry_after = None
     if retry_after:
         try:
-            seconds = float(retry_after)
-            time.sleep(max(seconds, base_delay))
-            return
+            return max(float(retry_after), base_delay)
         except Exception:
             # If not numeric, fall through to exponential backoff
             pass
     sleep_min = base_delay * (2 ** (attempt - 1))
-    sleep_max = sleep_min + 1.5
-    polite_sleep(sleep_min, sleep_max)
+    return random.uniform(sleep_min, sleep_min + 1.5)
+
+
+def backoff_sleep(resp: Optional[requests.Response], base_delay: float, attempt: int) -> None:
+    """Honor Retry-After and apply exponential backoff with jitter."""
+    time.sleep(backoff_delay(resp, base_delay, attempt))
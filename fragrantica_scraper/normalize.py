@@ -0,0 +1,97 @@
+"""Name/sex normalization applied once, when a row is created.
+
+These are also the rules ``support_scripts/clean_name_and_sex.py`` applies
+(it imports them from here) to CSVs saved before rows were normalized:
+
+    1. sex "women and men" -> "unisex"
+    2. name: drop "for women and men", collapse whitespace
+    3. name: drop a trailing repetition of the brand
+       ("Gingembre Latte Affinessence" by Affinessence -> "Gingembre Latte")
+
+Each rule carries the version it was introduced in and ``NORMALIZE_VERSION``
+is the newest one. Stores that remember which version a row was normalized
+with (``SQLiteStore.norm_version``) only need to run the rules added since,
+so changing the rules means appending one with a higher version, not
+rewriting the dataset.
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict, List, MutableMapping, Optional, Sequence, Tuple
+
+_FOR_WOMEN_AND_MEN = "for women and men"
+
+
+def _unisex(sex: str) -> str:
+    return "unisex" if sex == "women and men" else sex
+
+
+def _drop_for_women_and_men(name: str) -> str:
+    if not name:
+        return name
+    if _FOR_WOMEN_AND_MEN in name:
+        name = name.replace(_FOR_WOMEN_AND_MEN, "")
+    return " ".join(name.split())
+
+
+def _drop_trailing_brand(name: str, brand: object) -> str:
+    brand = brand.strip() if isinstance(brand, str) else ""
+    if brand and name.endswith(brand):
+        candidate = name[: -len(brand)].strip()
+        if candidate:  # never leave the name empty
+            return candidate
+    return name
+
+
+# (version, description, field, rule, other fields the rule reads); applied
+# in this order. A rule maps one string value (plus the other fields) to its
+# normalized form, so it works on a row and on whole columns alike.
+Rule = Tuple[int, str, str, Callable[..., str], Tuple[str, ...]]
+RULES: List[Rule] = [
+    (1, "sex 'women and men' -> 'unisex'", "sex", _unisex, ()),
+    (1, "drop 'for women and men' from the name", "name", _drop_for_women_and_men, ()),
+    (1, "drop a trailing brand from the name", "name", _drop_trailing_brand, ("brand",)),
+]
+
+NORMALIZE_VERSION: int = max(rule[0] for rule in RULES)
+
+
+def normalize_row(row: MutableMapping[str, object], since: int = 0) -> Dict[str, object]:
+    """Apply the rules newer than ``since`` to ``row`` in place.
+
+    Returns the fields that changed (empty when the row was already clean).
+    """
+    before = {"brand": row.get("brand"), "name": row.get("name"), "sex": row.get("sex")}
+    for version, _, field, rule, reads in RULES:
+        value = row.get(field)
+        if version > since and isinstance(value, str):
+            row[field] = rule(value, *(row.get(f) for f in reads))
+    return {k: row.get(k) for k, v in before.items() if row.get(k) != v}
+
+
+def normalize_columns(columns: Dict[str, Sequence[str]], since: int = 0) -> Dict[str, List[str]]:
+    """``normalize_row`` for a table held as columns (field -> values).
+
+    Each rule is mapped over its whole column at once, which is much faster
+    than building a dict per row. Returns the normalized columns the rules
+    touch that are present in ``columns``; the input is not modified.
+    """
+    out: Dict[str, List[str]] = {}
+    for version, _, field, rule, reads in RULES:
+        if version <= since or field not in columns:
+            continue
+        values = out.get(field, columns[field])
+        others = [out.get(f, columns.get(f)) or [""] * len(values) for f in reads]
+        out[field] = list(map(rule, values, *others))
+    return out
+
+
+def normalize_sex(sex: Optional[str]) -> Optional[str]:
+    """The sex rules alone, for callers that only extracted a sex."""
+    if not sex:
+        return sex
+    row: Dict[str, object] = {"sex": sex}
+    normalize_row(row)
+    return row["sex"]  # type: ignore[return-value]
+
+
+__all__ = ["NORMALIZE_VERSION", "RULES", "normalize_columns", "normalize_row", "normalize_sex"]
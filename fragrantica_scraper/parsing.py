@@ -2,31 +2,68 @@
 
 Contains functions that operate on BeautifulSoup documents or text to parse
 brands, names, ratings, and derive data from URLs.
+
+``scrape_perfume_page`` reads everything from one walk over the document
+(see ``PageText``) and works with any parser backend from html_backend.py;
+the ``parse_*_from_page`` helpers search a BeautifulSoup tree directly and
+give the same answers. ``scrape_perfume_bytes`` goes one step further and
+reads what it can straight from the response body (``RawPage``), building a
+document only for the fields it cannot settle that way.
 """
 from __future__ import annotations
 
+import html
+import json
 import re
-from typing import Optional, Tuple, Dict
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from bs4 import BeautifulSoup
 
 from .config import DESIGNER_LABEL_RE, RATING_VOTES_RE
+from .events import MAIN, START, TEXT, Event
+from .html_backend import HtmlDocument, as_document, parse_html
+from .normalize import normalize_row, normalize_sex
+
+CATEGORY_SEX_RE = re.compile(
+    r"is\s+an?\s+([^\.]+?)\s+fragrance\s+for\s+([^\.]+?)[\.\,]", re.IGNORECASE
+)
+SEX_ONLY_RE = re.compile(
+    r"is\s+a\s+fragrance\s+for\s+(.+?)[\.\,]", re.IGNORECASE
+)
+DESIGNER_VALUE_RE = re.compile(r"Designer\s+(.*)", re.IGNORECASE)
+FOR_SEX_SUFFIX_RE = re.compile(r"\s+for\s+(men|women|unisex)\s*$", re.IGNORECASE)
 
 
 def clean_space(s: str) -> str:
     return re.sub(r"\s+", " ", s or "").strip()
 
 
-def parse_brand_from_page(soup: BeautifulSoup) -> Optional[str]:
-    # Look for "Designer <Brand>"
-    for node in soup.find_all(text=DESIGNER_LABEL_RE):
+def _brand_from_designer_labels(parent_texts: Iterable[Callable[[], str]]) -> Optional[str]:
+    """First "Designer <Brand>" found in the text around a "Designer" label."""
+    for parent_text in parent_texts:
         try:
-            sibling_text = node.parent.get_text(" ", strip=True)
-            m = re.search(r"Designer\s+(.*)", sibling_text, re.IGNORECASE)
+            m = DESIGNER_VALUE_RE.search(parent_text())
             if m:
                 return clean_space(m.group(1))
         except Exception:
             pass
+    return None
+
+
+def _title_to_name(txt: str) -> Optional[str]:
+    txt = FOR_SEX_SUFFIX_RE.sub("", clean_space(txt))
+    return txt if txt else None
+
+
+def parse_brand_from_page(soup: BeautifulSoup) -> Optional[str]:
+    # Look for "Designer <Brand>"
+    brand = _brand_from_designer_labels(
+        (lambda node=node: node.parent.get_text(" ", strip=True))
+        for node in soup.find_all(string=DESIGNER_LABEL_RE)
+    )
+    if brand is not None:
+        return brand
     # Try a meta tag fallback
     og_title = soup.find("meta", attrs={"property": "og:title"})
     if og_title and og_title.get("content"):
@@ -39,16 +76,12 @@ def parse_name_from_page(soup: BeautifulSoup) -> Optional[str]:
     # Try the H1/H2
     h1 = soup.find(["h1", "h2"])
     if h1:
-        txt = clean_space(h1.get_text(" ", strip=True))
-        txt = re.sub(r"\s+for\s+(men|women|unisex)\s*$", "", txt, flags=re.IGNORECASE)
-        return txt if txt else None
+        return _title_to_name(h1.get_text(" ", strip=True))
 
     # Try og:title
     og_title = soup.find("meta", attrs={"property": "og:title"})
     if og_title and og_title.get("content"):
-        txt = clean_space(og_title["content"])
-        txt = re.sub(r"\s+for\s+(men|women|unisex)\s*$", "", txt, flags=re.IGNORECASE)
-        return txt if txt else None
+        return _title_to_name(og_title["content"])
 
     return None
 
@@ -83,39 +116,18 @@ def parse_brand_name_from_url(url: str) -> Tuple[Optional[str], Optional[str]]:
     return None, None
 
 
-def parse_category_and_sex(soup: BeautifulSoup) -> Tuple[Optional[str], Optional[str]]:
-    """Extract fragrance category and target sex from the opening description.
-
-    Parses patterns like:
-        "Orphéon Eau de Parfum by Diptyque is a Woody Chypre fragrance for women and men."
-    Returns:
-        (category, sex) e.g. ("Woody Chypre", "women and men")
-
-    Uses a 3-tier strategy to avoid false positives from unrelated page text:
-    1. Meta description tags (cleanest source)
-    2. Individual paragraph/div elements
-    3. Full page text with findall (prefer matches with category)
-
-    Never early-returns on sex-only matches — keeps searching all tiers for a
-    category+sex match first, falls back to sex-only at the very end.
-    """
-    CATEGORY_SEX_RE = re.compile(
-        r"is\s+an?\s+([^\.]+?)\s+fragrance\s+for\s+([^\.]+?)[\.\,]", re.IGNORECASE
-    )
-    SEX_ONLY_RE = re.compile(
-        r"is\s+a\s+fragrance\s+for\s+(.+?)[\.\,]", re.IGNORECASE
-    )
+def _match_category_and_sex(
+    meta_texts: Iterable[Optional[str]],
+    element_texts: Iterable[str],
+    page_text: Callable[[], str],
+) -> Tuple[Optional[str], Optional[str]]:
+    """The 3-tier search behind ``parse_category_and_sex``, on plain strings."""
     sex_fallback: Optional[str] = None  # best sex-only match across all tiers
 
-    # 1) Try meta description tags (cleanest source, no HTML noise)
-    for attr in (
-        {"name": "description"},
-        {"property": "og:description"},
-    ):
-        tag = soup.find("meta", attrs=attr)
-        if not (tag and tag.get("content")):
+    # 1) Meta description tags (cleanest source, no HTML noise)
+    for text in meta_texts:
+        if not text:
             continue
-        text = tag["content"]
         m = CATEGORY_SEX_RE.search(text)
         if m and len(clean_space(m.group(1))) <= 80:
             return clean_space(m.group(1)), clean_space(m.group(2))
@@ -124,9 +136,8 @@ def parse_category_and_sex(soup: BeautifulSoup) -> Tuple[Optional[str], Optional
             if m2:
                 sex_fallback = clean_space(m2.group(1))
 
-    # 2) Search individual elements (avoids cross-element false positives)
-    for el in soup.find_all(["p", "div", "span"]):
-        text = el.get_text(" ", strip=True)
+    # 2) Individual elements (avoids cross-element false positives)
+    for text in element_texts:
         if "fragrance for" not in text.lower():
             continue
         m = CATEGORY_SEX_RE.search(text)
@@ -140,13 +151,13 @@ def parse_category_and_sex(soup: BeautifulSoup) -> Tuple[Optional[str], Optional
                 sex_fallback = clean_space(m2.group(1))
 
     # 3) Fallback: full page text, findall to prefer matches with category
-    page_text = soup.get_text(" ", strip=True)
-    for cat_raw, sex_raw in CATEGORY_SEX_RE.findall(page_text):
+    full_text = page_text()
+    for cat_raw, sex_raw in CATEGORY_SEX_RE.findall(full_text):
         cat = clean_space(cat_raw)
         if len(cat) <= 80:
             return cat, clean_space(sex_raw)
     if sex_fallback is None:
-        m = SEX_ONLY_RE.search(page_text)
+        m = SEX_ONLY_RE.search(full_text)
         if m:
             sex_fallback = clean_space(m.group(1))
 
@@ -156,14 +167,360 @@ def parse_category_and_sex(soup: BeautifulSoup) -> Tuple[Optional[str], Optional
     return None, None
 
 
-def scrape_perfume_page(url: str, soup: BeautifulSoup) -> Dict[str, object]:
-    """Extract brand, name, rating, votes from a fragrance detail page."""
-    page_text = soup.get_text(" ", strip=True)
-    rating, votes = parse_rating_votes_from_text(page_text)
+def parse_category_and_sex(soup: BeautifulSoup) -> Tuple[Optional[str], Optional[str]]:
+    """Extract fragrance category and target sex from the opening description.
 
-    brand = parse_brand_from_page(soup)
-    name = parse_name_from_page(soup)
+    Parses patterns like:
+        "Orphéon Eau de Parfum by Diptyque is a Woody Chypre fragrance for women and men."
+    Returns:
+        (category, sex) e.g. ("Woody Chypre", "women and men")
+
+    Uses a 3-tier strategy to avoid false positives from unrelated page text:
+    1. Meta description tags (cleanest source)
+    2. Individual paragraph/div elements
+    3. Full page text with findall (prefer matches with category)
+
+    Never early-returns on sex-only matches — keeps searching all tiers for a
+    category+sex match first, falls back to sex-only at the very end.
+    """
+    metas = (soup.find("meta", attrs=attr) for attr in ({"name": "description"}, {"property": "og:description"}))
+    return _match_category_and_sex(
+        (tag.get("content") if tag else None for tag in metas),
+        (el.get_text(" ", strip=True) for el in soup.find_all(["p", "div", "span"])),
+        lambda: soup.get_text(" ", strip=True),
+    )
+
+
+class _Element:
+    """Where an element's strings sit in ``PageText``'s string list for its kind."""
+
+    __slots__ = ("kind", "start", "end")
+
+    def __init__(self, kind: str, start: int) -> None:
+        self.kind = kind  # which strings its get_text collects (see events.py)
+        self.start = start
+        self.end = -1
 
+
+class PageText:
+    """Everything ``scrape_perfume_page`` needs, collected in one walk.
+
+    The old extraction called ``get_text`` on the whole page, again on every
+    ``p``/``div``/``span`` (quadratic on nested divs) and once more as a last
+    resort. Here every stripped string is stored once; the text of any element
+    is a slice of the joined page text, since an element's strings are
+    contiguous in document order.
+    """
+
+    _BLOCKS = frozenset(("p", "div", "span"))
+    _HEADINGS = frozenset(("h1", "h2"))
+    _METAS = (("name", "description"), ("property", "og:description"), ("property", "og:title"))
+    _NEEDLE = "fragrance for"
+
+    def __init__(self, events: Iterable[Event]) -> None:
+        strings: Dict[str, List[str]] = {MAIN: []}
+        main = strings[MAIN]
+        root = _Element(MAIN, 0)
+        stack: List[_Element] = [root]
+        blocks: List[_Element] = []
+        designer_parents: List[_Element] = []
+        heading: Optional[_Element] = None
+        metas: Dict[Tuple[str, str], object] = {}
+
+        for event, value, extra in events:
+            if event == TEXT:
+                if DESIGNER_LABEL_RE.search(value):
+                    designer_parents.append(stack[-1])
+                stripped = value.strip()
+                if stripped:
+                    if extra == MAIN:
+                        main.append(stripped)
+                    else:
+                        strings.setdefault(extra, []).append(stripped)
+            elif event == START:
+                attrs, kind = extra
+                el = _Element(kind, len(main) if kind == MAIN else len(strings.setdefault(kind, [])))
+                stack.append(el)
+                if value in self._BLOCKS:
+                    blocks.append(el)
+                elif heading is None and value in self._HEADINGS:
+                    heading = el
+                elif value == "meta":
+                    for key in self._METAS:
+                        if key not in metas and attrs.get(key[0]) == key[1]:
+                            metas[key] = attrs.get("content")
+            else:
+                el = stack.pop()
+                el.end = len(main) if el.kind == MAIN else len(strings[el.kind])
+        while len(stack) > 1:
+            el = stack.pop()
+            el.end = len(strings[el.kind])
+        root.end = len(main)
+
+        self._strings = strings
+        self._offsets: List[int] = []
+        pos = 0
+        for s in main:
+            self._offsets.append(pos)
+            pos += len(s) + 1
+        self.text = " ".join(main)
+        self._blocks = blocks
+        self._designer_parents = designer_parents
+        self._heading = heading
+        self._metas = metas
+
+    def _span(self, el: _Element) -> Tuple[int, int]:
+        if el.end <= el.start:
+            return 0, 0
+        return self._offsets[el.start], self._offsets[el.end - 1] + len(self._strings[MAIN][el.end - 1])
+
+    def text_of(self, el: _Element) -> str:
+        """``el.get_text(" ", strip=True)`` without walking the element again."""
+        if el.kind != MAIN:
+            return " ".join(self._strings[el.kind][el.start:el.end])
+        start, end = self._span(el)
+        return self.text[start:end]
+
+    def _candidate_blocks(self) -> Iterable[str]:
+        # Only elements whose text contains the needle can match; find those
+        # with one scan of the page instead of lowercasing every element.
+        lowered = self.text.lower()
+        if len(lowered) != len(self.text):
+            # Offsets would not line up; check each element the slow way
+            yield from (self.text_of(el) for el in self._blocks)
+            return
+        hits = [m.start() for m in re.finditer(re.escape(self._NEEDLE), lowered)]
+        if not hits:
+            return
+        for el in self._blocks:
+            start, end = self._span(el)
+            i = bisect_left(hits, start)
+            if i < len(hits) and hits[i] + len(self._NEEDLE) <= end:
+                yield self.text[start:end]
+
+    def rating_votes(self) -> Tuple[Optional[float], Optional[int]]:
+        return parse_rating_votes_from_text(self.text)
+
+    def brand(self) -> Optional[str]:
+        return _brand_from_designer_labels((lambda el=el: self.text_of(el)) for el in self._designer_parents)
+
+    def name(self) -> Optional[str]:
+        if self._heading is not None:
+            return _title_to_name(self.text_of(self._heading))
+        og_title = self._metas.get(("property", "og:title"))
+        if og_title:
+            return _title_to_name(og_title)
+        return None
+
+    def category_and_sex(self) -> Tuple[Optional[str], Optional[str]]:
+        return _match_category_and_sex(
+            (self._metas.get(("name", "description")), self._metas.get(("property", "og:description"))),
+            self._candidate_blocks(),
+            lambda: self.text,
+        )
+
+
+def extract_page(doc: Union[HtmlDocument, BeautifulSoup]) -> PageText:
+    """Collect the text and candidates of a parsed page in a single pass."""
+    return PageText(as_document(doc).events())
+
+
+# ---------------------------------------------------------------------------
+# Raw-bytes fast path
+# ---------------------------------------------------------------------------
+
+# Marker for "the fast path cannot tell, ask the DOM"
+UNKNOWN = object()
+
+_ATTRS = rb"""(?:[^>"']|"[^"]*"|'[^']*')*"""
+_TAG = rb"<[a-zA-Z/!?]" + _ATTRS + rb">"
+_TAG_RE = re.compile(_TAG)
+# Content BeautifulSoup leaves out of get_text(); blanked before anything else
+_NOISE_RE = re.compile(
+    rb"<(script|style|template|rt|rp)\b" + _ATTRS + rb">(.*?)</\1\s*>|<!--(.*?)-->", re.I | re.S
+)
+# Anything the blanking could not pair up, or markup parsers disagree on
+_LEFTOVER_RE = re.compile(rb"<(?:script|style|template|rt|rp)\b|<!--|<!\[CDATA\[", re.I)
+# "Designer" at the start of a string hidden in script/comment/template text
+_LEADING_LABEL_RE = re.compile(rb"^\s*designer", re.I)
+_NESTED_LABEL_RE = re.compile(rb"(?:^|>)\s*designer", re.I)
+_SEP = rb"(?:\s|&nbsp;|&#160;|&#xa0;|\xc2?\xa0|" + _TAG + rb")+"
+_RAW_RATING_RE = re.compile(
+    rb"Perfume" + _SEP + rb"rating" + _SEP + rb"([0-9]+(?:\.[0-9]+)?)" + _SEP + rb"out" + _SEP + rb"of"
+    + _SEP + rb"5" + _SEP + rb"with" + _SEP + rb"([\d,]+)" + _SEP + rb"votes",
+    re.I,
+)
+_JSONLD_RE = re.compile(
+    rb"<script\b[^>]*type\s*=\s*[\"']?application/ld\+json[\"']?[^>]*>(.*?)</script\s*>", re.I | re.S
+)
+_META_RE = re.compile(rb"<meta\b(" + _ATTRS + rb")>", re.I)
+_ATTR_RE = re.compile(rb"""([^\s=/>"']+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>"']+)))?""")
+_HEADING_RE = re.compile(rb"<(h[12])\b" + _ATTRS + rb">", re.I)
+_LABEL_RE = re.compile(rb"(?:^|>)(?=(?:\s|&nbsp;|&#160;|&#xa0;|\xc2?\xa0)*designer)", re.I)
+_OPEN_TAG_RE = re.compile(rb"<([a-zA-Z][a-zA-Z0-9]*)" + _ATTRS + rb">\Z")
+_VOID_TAGS = frozenset(
+    b"area base br col embed hr img input link meta param source track wbr".split()
+)
+# Elements whose end tag may be left out; a block start inside them ends them
+_OPTIONAL_END = frozenset(b"p li dt dd tr td th option".split())
+_BLOCK_START_RE = re.compile(
+    rb"<(?:address|article|aside|blockquote|div|dl|dd|dt|fieldset|figure|footer|form|h[1-6]|header|hr"
+    rb"|li|main|nav|ol|p|pre|section|table|td|th|tr|ul)\b",
+    re.I,
+)
+
+
+def _find_aggregate_rating(node: object) -> Optional[dict]:
+    if isinstance(node, dict):
+        agg = node.get("aggregateRating")
+        if isinstance(agg, dict):
+            return agg
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    else:
+        return None
+    for child in children:
+        found = _find_aggregate_rating(child)
+        if found is not None:
+            return found
+    return None
+
+
+class RawPage:
+    """Perfume fields read with byte-level regexes, no tree built.
+
+    Every method returns what ``PageText`` would return for the same page,
+    or ``UNKNOWN`` when the markup is not simple enough to be sure (the
+    caller then builds the DOM for that field only). Rating/votes fall back
+    to JSON-LD ``aggregateRating`` when the visible text has none.
+    """
+
+    def __init__(self, content: bytes, encoding: Optional[str] = None) -> None:
+        self.content = content
+        self.encoding = encoding or "utf-8"
+        self._designer_in_noise = False
+        self.cleaned = _NOISE_RE.sub(self._blank, content)
+        # Give up on pages where blanking was not clean
+        self.usable = _LEFTOVER_RE.search(self.cleaned) is None
+        self._metas: Optional[Dict[Tuple[str, str], Optional[str]]] = None
+
+    def _blank(self, m: "re.Match[bytes]") -> bytes:
+        # A "Designer" label inside script/comment text is still a candidate
+        # for parse_brand_from_page; remember that and let the DOM decide.
+        name = (m.group(1) or b"").lower()
+        body = m.group(2) if name else m.group(3)
+        label = _NESTED_LABEL_RE if name in (b"template", b"rt", b"rp") else _LEADING_LABEL_RE
+        if label.search(body or b""):
+            self._designer_in_noise = True
+        return b" "
+
+    def _decode(self, raw: bytes) -> str:
+        return raw.decode(self.encoding, errors="replace")
+
+    def _text(self, fragment: bytes) -> str:
+        """``get_text(" ", strip=True)`` of a markup fragment."""
+        parts = []
+        for segment in _TAG_RE.split(fragment):
+            text = html.unescape(self._decode(segment)).strip()
+            if text:
+                parts.append(text)
+        return " ".join(parts)
+
+    def _inside_tag(self, pos: int) -> bool:
+        return self.cleaned.rfind(b"<", 0, pos) > self.cleaned.rfind(b">", 0, pos)
+
+    def _element_inner(self, name: bytes, start: int) -> Optional[bytes]:
+        """Markup between an open tag ending at ``start`` and its end tag, if unambiguous."""
+        pattern = re.compile(rb"<(/?)" + re.escape(name) + rb"\b" + _ATTRS + rb">", re.I)
+        depth = 1
+        for m in pattern.finditer(self.cleaned, start):
+            depth += -1 if m.group(1) else 1
+            if depth == 0:
+                inner = self.cleaned[start:m.start()]
+                if name.lower() in _OPTIONAL_END and _BLOCK_START_RE.search(inner):
+                    return None
+                return inner
+        return None
+
+    # -- fields ---------------------------------------------------------------
+
+    def rating_votes(self):
+        if not self.usable:
+            return UNKNOWN
+        for m in _RAW_RATING_RE.finditer(self.cleaned):
+            if not self._inside_tag(m.start()):
+                return float(m.group(1)), int(m.group(2).replace(b",", b""))
+        for m in _JSONLD_RE.finditer(self.content):
+            try:
+                agg = _find_aggregate_rating(json.loads(self._decode(m.group(1))))
+                if agg is None:
+                    continue
+                count = agg.get("ratingCount", agg.get("reviewCount"))
+                return float(str(agg["ratingValue"])), int(str(count).replace(",", ""))
+            except (ValueError, KeyError, TypeError):
+                continue
+        return UNKNOWN
+
+    def name(self):
+        if not self.usable:
+            return UNKNOWN
+        m = _HEADING_RE.search(self.cleaned)
+        if m is None:
+            og_title = self._meta("property", "og:title")
+            return _title_to_name(og_title) if og_title else None
+        inner = self._element_inner(m.group(1), m.end())
+        if inner is None or _HEADING_RE.search(inner):
+            return UNKNOWN
+        return _title_to_name(self._text(inner))
+
+    def brand(self):
+        if not self.usable or self._designer_in_noise:
+            return UNKNOWN
+        for m in _LABEL_RE.finditer(self.cleaned):
+            pos = m.start() + (1 if self.cleaned[m.start():m.start() + 1] == b">" else 0)
+            if pos == 0 or self._inside_tag(pos):
+                return UNKNOWN
+            # The label's parent must be the element opened right before it
+            lt = self.cleaned.rfind(b"<", 0, pos)
+            tag = _OPEN_TAG_RE.match(self.cleaned[lt:pos])
+            if tag is None or tag.group(1).lower() in _VOID_TAGS:
+                return UNKNOWN
+            inner = self._element_inner(tag.group(1), pos)
+            if inner is None:
+                return UNKNOWN
+            m2 = DESIGNER_VALUE_RE.search(self._text(inner))
+            if m2:
+                return clean_space(m2.group(1))
+        return None
+
+    def _meta(self, key: str, value: str) -> Optional[str]:
+        if self._metas is None:
+            self._metas = {}
+            for m in _META_RE.finditer(self.cleaned):
+                attrs: Dict[str, str] = {}
+                for a in _ATTR_RE.finditer(m.group(1)):
+                    val = a.group(2) if a.group(2) is not None else a.group(3) if a.group(3) is not None else a.group(4)
+                    attrs.setdefault(self._decode(a.group(1)).lower(), html.unescape(self._decode(val or b"")))
+                for k in (("name", "description"), ("property", "og:description"), ("property", "og:title")):
+                    if k not in self._metas and attrs.get(k[0]) == k[1]:
+                        self._metas[k] = attrs.get("content")
+        return self._metas.get((key, value))
+
+    def category_and_sex(self):
+        """Only the meta-description tier; anything else needs the element tiers."""
+        if not self.usable:
+            return UNKNOWN
+        for text in (self._meta("name", "description"), self._meta("property", "og:description")):
+            if not text:
+                continue
+            m = CATEGORY_SEX_RE.search(text)
+            if m and len(clean_space(m.group(1))) <= 80:
+                return clean_space(m.group(1)), clean_space(m.group(2))
+        return UNKNOWN
+
+
+def _perfume_record(url: str, brand, name, rating, votes, category, sex) -> Dict[str, object]:
     # Fallbacks from URL when needed
     u_brand, u_name = parse_brand_name_from_url(url)
     if brand is None:
@@ -175,9 +532,7 @@ def scrape_perfume_page(url: str, soup: BeautifulSoup) -> Dict[str, object]:
     brand = clean_space(brand or "")
     name = clean_space(name or "")
 
-    category, sex = parse_category_and_sex(soup)
-
-    return {
+    record: Dict[str, object] = {
         "brand": brand or None,
         "name": name or None,
         "rating": rating,
@@ -185,3 +540,65 @@ def scrape_perfume_page(url: str, soup: BeautifulSoup) -> Dict[str, object]:
         "sex": sex or "",
         "fragrance_category": category or "",
     }
+    normalize_row(record)
+    return record
+
+
+def scrape_perfume_page(url: str, doc: Union[HtmlDocument, BeautifulSoup]) -> Dict[str, object]:
+    """Extract brand, name, rating, votes from a fragrance detail page."""
+    page = extract_page(doc)
+    rating, votes = page.rating_votes()
+    category, sex = page.category_and_sex()
+    return _perfume_record(url, page.brand(), page.name(), rating, votes, category, sex)
+
+
+def scrape_perfume_bytes(
+    url: str,
+    content: bytes,
+    encoding: Optional[str] = None,
+    html_parser: Optional[str] = None,
+) -> Dict[str, object]:
+    """``scrape_perfume_page`` on a raw response body.
+
+    Fields are read with ``RawPage`` first; the document is only parsed (with
+    ``html_parser``, see html_backend.py) when one of them comes back UNKNOWN.
+    """
+    raw = RawPage(content, encoding)
+    page: Optional[PageText] = None
+
+    def dom() -> PageText:
+        nonlocal page
+        if page is None:
+            text = content.decode(encoding or "utf-8", errors="replace")
+            page = extract_page(parse_html(text, html_parser))
+        return page
+
+    rating_votes = raw.rating_votes()
+    if rating_votes is UNKNOWN:
+        rating_votes = dom().rating_votes()
+    brand = raw.brand()
+    if brand is UNKNOWN:
+        brand = dom().brand()
+    name = raw.name()
+    if name is UNKNOWN:
+        name = dom().name()
+    category_sex = raw.category_and_sex()
+    if category_sex is UNKNOWN:
+        category_sex = dom().category_and_sex()
+    rating, votes = rating_votes
+    category, sex = category_sex
+    return _perfume_record(url, brand, name, rating, votes, category, sex)
+
+
+def category_and_sex_from_bytes(
+    content: bytes,
+    encoding: Optional[str] = None,
+    html_parser: Optional[str] = None,
+) -> Tuple[Optional[str], Optional[str]]:
+    """``PageText.category_and_sex`` on a raw response body (meta tier first)."""
+    found = RawPage(content, encoding).category_and_sex()
+    if found is UNKNOWN:
+        text = content.decode(encoding or "utf-8", errors="replace")
+        found = extract_page(parse_html(text, html_parser)).category_and_sex()
+    category, sex = found
+    return category, normalize_sex(sex)
@@ -0,0 +1,169 @@
+"""Fetch -> parse -> store pipeline.
+
+Parsing a perfume page is pure CPU work and used to run on the fetching
+thread, so every page parsed was time the next request sat waiting (and,
+with threads, the GIL made things worse). ``ParsePipeline`` splits the
+three stages:
+
+    * fetchers (the sequential loop, or the async engine's workers) hand the
+      raw response bytes to ``submit``
+    * a ``ProcessPoolExecutor`` runs the parse function on them
+    * a single writer thread receives the parsed results, in completion
+      order, and is the only place that stores anything
+
+At most ``max_pending`` pages are in flight between ``submit`` and the
+writer; past that ``submit`` blocks, which holds the fetchers back instead
+of letting parsed-but-unsaved pages pile up in memory. With a polite crawl
+delay the fetchers are the bottleneck and ``submit`` never waits.
+
+``workers=0`` parses on the writer thread instead of in child processes
+(still off the fetching thread); useful for tests and tiny runs where
+starting processes costs more than it saves.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Optional, Tuple
+
+# Store callback: (job, parsed result or None, exception or None)
+StoreFn = Callable[[Any, Any, Optional[BaseException]], None]
+
+
+def default_parse_workers() -> int:
+    """Leave one core for the fetchers and the writer, cap at 4."""
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+class ParsePipeline:
+    """Bounded hand-off from fetchers to a parser pool and one store writer."""
+
+    def __init__(
+        self,
+        parse: Callable[..., Any],
+        store: StoreFn,
+        *,
+        workers: Optional[int] = None,
+        max_pending: int = 0,
+    ) -> None:
+        self.parse = parse
+        self.store = store
+        self.workers = default_parse_workers() if workers is None else max(0, workers)
+        self.max_pending = max_pending if max_pending > 0 else max(4, 4 * self.workers)
+        self._executor = ProcessPoolExecutor(self.workers) if self.workers > 0 else None
+        self._cond = threading.Condition()
+        self._ready: Deque[Tuple[Any, Any]] = deque()
+        self._pending = 0
+        self._closed = False
+        # Stats
+        self.submitted = 0
+        self.stored = 0
+        self.errors = 0
+        self.blocked_seconds = 0.0
+        self._writer = threading.Thread(target=self._write_loop, name="pipeline-writer", daemon=True)
+        self._writer.start()
+
+    def _reserve(self) -> None:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("pipeline is closed")
+            if self._pending >= self.max_pending:
+                started = time.monotonic()
+                while self._pending >= self.max_pending:
+                    self._cond.wait()
+                self.blocked_seconds += time.monotonic() - started
+            self._pending += 1
+            self.submitted += 1
+
+    def submit(self, job: Any, *args: Any) -> None:
+        """Queue ``parse(*args)``; ``store(job, ...)`` gets the result later.
+
+        Blocks while ``max_pending`` pages are already waiting to be stored.
+        """
+        self._reserve()
+        if self._executor is None:
+            self._hand_over(job, args)
+            return
+        try:
+            future = self._executor.submit(self.parse, *args)
+        except Exception as e:  # e.g. BrokenProcessPool
+            future = Future()
+            future.set_exception(e)
+        future.add_done_callback(lambda f, job=job: self._hand_over(job, f))
+
+    def submit_parsed(self, job: Any, data: Any) -> None:
+        """Hand ``store(job, data, None)`` to the writer with nothing to parse.
+
+        For results the fetcher already has (e.g. a page that did not
+        change), so they are stored on the writer thread like the rest.
+        """
+        self._reserve()
+        future: Future = Future()
+        future.set_result(data)
+        self._hand_over(job, future)
+
+    def _hand_over(self, job: Any, payload: Any) -> None:
+        with self._cond:
+            self._ready.append((job, payload))
+            self._cond.notify_all()
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._ready and not (self._closed and self._pending == 0):
+                    self._cond.wait()
+                if not self._ready:
+                    return
+                job, payload = self._ready.popleft()
+            data, error = None, None
+            try:
+                data = payload.result() if isinstance(payload, Future) else self.parse(*payload)
+            except Exception as e:
+                error = e
+            try:
+                self.store(job, data, error)
+            except Exception as e:
+                error = e
+                print(f"[error] Storing a parsed page failed: {e}")
+            with self._cond:
+                self._pending -= 1
+                self.stored += 1
+                if error is not None:
+                    self.errors += 1
+                self._cond.notify_all()
+
+    def join(self) -> None:
+        """Wait until everything submitted so far has been stored."""
+        with self._cond:
+            while self._pending:
+                self._cond.wait()
+
+    def close(self) -> None:
+        """Store whatever is still in flight, then stop the workers."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def report(self) -> str:
+        where = f"{self.workers} parser process(es)" if self.workers else "parsing on the writer thread"
+        return (
+            f"{self.stored}/{self.submitted} stored, {self.errors} errors, {where}, "
+            f"fetchers waited {self.blocked_seconds:.1f}s on backpressure"
+        )
+
+    def __enter__(self) -> "ParsePipeline":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+__all__ = ["ParsePipeline", "default_parse_workers"]
@@ -0,0 +1,271 @@
+"""Proxy loading and health-aware proxy selection.
+
+``ProxyPool`` replaces the round-robin ``get_next_proxy`` closures that used to
+live in ``crawl()``, brand mode and ``enrich.py``. It keeps per-proxy health
+(EWMA latency, success rate, 403/429 ratio, cooldown) and hands out the best
+proxy that is not cooling down, so slow or banned proxies stop eating requests.
+
+It also keeps the per-identity sessions: every proxy (and the direct
+connection, ``None``) counts the pages saved through it, and after
+``session_size`` of them only that identity rests for ``session_break``
+seconds while the others keep going.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def load_proxies(args) -> List[str]:
+    """Load proxies from ``--proxy`` and/or ``--proxies-file``.
+
+    A ``proxy_list`` attribute (set by ``--parallel-brands`` for each brand's
+    share of the proxies) takes precedence over both.
+    """
+    if getattr(args, "proxy_list", None) is not None:
+        return list(args.proxy_list)
+    proxies: List[str] = []
+    if getattr(args, "proxy", None):
+        proxies.append(args.proxy.strip())
+    if getattr(args, "proxies_file", None):
+        try:
+            with open(args.proxies_file, "r", encoding="utf-8") as pf:
+                for line in pf:
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    proxies.append(line)
+            if proxies:
+                print(f"[proxy] Loaded {len(proxies)} proxy(ies) from {args.proxies_file}")
+        except FileNotFoundError:
+            if args.proxies_file != "proxies.txt":  # Only warn if user explicitly specified a file
+                print(f"[warn] Proxies file not found: {args.proxies_file}")
+        except Exception as e:
+            print(f"[warn] Could not read proxies file {args.proxies_file}: {e}")
+    return proxies
+
+
+@dataclass
+class ProxyStats:
+    """Running health numbers for one proxy."""
+
+    latency: Optional[float] = None  # EWMA of response time, seconds
+    requests: int = 0
+    successes: int = 0
+    blocks: int = 0  # 403/429 responses
+    failures: int = 0  # proxy/connection errors
+    consecutive_blocks: int = 0
+    consecutive_failures: int = 0
+    cooldown_until: float = 0.0
+    last_picked: float = 0.0
+
+    @property
+    def success_rate(self) -> float:
+        # Laplace smoothing so untried proxies start at 0.5, not 0 or 1
+        return (self.successes + 1) / (self.requests + 2)
+
+    @property
+    def block_ratio(self) -> float:
+        return self.blocks / (self.requests + 1)
+
+
+class ProxyPool:
+    """Pick the healthiest available proxy and learn from every response.
+
+    Scoring favours a high success rate, a low 403/429 ratio and low latency.
+    A 403/429 puts the proxy into an exponentially growing cooldown; repeated
+    connection errors do the same after ``max_consecutive_failures``. A
+    proxy resting after its session (``record_save``) is skipped the same
+    way. When every proxy is cooling down or resting, the one that comes
+    back first is returned.
+    """
+
+    def __init__(
+        self,
+        proxies: Iterable[str],
+        *,
+        alpha: float = 0.3,
+        block_cooldown: float = 60.0,
+        failure_cooldown: float = 30.0,
+        max_cooldown: float = 1800.0,
+        max_consecutive_failures: int = 3,
+        session_size: int = 0,
+        session_break: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.proxies: List[str] = list(dict.fromkeys(proxies))
+        self.alpha = alpha
+        self.block_cooldown = block_cooldown
+        self.failure_cooldown = failure_cooldown
+        self.max_cooldown = max_cooldown
+        self.max_consecutive_failures = max_consecutive_failures
+        self.clock = clock
+        self.stats: Dict[str, ProxyStats] = {p: ProxyStats() for p in self.proxies}
+        self.session_size = session_size
+        self.session_break = session_break
+        # identity (None = direct) -> pages saved in its current session / end of its rest
+        self._session_saves: Dict[Optional[str], int] = {}
+        self._rest_until: Dict[Optional[str], float] = {}
+        self.rests = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.proxies)
+
+    def __bool__(self) -> bool:
+        return bool(self.proxies)
+
+    def _known_latency(self) -> Optional[float]:
+        known = [s.latency for s in self.stats.values() if s.latency is not None]
+        return min(known) if known else None
+
+    def score(self, proxy: str) -> float:
+        st = self.stats[proxy]
+        latency = st.latency
+        if latency is None:
+            # Be optimistic about proxies we have not timed yet so they get tried
+            latency = self._known_latency() or 0.0
+        return st.success_rate * (1.0 - st.block_ratio) / (1.0 + latency)
+
+    def cooldown_remaining(self, proxy: Optional[str]) -> float:
+        if proxy is None or proxy not in self.stats:
+            return 0.0
+        return max(0.0, self.stats[proxy].cooldown_until - self.clock())
+
+    def rest_remaining(self, proxy: Optional[str]) -> float:
+        return max(0.0, self._rest_until.get(proxy, 0.0) - self.clock())
+
+    def wait_time(self, proxy: Optional[str]) -> float:
+        """Seconds until ``proxy`` may be used again (cooldown or session rest)."""
+        return max(self.cooldown_remaining(proxy), self.rest_remaining(proxy))
+
+    def _available_at(self, proxy: str) -> float:
+        return max(self.stats[proxy].cooldown_until, self._rest_until.get(proxy, 0.0))
+
+    def next_proxy(self, exclude: Optional[str] = None) -> Optional[str]:
+        """Return the best proxy that is not cooling down (``None`` without proxies).
+
+        ``exclude`` is skipped when there is any alternative, which is what a
+        rotation wants: move away from the current proxy.
+        """
+        if not self.proxies:
+            return None
+        with self._lock:
+            now = self.clock()
+            available = [p for p in self.proxies if self._available_at(p) <= now]
+            if len(available) > 1 and exclude in available:
+                available.remove(exclude)
+            if not available:
+                choice = min(self.proxies, key=self._available_at)
+                wait = self._available_at(choice) - now
+                print(f"[warn] All proxies are cooling down or resting; using {choice} (available in {wait:.0f}s)")
+            else:
+                # Best score first; among equals, the one idle the longest
+                choice = max(available, key=lambda p: (self.score(p), -self.stats[p].last_picked))
+            self.stats[choice].last_picked = now
+            return choice
+
+    def ready(self, current: Optional[str]) -> Tuple[Optional[str], float]:
+        """``current`` if it may be used now, else the best other proxy; plus the seconds to wait for it."""
+        if self.wait_time(current) <= 0:
+            return current, 0.0
+        choice = self.next_proxy(exclude=current)
+        return choice, self.wait_time(choice)
+
+    def record_save(self, proxy: Optional[str]) -> float:
+        """Count a page saved through ``proxy``; returns the rest it starts (0 if none).
+
+        After ``session_size`` saves the identity rests for ``session_break``
+        seconds; ``next_proxy`` skips it meanwhile.
+        """
+        if self.session_size <= 0 or self.session_break <= 0:
+            return 0.0
+        with self._lock:
+            saves = self._session_saves.get(proxy, 0) + 1
+            if saves < self.session_size:
+                self._session_saves[proxy] = saves
+                return 0.0
+            self._session_saves[proxy] = 0
+            self._rest_until[proxy] = self.clock() + self.session_break
+            self.rests += 1
+        print(f"[session] {proxy or '<direct>'} saved {self.session_size} pages; resting it for {self.session_break:.0f}s")
+        return self.session_break
+
+    def record_success(self, proxy: Optional[str], latency: Optional[float] = None) -> None:
+        if proxy is None or proxy not in self.stats:
+            return
+        with self._lock:
+            st = self.stats[proxy]
+            st.requests += 1
+            st.successes += 1
+            st.consecutive_blocks = 0
+            st.consecutive_failures = 0
+            if latency is not None:
+                st.latency = latency if st.latency is None else (
+                    self.alpha * latency + (1.0 - self.alpha) * st.latency
+                )
+
+    def record_block(self, proxy: Optional[str], status: int) -> float:
+        """Record a 403/429 and put the proxy into cooldown. Returns the cooldown length."""
+        if proxy is None or proxy not in self.stats:
+            return 0.0
+        with self._lock:
+            st = self.stats[proxy]
+            st.requests += 1
+            st.blocks += 1
+            st.consecutive_blocks += 1
+            cooldown = min(self.max_cooldown, self.block_cooldown * (2 ** (st.consecutive_blocks - 1)))
+            st.cooldown_until = max(st.cooldown_until, self.clock() + cooldown)
+        print(f"[proxy] {proxy} got {status}; cooling down for {cooldown:.0f}s")
+        return cooldown
+
+    def record_failure(self, proxy: Optional[str]) -> float:
+        """Record a proxy/connection error. Returns the cooldown applied (0 if none)."""
+        if proxy is None or proxy not in self.stats:
+            return 0.0
+        with self._lock:
+            st = self.stats[proxy]
+            st.requests += 1
+            st.failures += 1
+            st.consecutive_failures += 1
+            if st.consecutive_failures < self.max_consecutive_failures:
+                return 0.0
+            overflow = st.consecutive_failures - self.max_consecutive_failures
+            cooldown = min(self.max_cooldown, self.failure_cooldown * (2 ** overflow))
+            st.cooldown_until = max(st.cooldown_until, self.clock() + cooldown)
+        print(f"[proxy] {proxy} failed {st.consecutive_failures}x in a row; cooling down for {cooldown:.0f}s")
+        return cooldown
+
+    def report(self) -> List[str]:
+        """One human-readable line per proxy, best first."""
+        lines = []
+        for p in sorted(self.proxies, key=self.score, reverse=True):
+            st = self.stats[p]
+            latency = f"{st.latency:.2f}s" if st.latency is not None else "n/a"
+            lines.append(
+                f"{p}: {st.successes}/{st.requests} ok, {st.blocks} blocked, "
+                f"{st.failures} errors, latency {latency}"
+            )
+        if self.rests:
+            lines.append(f"{self.rests} session rests of {self.session_break:.0f}s")
+        return lines
+
+
+def build_proxy_pool(args, proxies: Optional[List[str]] = None) -> ProxyPool:
+    """The pool for one run: ``args.shared_proxy_pool`` when set, else a new one.
+
+    A shared pool (multi-brand runs) keeps every proxy's session going from
+    one brand to the next. Sessions come from ``--session-size`` and
+    ``--session-break-seconds``; replaying from the cache never rests.
+    """
+    shared = getattr(args, "shared_proxy_pool", None)
+    if shared is not None:
+        return shared
+    replay = bool(getattr(args, "replay", False))
+    return ProxyPool(
+        load_proxies(args) if proxies is None else proxies,
+        session_size=0 if replay else int(getattr(args, "session_size", 0) or 0),
+        session_break=float(getattr(args, "session_break_seconds", 0) or 0),
+    )
@@ -0,0 +1,141 @@
+"""Compact "already queued" set for long free crawls.
+
+A set of URL strings costs ~100 bytes per URL and never shrinks, so an
+unbounded crawl (no --brand, --max-pages 0) eventually runs out of memory on
+``seen`` alone. ``SeenSet`` splits URLs in two:
+
+    * perfume pages are tracked exactly, one bit per numeric perfume ID
+      (``-<id>.html``), the same way the saved-ID index does it
+    * everything else (designer and navigation pages) goes into a scalable
+      Bloom filter: ~2 bytes per URL at the default 0.1% error rate, and it
+      grows by adding filters rather than by rehashing
+
+A false positive only means a designer/navigation page is taken for already
+queued and not crawled; perfume pages are never skipped by mistake.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+from typing import List
+
+from .id_index import perfume_id
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter for ``capacity`` items at ``error_rate``."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> List[int]:
+        # Double hashing (Kirsch-Mitzenmacher) off one 128-bit digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key: str) -> None:
+        bits = self.bits
+        for p in self._positions(key):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class ScalableBloomFilter:
+    """Bloom filters added as needed, each larger and stricter than the last.
+
+    The error rates form a geometric series (``tightening``), so the overall
+    false-positive rate stays under ``error_rate`` however far it grows.
+    """
+
+    def __init__(
+        self,
+        initial_capacity: int = 100_000,
+        error_rate: float = 0.001,
+        growth: int = 2,
+        tightening: float = 0.5,
+    ) -> None:
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.filters: List[BloomFilter] = []
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in f for f in reversed(self.filters))
+
+    def add(self, key: str) -> bool:
+        """Add ``key``; False if it (probably) was already there."""
+        if key in self:
+            return False
+        if not self.filters or self.filters[-1].full:
+            i = len(self.filters)
+            self.filters.append(BloomFilter(
+                self.initial_capacity * self.growth ** i,
+                self.error_rate * (1 - self.tightening) * self.tightening ** i,
+            ))
+        self.filters[-1].add(key)
+        return True
+
+    def __len__(self) -> int:
+        return sum(f.count for f in self.filters)
+
+    def memory_bytes(self) -> int:
+        return sum(len(f.bits) for f in self.filters)
+
+
+class SeenSet:
+    """Exact perfume IDs plus a Bloom filter for every other URL."""
+
+    def __init__(self, initial_capacity: int = 100_000, error_rate: float = 0.001) -> None:
+        self.ids = bytearray()
+        self.perfumes = 0
+        self.others = ScalableBloomFilter(initial_capacity, error_rate)
+
+    def _has_id(self, i: int) -> bool:
+        byte = i >> 3
+        return byte < len(self.ids) and bool(self.ids[byte] & (1 << (i & 7)))
+
+    def __contains__(self, url: object) -> bool:
+        if not isinstance(url, str):
+            return False
+        i = perfume_id(url)
+        return self._has_id(i) if i is not None else url in self.others
+
+    def add(self, url: str) -> bool:
+        """Add ``url``; False if it was already seen."""
+        i = perfume_id(url)
+        if i is None:
+            return self.others.add(url)
+        if self._has_id(i):
+            return False
+        byte = i >> 3
+        if byte >= len(self.ids):
+            self.ids.extend(bytes(byte + 1 - len(self.ids) + 1024))
+        self.ids[byte] |= 1 << (i & 7)
+        self.perfumes += 1
+        return True
+
+    def __len__(self) -> int:
+        return self.perfumes + len(self.others)
+
+    def memory_bytes(self) -> int:
+        return len(self.ids) + self.others.memory_bytes()
+
+
+__all__ = ["BloomFilter", "ScalableBloomFilter", "SeenSet"]
@@ -1,15 +1,45 @@
-"""CSV storage utilities.
+"""Result storage.
 
-This module isolates CSV file handling: creating the file with headers,
-loading existing URLs, and appending rows.
+This module isolates where scraped rows go:
+
+    * CSV helpers: creating the file with headers, loading existing URLs,
+      and appending rows
+    * ``CsvWriter``: keeps the CSV files open and appends rows in batches;
+      ``CsvStore`` uses it (the original CSV-only format)
+    * ``PatchLog``: append-only ``url -> changed fields`` log for editing a
+      CSV in place (enrich.py), applied to the file in one rewrite at the end
+    * ``AliasMap``: perfume IDs that redirect to another perfume's page,
+      written by the stores on every redirect so dedupe (the ID index,
+      ``urls()``) and join_fragrances.py treat both URLs as one perfume
+    * ``SQLiteStore``: a SQLite database in WAL mode keyed by perfume URL,
+      with batched upserts; the CSV files become an export written when
+      the store is closed
+
+``build_store`` picks one from the CLI arguments.
 """
 from __future__ import annotations
 
 import csv
+import datetime as dt
+import io
+import json
 import os
-from typing import Dict, Iterable, Set
+import sqlite3
+import tempfile
+import threading
+import time
+from argparse import Namespace
+from typing import IO, Callable, Dict, Iterable, List, Optional, Sequence, Set, Union
+
+from .config import CSV_FIELDS, STATE_DIR
+from .id_index import perfume_id
+from .normalize import NORMALIZE_VERSION, normalize_row
 
-from .config import CSV_FIELDS
+# --fsync policies: "none" leaves syncing to the OS, "batch" fsyncs every
+# flushed batch (CSV) / every commit (SQLite, synchronous=FULL)
+FSYNC_POLICIES = ("none", "batch")
+
+DEFAULT_ALIASES: str = os.path.join(STATE_DIR, "perfume_aliases.tsv")
 
 
 def ensure_csv_with_header(path: str) -> None:
@@ -53,3 +83,636 @@ def append_row(path: str, row: Dict[str, object]) -> None:
     with open(path, "a", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
         writer.writerow(row)
+
+
+def _repair_tail(path: str) -> int:
+    """Drop a half-written last line left by a crash; returns bytes removed."""
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return 0
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return 0
+        # Walk back to the last complete line
+        pos = size
+        while pos > 0:
+            step = min(pos, 64 * 1024)
+            f.seek(pos - step)
+            chunk = f.read(step)
+            nl = chunk.rfind(b"\n")
+            if nl >= 0:
+                keep = pos - step + nl + 1
+                break
+            pos -= step
+        else:
+            keep = 0
+        f.truncate(keep)
+        return size - keep
+
+
+class CsvWriter:
+    """Long-lived, buffered CSV appender for one or more files.
+
+    Rows are formatted into memory and written to every file as a single
+    batch once ``flush_rows`` rows are waiting or ``flush_seconds`` have
+    passed (or on ``flush()``, e.g. at a session break). A crash therefore
+    loses at most the batch that was still in memory. With ``fsync="batch"``
+    every batch is also fsynced, so it survives a power loss too.
+
+    After each batch the number of rows flushed so far is written to
+    ``<path>.progress`` (JSON). A half-written row at the end of a file,
+    from a crash mid-write, is cut off when the file is opened again.
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[str],
+        *,
+        flush_rows: int = 50,
+        flush_seconds: float = 10.0,
+        fsync: str = "none",
+    ) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync policy must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.flush_rows = max(1, flush_rows)
+        self.flush_seconds = flush_seconds
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._buffer = io.StringIO()
+        self._writer = csv.DictWriter(self._buffer, fieldnames=CSV_FIELDS)
+        self._pending = 0
+        self._pending_urls: List[str] = []
+        self._last_flush = time.monotonic()
+        self.flushed = 0
+        self.batches = 0
+        # Called with the URLs of every batch once it is written (see PerfumeIdIndex.log_saved)
+        self.on_flush: Optional[Callable[[List[str]], None]] = None
+        self.previous: Dict[str, int] = {}
+        self._files: List[IO[str]] = []
+        for path in paths:
+            try:
+                ensure_csv_with_header(path)
+                dropped = _repair_tail(path)
+                if dropped:
+                    print(f"[csv] Dropped {dropped} bytes of an unfinished row at the end of {path}")
+                self.previous[path] = self._read_progress(path)
+                self._files.append(open(path, "a", newline="", encoding="utf-8"))
+            except OSError as e:
+                if not self._files:
+                    raise
+                # Mirrors are best-effort
+                print(f"[warn] Not writing {path}: {e}")
+
+    @staticmethod
+    def _progress_path(path: str) -> str:
+        return path + ".progress"
+
+    def _read_progress(self, path: str) -> int:
+        try:
+            with open(self._progress_path(path), "r", encoding="utf-8") as f:
+                return int(json.load(f).get("rows_flushed", 0))
+        except (OSError, ValueError):
+            return 0
+
+    def _write_progress(self, f: IO[str]) -> None:
+        path = f.name
+        tmp = self._progress_path(path) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as pf:
+            json.dump({
+                "rows_flushed": self.previous.get(path, 0) + self.flushed,
+                "bytes": f.tell(),
+                "updated": dt.datetime.utcnow().isoformat(),
+            }, pf)
+        os.replace(tmp, self._progress_path(path))
+
+    def write(self, row: Dict[str, object]) -> None:
+        with self._lock:
+            self._writer.writerow(row)
+            self._pending += 1
+            self._pending_urls.append(str(row.get("url") or ""))
+            if self._pending >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_seconds:
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        data = self._buffer.getvalue()
+        for f in self._files:
+            f.write(data)
+            f.flush()
+            if self.fsync == "batch":
+                os.fsync(f.fileno())
+        self.flushed += self._pending
+        self.batches += 1
+        for f in self._files:
+            self._write_progress(f)
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._pending = 0
+        urls, self._pending_urls = self._pending_urls, []
+        if self.on_flush is not None:
+            self.on_flush(urls)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            for f in self._files:
+                f.close()
+            self._files = []
+
+
+class CsvStore:
+    """Rows appended to the CSV file(s) through a ``CsvWriter``."""
+
+    def __init__(
+        self,
+        path: str,
+        mirrors: Sequence[str] = (),
+        *,
+        flush_rows: int = 50,
+        flush_seconds: float = 10.0,
+        fsync: str = "none",
+        aliases: Optional[AliasMap] = None,
+    ) -> None:
+        self.path = path
+        self.writer = CsvWriter([path, *mirrors], flush_rows=flush_rows, flush_seconds=flush_seconds, fsync=fsync)
+        self.aliases = aliases
+        self.redirects = 0  # recorded through this store
+
+    @property
+    def on_flush(self) -> Optional[Callable[[List[str]], None]]:
+        return self.writer.on_flush
+
+    @on_flush.setter
+    def on_flush(self, hook: Optional[Callable[[List[str]], None]]) -> None:
+        self.writer.on_flush = hook
+
+    def urls(self) -> Set[str]:
+        """Saved URLs, plus the old URLs of saved perfumes that moved."""
+        self.writer.flush()
+        urls = load_existing_urls(self.path)
+        return self.aliases.expand(urls) if self.aliases is not None else urls
+
+    def upsert(self, row: Dict[str, object]) -> None:
+        self.writer.write(row)
+
+    def record_redirect(self, source_url: str, final_url: str) -> bool:
+        if self.aliases is None or not self.aliases.add(source_url, final_url):
+            return False
+        self.redirects += 1
+        return True
+
+    def flush(self) -> None:
+        self.writer.flush()
+
+    def close(self) -> None:
+        self.writer.close()
+        if self.aliases is not None:
+            self.aliases.close()
+
+    def report(self) -> str:
+        previous = self.writer.previous.get(self.path, 0)
+        resumed = f" (after {previous} in earlier runs)" if previous else ""
+        redirects = f", {self.redirects} redirects recorded" if self.redirects else ""
+        return (
+            f"csv, {self.writer.flushed} rows appended to {self.path} in {self.writer.batches} batches"
+            f"{resumed}{redirects}"
+        )
+
+
+class PatchLog:
+    """Append-only log of row edits next to a CSV (``<csv>.patches.jsonl``).
+
+    Each line is ``{"url": ..., "fields": {...}}``; an empty ``fields`` still
+    records that the URL was processed, which is what resuming keys on.
+    Later lines win. A torn last line (crash mid-write) is ignored.
+    """
+
+    def __init__(self, csv_path: str) -> None:
+        self.path = csv_path + ".patches.jsonl"
+        self.written = 0
+        self._f: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Dict[str, object]]:
+        """Merged fields per URL, in the order URLs were first logged."""
+        patches: Dict[str, Dict[str, object]] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    patches.setdefault(entry["url"], {}).update(entry.get("fields") or {})
+        except OSError:
+            pass
+        return patches
+
+    def append(self, url: str, fields: Dict[str, object]) -> None:
+        with self._lock:
+            if self._f is None:
+                self._f = open(self.path, "a", encoding="utf-8")
+            self._f.write(json.dumps({"url": url, "fields": fields, "ts": time.time()}, ensure_ascii=False) + "\n")
+            self._f.flush()
+            self.written += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._f is not None:
+                self._f.close()
+                self._f = None
+
+    def reset(self, processed: Iterable[str]) -> None:
+        """Replace the log with bare "processed" markers once its edits are in the CSV."""
+        self.close()
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for url in processed:
+                f.write(json.dumps({"url": url, "fields": {}}, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+
+    def discard(self) -> None:
+        """Drop the log once it has been applied to the CSV."""
+        self.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def apply_patches(rows: List[Dict[str, object]], patches: Dict[str, Dict[str, object]]) -> int:
+    """Apply ``PatchLog.load()`` output to rows (matched by URL); returns rows changed."""
+    changed = 0
+    for row in rows:
+        fields = patches.get(str(row.get("url") or "").strip())
+        if fields:
+            row.update(fields)
+            changed += 1
+    return changed
+
+
+class AliasMap:
+    """Redirect aliases: source perfume ID -> canonical perfume ID.
+
+    Fragrantica moves perfumes now and then; the old URL redirects to the
+    new one and the row is saved under the new URL. Recording the pair
+    keeps the old URL (still linked from brand listings) from being fetched
+    on every run. The file is append-only, one
+    ``source_id<TAB>canonical_id<TAB>source_url<TAB>canonical_url`` line per
+    redirect; later lines win and a torn last line is ignored.
+    """
+
+    def __init__(self, path: str = DEFAULT_ALIASES) -> None:
+        self.path = path
+        self.added = 0
+        self._canonical: Dict[int, int] = {}
+        self._urls: Dict[int, str] = {}  # ID -> URL, for both sides of every alias
+        self._f: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) != 4 or not line.endswith("\n"):
+                        continue
+                    try:
+                        source, canonical = int(parts[0]), int(parts[1])
+                    except ValueError:
+                        continue
+                    self._set(source, canonical, parts[2], parts[3])
+        except OSError:
+            pass
+
+    def _set(self, source: int, canonical: int, source_url: str, canonical_url: str) -> None:
+        self._canonical[source] = canonical
+        # A perfume that moved back is canonical again
+        self._canonical.pop(canonical, None)
+        self._urls[source] = source_url
+        self._urls[canonical] = canonical_url
+
+    def __len__(self) -> int:
+        return len(self._canonical)
+
+    def __contains__(self, url: object) -> bool:
+        """Whether ``url`` is the old URL of a perfume that moved."""
+        i = perfume_id(url) if isinstance(url, str) else None
+        return i is not None and i in self._canonical
+
+    def canonical_id(self, i: int) -> int:
+        seen = {i}
+        while i in self._canonical and self._canonical[i] not in seen:
+            i = self._canonical[i]
+            seen.add(i)
+        return i
+
+    def canonical_url(self, url: str) -> str:
+        """The URL ``url`` redirects to (through any chain of moves), else ``url``."""
+        i = perfume_id(url)
+        if i is None or i not in self._canonical:
+            return url
+        return self._urls.get(self.canonical_id(i), url)
+
+    def add(self, source_url: str, canonical_url: str) -> bool:
+        """Record a redirect between two perfume URLs; False if nothing new."""
+        source, canonical = perfume_id(source_url), perfume_id(canonical_url)
+        if source is None or canonical is None or source == canonical:
+            return False
+        with self._lock:
+            if self._canonical.get(source) == canonical:
+                return False
+            self._set(source, canonical, source_url, canonical_url)
+            if self._f is None:
+                parent = os.path.dirname(self.path)
+                if parent:
+                    os.makedirs(parent, exist_ok=True)
+                self._f = open(self.path, "a", encoding="utf-8")
+            self._f.write(f"{source}\t{canonical}\t{source_url}\t{canonical_url}\n")
+            self._f.flush()
+            self.added += 1
+        return True
+
+    def expand(self, urls: Set[str]) -> Set[str]:
+        """``urls`` plus the old URLs of every perfume in it."""
+        ids = {i for i in map(perfume_id, urls) if i is not None}
+        moved = {self._urls[s] for s in self._canonical if self.canonical_id(s) in ids and s in self._urls}
+        return set(urls) | moved
+
+    def close(self) -> None:
+        """Close the file; a later ``add`` reopens it, so a shared map may be closed by each user."""
+        with self._lock:
+            if self._f is not None:
+                self._f.close()
+                self._f = None
+
+
+def open_aliases(args: Optional[Namespace] = None) -> AliasMap:
+    """The alias map for a run (``--aliases``, default ``DEFAULT_ALIASES``).
+
+    ``--parallel-brands`` opens one for every brand and passes it on as
+    ``args.shared_aliases``, so all stores and the shared ID index see the
+    same redirects and append through the same lock.
+    """
+    shared = getattr(args, "shared_aliases", None)
+    if shared is not None:
+        return shared
+    return AliasMap(getattr(args, "aliases", None) or DEFAULT_ALIASES)
+
+
+# Rows carry the normalize.py rule version they were last normalized with
+_DB_FIELDS = CSV_FIELDS + ["norm_version"]
+_URL_COLUMN = CSV_FIELDS.index("url")
+_UPSERT_SQL = (
+    f"INSERT INTO perfumes ({', '.join(_DB_FIELDS)}) VALUES ({', '.join('?' for _ in _DB_FIELDS)}) "
+    "ON CONFLICT(url) DO UPDATE SET "
+    + ", ".join(f"{f} = excluded.{f}" for f in _DB_FIELDS if f != "url")
+)
+
+
+class SQLiteStore:
+    """Perfume rows in SQLite (WAL), one row per URL, CSV as an export.
+
+    ``upsert`` only buffers; the buffer is written in one transaction every
+    ``batch_size`` rows or ``flush_seconds`` seconds, whichever comes first.
+    On ``close`` the remaining rows are committed and the whole table is
+    exported to each path in ``exports`` (the first one is the primary CSV:
+    if it was edited since the last export, e.g. by enrich.py, its rows are
+    merged back in when the store is opened).
+
+    Upserted rows come from the parser, which already normalized them (see
+    normalize.py), and are stored with ``NORMALIZE_VERSION``. Rows merged
+    from CSV are normalized on the way in. Rows stored under an older rule
+    version are brought up to date when the store is opened, with only the
+    rules added since.
+
+    Safe to share between threads; every call takes the store's lock.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        exports: Sequence[str] = (),
+        batch_size: int = 200,
+        flush_seconds: float = 5.0,
+        fsync: str = "none",
+        aliases: Optional[AliasMap] = None,
+    ) -> None:
+        self.path = path
+        self.exports = list(exports)
+        self.aliases = aliases
+        self.redirects = 0  # recorded through this store
+        # Called with the URLs of every batch once it is committed (see PerfumeIdIndex.log_saved)
+        self.on_flush: Optional[Callable[[List[str]], None]] = None
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._lock = threading.Lock()
+        self._buffer: List[tuple] = []
+        self._last_flush = time.monotonic()
+        self.upserts = 0
+        self.commits = 0
+        self.imported = 0
+        self.renormalized = 0
+        self._rows_at_close: Optional[int] = None
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL only syncs at checkpoints; FULL syncs every commit
+        self.conn.execute(f"PRAGMA synchronous={'FULL' if fsync == 'batch' else 'NORMAL'}")
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS perfumes ("
+                "url TEXT PRIMARY KEY, brand TEXT, name TEXT, rating REAL, votes INTEGER, "
+                "last_crawled TEXT, sex TEXT, fragrance_category TEXT, norm_version INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {r[1] for r in self.conn.execute("PRAGMA table_info(perfumes)")}
+            if "norm_version" not in columns:  # database from before normalize.py
+                self.conn.execute("ALTER TABLE perfumes ADD COLUMN norm_version INTEGER NOT NULL DEFAULT 0")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS perfumes_norm_version ON perfumes (norm_version)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS perfumes_brand ON perfumes (brand)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS perfumes_last_crawled ON perfumes (last_crawled)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS exports (path TEXT PRIMARY KEY, mtime REAL)")
+        if self.exports:
+            self._import_if_newer(self.exports[0])
+        self._renormalize()
+
+    @staticmethod
+    def _values(row: Dict[str, object]) -> tuple:
+        return tuple(row.get(f) for f in CSV_FIELDS) + (NORMALIZE_VERSION,)
+
+    def _renormalize(self) -> None:
+        """Apply rules newer than each stale row's ``norm_version``."""
+        stale = self.conn.execute(
+            "SELECT url, brand, name, sex, norm_version FROM perfumes WHERE norm_version < ?", (NORMALIZE_VERSION,)
+        ).fetchall()
+        if not stale:
+            return
+        updates = []
+        for url, brand, name, sex, version in stale:
+            row: Dict[str, object] = {"brand": brand, "name": name, "sex": sex}
+            if normalize_row(row, since=version):
+                self.renormalized += 1
+            updates.append((row["name"], row["sex"], NORMALIZE_VERSION, url))
+        with self.conn:
+            self.conn.executemany("UPDATE perfumes SET name = ?, sex = ?, norm_version = ? WHERE url = ?", updates)
+
+    def _import_if_newer(self, csv_path: str) -> None:
+        """Merge a CSV that is newer than our last export of it."""
+        if not os.path.exists(csv_path):
+            return
+        mtime = os.path.getmtime(csv_path)
+        last = self.conn.execute("SELECT mtime FROM exports WHERE path = ?", (os.path.abspath(csv_path),)).fetchone()
+        if last is not None and mtime <= last[0]:
+            return
+        with open(csv_path, "r", newline="", encoding="utf-8") as f:
+            rows = [r for r in csv.DictReader(f) if (r.get("url") or "").strip()]
+        for r in rows:
+            normalize_row(r)
+        rows = [self._values(r) for r in rows]
+        with self.conn:
+            self.conn.executemany(_UPSERT_SQL, rows)
+        self.imported = len(rows)
+
+    def urls(self) -> Set[str]:
+        """Saved URLs, plus the old URLs of saved perfumes that moved."""
+        with self._lock:
+            self._flush_locked()
+            urls = {url for (url,) in self.conn.execute("SELECT url FROM perfumes")}
+        return self.aliases.expand(urls) if self.aliases is not None else urls
+
+    def record_redirect(self, source_url: str, final_url: str) -> bool:
+        """Remember that ``source_url`` redirects to ``final_url`` (see ``AliasMap``)."""
+        if self.aliases is None or not self.aliases.add(source_url, final_url):
+            return False
+        self.redirects += 1
+        return True
+
+    def upsert(self, row: Dict[str, object]) -> None:
+        with self._lock:
+            self._buffer.append(self._values(row))
+            self.upserts += 1
+            if len(self._buffer) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_seconds:
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        with self.conn:
+            self.conn.executemany(_UPSERT_SQL, self._buffer)
+        urls = [values[_URL_COLUMN] for values in self._buffer]
+        self._buffer.clear()
+        self.commits += 1
+        # Still under the lock, so a row upserted meanwhile is never reported
+        if self.on_flush is not None:
+            self.on_flush(urls)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def export_csv(self, path: str) -> int:
+        """Write every row to ``path`` (atomically); returns the row count."""
+        with self._lock:
+            self._flush_locked()
+            rows = self.conn.execute(f"SELECT {', '.join(CSV_FIELDS)} FROM perfumes ORDER BY rowid").fetchall()
+        parent = os.path.dirname(path) or "."
+        os.makedirs(parent, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix=".csv", dir=parent)
+        try:
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(CSV_FIELDS)
+                writer.writerows(["" if v is None else v for v in r] for r in rows)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO exports (path, mtime) VALUES (?, ?)",
+                (os.path.abspath(path), os.path.getmtime(path)),
+            )
+        return len(rows)
+
+    def close(self) -> None:
+        """Commit what is buffered, export the CSV files and close the database."""
+        self.flush()
+        for path in self.exports:
+            try:
+                self.export_csv(path)
+            except OSError as e:
+                print(f"[warn] Could not export {path}: {e}")
+        with self._lock:
+            self._rows_at_close = self.conn.execute("SELECT COUNT(*) FROM perfumes").fetchone()[0]
+            self.conn.close()
+        if self.aliases is not None:
+            self.aliases.close()
+
+    def report(self) -> str:
+        with self._lock:
+            total = self._rows_at_close
+            if total is None:
+                total = self.conn.execute("SELECT COUNT(*) FROM perfumes").fetchone()[0]
+        imported = f", {self.imported} merged from CSV" if self.imported else ""
+        renormalized = f", {self.renormalized} re-normalized" if self.renormalized else ""
+        redirects = f", {self.redirects} redirects recorded" if self.redirects else ""
+        return (
+            f"sqlite, {total} rows in {self.path}, {self.upserts} upserts in {self.commits} commits"
+            f"{imported}{renormalized}{redirects}"
+        )
+
+
+Store = Union[CsvStore, SQLiteStore]
+
+
+def build_store(args: Namespace, out_csv: str, mirrors: Sequence[str] = ()) -> Store:
+    """Storage for a crawl writing ``out_csv``, per ``--storage`` / ``--db``."""
+    fsync = getattr(args, "fsync", "none")
+    if getattr(args, "storage", "sqlite") == "csv":
+        return CsvStore(
+            out_csv,
+            mirrors,
+            flush_rows=getattr(args, "csv_flush_rows", 50),
+            flush_seconds=getattr(args, "csv_flush_seconds", 10.0),
+            fsync=fsync,
+            aliases=open_aliases(args),
+        )
+    db_path = getattr(args, "db", None) or os.path.splitext(out_csv)[0] + ".sqlite3"
+    return SQLiteStore(
+        db_path,
+        exports=[out_csv, *mirrors],
+        batch_size=getattr(args, "db_batch_size", 200),
+        flush_seconds=getattr(args, "db_flush_seconds", 5.0),
+        fsync=fsync,
+        aliases=open_aliases(args),
+    )
+
+
+__all__ = [
+    "AliasMap",
+    "CsvStore",
+    "CsvWriter",
+    "DEFAULT_ALIASES",
+    "FSYNC_POLICIES",
+    "PatchLog",
+    "SQLiteStore",
+    "Store",
+    "append_row",
+    "apply_patches",
+    "build_store",
+    "ensure_csv_with_header",
+    "load_existing_urls",
+    "open_aliases",
+]
@@ -0,0 +1,374 @@
+"""Crawl workers over a shared work queue.
+
+    python -m fragrantica_scraper enqueue --brands Chanel --brands Dior
+    python -m fragrantica_scraper worker                 # one per process / machine
+    python -m fragrantica_scraper status --export "Saved Data/workers.csv"
+
+``enqueue`` queues each brand's designer page. A worker leases URLs from the
+queue (workqueue.py): a designer page adds the brand's perfume pages and its
+next listing page to the queue, a perfume page becomes a row in the shared
+SQLite store (``--db``). Since the queue hands every URL to one worker at a
+time and never queues a URL twice, adding workers adds throughput without
+fetching anything twice; each keeps its own per-proxy pacing, so give every
+worker on one machine its own share of the proxies with ``--workers N
+--worker-index I``.
+
+A failed fetch goes back to the queue for any worker to retry, up to
+``--max-attempts`` deliveries. A proxy that saved ``--session-size`` pages
+rests on its own while the worker goes on through its other proxies; only
+when all of them rest does the worker wait, and it extends the leases it
+still holds first so they do not time out.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import socket
+import sys
+import time
+from argparse import Namespace
+from typing import List, Optional, Sequence
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+
+from .cache import build_response_cache
+from .config import DEFAULT_UAS, DOMAIN, PERFUME_URL_RE, SAVED_DATA_DIR
+from .crawler import _brand_to_designers_slug, _brand_to_perfume_slug, _make_row
+from .frontier import PRIORITY_DESIGNER, PRIORITY_OTHER, PRIORITY_PERFUME
+from .html_backend import HTML_BACKENDS, parse_html
+from .id_index import open_id_index
+from .multi_brand import split_proxies
+from .network import (
+    CURL_CFFI_UA,
+    HTTP_BACKEND,
+    SessionPool,
+    build_rate_limiter,
+    fetch,
+    normalize_url,
+    response_latency,
+)
+from .negative_cache import CRAWL_REASONS, NO_RATINGS, NOT_FOUND, build_negative_cache
+from .parsing import scrape_perfume_bytes
+from .proxies import build_proxy_pool, load_proxies
+from .storage import FSYNC_POLICIES, SQLiteStore, open_aliases
+from .workqueue import DEFAULT_WORK_QUEUE, Lease, WorkQueue, open_work_queue
+
+COMMANDS = ("enqueue", "worker", "status")
+
+DEFAULT_WORKER_DB: str = os.path.join(SAVED_DATA_DIR, "workers.sqlite3")
+MAX_BRAND_PAGES = 25
+_DEFAULT_UA = "Mozilla/5.0 (compatible; PerfumeBot/1.0; +https://example.com/botinfo)"
+
+
+def designer_url(brand: str) -> str:
+    return f"https://{DOMAIN}/designers/{_brand_to_designers_slug(brand)}.html"
+
+
+def _page_number(url: str) -> int:
+    try:
+        return int(parse_qs(urlparse(url).query).get("p", ["1"])[0])
+    except ValueError:
+        return 1
+
+
+def _with_page(url: str, page: int) -> str:
+    parts = urlparse(url)
+    return urlunparse(parts._replace(query=urlencode({"p": page})))
+
+
+def enqueue(queue: WorkQueue, brands: Sequence[str] = (), urls: Sequence[str] = ()) -> int:
+    """Queue each brand's designer page and any extra URLs; returns how many were new."""
+    added = 0
+    for brand in brands:
+        added += queue.put([designer_url(brand)], PRIORITY_DESIGNER, brand)
+    for url in urls:
+        priority = PRIORITY_PERFUME if PERFUME_URL_RE.match(url) else PRIORITY_OTHER
+        added += queue.put([url], priority)
+    return added
+
+
+class CrawlWorker:
+    """Lease, fetch, store, ack until the queue runs dry (or ``--max-pages``)."""
+
+    def __init__(self, args: Namespace, queue: WorkQueue) -> None:
+        self.args = args
+        self.queue = queue
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        proxies = load_proxies(args)
+        if args.workers > 1 and proxies:
+            proxies = split_proxies(proxies, args.workers)[args.worker_index % args.workers]
+            print(f"[worker] Proxy share {args.worker_index % args.workers + 1}/{args.workers}: {len(proxies)} proxies")
+        self.pool = build_proxy_pool(args, proxies)
+        self.limiter = build_rate_limiter(args)
+        self.sessions = SessionPool(args.timeout)
+        self.cache = build_response_cache(args)
+        self.store = SQLiteStore(
+            args.db,
+            batch_size=args.db_batch_size,
+            flush_seconds=args.db_flush_seconds,
+            fsync=args.fsync,
+            aliases=open_aliases(args),
+        )
+        # Read-only here: perfumes saved before the queue existed are not queued again
+        self.index = None if args.no_id_index else open_id_index(args.id_index, aliases=self.store.aliases)
+        # Shared with the other workers (SQLite); pages empty on a recent visit are not queued
+        self.negative = build_negative_cache(args)
+        self.proxy = self.pool.next_proxy()
+        self.requests_since_rotate = 0
+        self.saved = 0
+        self.acked = 0
+        self.retried = 0
+
+    def _choose_ua(self) -> str:
+        if HTTP_BACKEND == "curl-cffi":
+            return CURL_CFFI_UA  # must match the curl_cffi impersonation target
+        if self.args.user_agent == _DEFAULT_UA:
+            return random.choice(DEFAULT_UAS)
+        return self.args.user_agent
+
+    def _rotate(self, reason: str) -> None:
+        self.proxy = self.pool.next_proxy(exclude=self.proxy)
+        self.requests_since_rotate = 0
+        print(f"[rotate] {reason}: Proxy={'<none>' if not self.proxy else self.proxy}")
+
+    def _wait_for_identity(self, held: Sequence[Lease] = ()) -> None:
+        """Move off a resting proxy; if every one rests, wait (keeping ``held`` leased)."""
+        proxy, wait = self.pool.ready(self.proxy)
+        if proxy != self.proxy:
+            self.proxy = proxy
+            self.requests_since_rotate = 0
+            print(f"[rotate] New session: Proxy={'<none>' if not self.proxy else self.proxy}")
+        if wait > 0:
+            print(f"\n[pause] Every identity is resting. Waiting ~{int(wait // 60)}m{int(wait % 60)}s...\n")
+            self.store.flush()
+            for lease in held:
+                self.queue.extend(lease, self.owner, wait + self.args.lease_seconds)
+            time.sleep(wait)
+
+    # -- main loop -------------------------------------------------------------
+
+    def run(self) -> int:
+        args = self.args
+        print(f"[worker] {self.owner} leasing from {self.queue!r}, storing to {args.db}")
+        while args.max_pages <= 0 or self.saved < args.max_pages:
+            self._wait_for_identity()
+            leases = self.queue.lease(self.owner, args.lease_batch, args.lease_seconds)
+            if not leases:
+                counts = self.queue.counts()
+                if not counts["leased"]:
+                    print("[worker] Queue is empty")
+                    break
+                # Other workers may still add pages from the listings they hold
+                time.sleep(args.poll_seconds)
+                continue
+            for k, lease in enumerate(leases):
+                if self.pool.rest_remaining(self.proxy) > 0:
+                    self._wait_for_identity(leases[k:])
+                if self._process(lease):
+                    # False when the lease ran out and someone else holds it now
+                    self.acked += self.queue.ack(lease, self.owner)
+                else:
+                    self.queue.fail(lease, self.owner, args.max_attempts)
+                    self.retried += 1
+        return self.saved
+
+    def _process(self, lease: Lease) -> bool:
+        """Fetch and handle one URL; False puts it back in the queue."""
+        args = self.args
+        if args.rotate_every > 0 and self.requests_since_rotate >= args.rotate_every:
+            self._rotate(f"Switching proxy after {self.requests_since_rotate} requests")
+        session, _, _ = self.sessions.session_for(self.proxy, self._choose_ua)
+        print(f"[fetch] {lease.url}" + (f" (attempt {lease.attempts})" if lease.attempts > 1 else ""))
+        self.requests_since_rotate += 1
+        try:
+            resp = fetch(
+                session, lease.url, timeout=args.timeout, limiter=self.limiter, identity=self.proxy, cache=self.cache
+            )
+        except Exception as e:
+            print(f"[error] {e}")
+            self.pool.record_failure(self.proxy)
+            self._rotate("Request failed")
+            return False
+        if resp.status_code in (403, 429):
+            self.pool.record_block(self.proxy, resp.status_code)
+            self.sessions.discard(self.proxy)
+            self._rotate(f"Status {resp.status_code}")
+            return False
+        if resp.status_code == 404:
+            print("[skip] Status 404")
+            if self.negative is not None:
+                self.negative.add(lease.url, NOT_FOUND)
+            return True
+        if resp.status_code != 200:
+            print(f"[skip] Status {resp.status_code}")
+            return False
+        self.pool.record_success(self.proxy, response_latency(resp))
+        if PERFUME_URL_RE.match(lease.url):
+            return self._store_perfume(lease, resp)
+        return self._expand_listing(lease, resp)
+
+    def _store_perfume(self, lease: Lease, resp) -> bool:
+        url = resp.url or lease.url
+        if url != lease.url:
+            print(f"[redirect] {lease.url} -> {url}")
+            self.store.record_redirect(lease.url, url)
+        try:
+            data = scrape_perfume_bytes(url, resp.content, resp.encoding, self.args.html_parser)
+        except Exception as e:
+            print(f"[error] Could not parse {url}: {e}")
+            return False
+        if not (data["brand"] and data["name"]):
+            print("[skip] Missing brand or name fields")
+            return True
+        if data["rating"] is None or data["votes"] is None:
+            print(f"[skip] {data['brand']} — {data['name']} | No ratings yet (new perfume)")
+            if self.negative is not None:
+                self.negative.add(url, NO_RATINGS)
+            return True
+        self.store.upsert(_make_row(data, url))
+        self.saved += 1
+        self.pool.record_save(self.proxy)
+        print(f"[saved] {data['brand']} — {data['name']} | {data['rating']} (votes: {data['votes']})")
+        return True
+
+    def _expand_listing(self, lease: Lease, resp) -> bool:
+        """Queue the perfumes on a designer page, and its next page while it adds any."""
+        links = parse_html(resp.text, self.args.html_parser).links()
+        if len(resp.content) < 5000 or len(links) < 5:
+            print("[warn] Page looks like a Cloudflare challenge or empty — very few links/content")
+            return False
+        expected = _brand_to_perfume_slug(lease.brand).casefold() if lease.brand else None
+        urls: List[str] = []
+        for href in links:
+            if href.startswith("/perfume/"):
+                href = f"https://{DOMAIN}{href}"
+            if not PERFUME_URL_RE.match(href):
+                continue
+            if expected is not None and href.split("/perfume/", 1)[1].split("/", 1)[0].casefold() != expected:
+                continue
+            url = normalize_url(href)
+            if not url or (self.index is not None and url in self.index):
+                continue
+            if self.negative is not None and self.negative.skip(url, CRAWL_REASONS):
+                continue
+            urls.append(url)
+        added = self.queue.put(urls, PRIORITY_PERFUME, lease.brand)
+        print(f"[listing] {added} new perfume URLs queued")
+        page = _page_number(lease.url)
+        if added and urlparse(lease.url).path.startswith("/designers/") and page < MAX_BRAND_PAGES:
+            self.queue.put([_with_page(lease.url, page + 1)], PRIORITY_DESIGNER, lease.brand)
+        return True
+
+    def close(self) -> None:
+        self.store.close()
+        self.sessions.close()
+        print(f"\n[done] {self.owner}: saved {self.saved}, {self.acked} URLs done, {self.retried} handed back")
+        print(f"[store] {self.store.report()}")
+        for line in self.pool.report():
+            print(f"[proxy] {line}")
+        if self.cache is not None:
+            # Pruning is left to single-process runs; workers share the directory
+            print(f"[cache] {self.cache.report()}")
+        if self.negative is not None:
+            self.negative.close()
+            print(f"[negative] {self.negative.report()}")
+
+
+# -- CLI -------------------------------------------------------------------------
+
+
+def _queue_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--queue",
+        default=DEFAULT_WORK_QUEUE,
+        help=f"SQLite file (default {DEFAULT_WORK_QUEUE}) or redis://host:port/db URL shared by all workers.",
+    )
+    parser.add_argument("--queue-name", default="fragrantica", help="Key prefix in a redis:// queue.")
+    parser.add_argument("--db", default=DEFAULT_WORKER_DB, help=f"Shared SQLite store for results (default {DEFAULT_WORKER_DB}).")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m fragrantica_scraper", description="Crawl with several workers over a shared queue.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enq = commands.add_parser("enqueue", help="Queue brands' designer pages (or any URLs).")
+    _queue_options(enq)
+    enq.add_argument("--brands", action="append", default=[], help="Brand to queue (repeatable).")
+    enq.add_argument("--brands-file", help="File with one brand per line (# comments allowed).")
+    enq.add_argument("--url", action="append", default=[], help="Extra URL to queue (repeatable).")
+
+    st = commands.add_parser("status", help="Show queue counts; optionally export the store to CSV.")
+    _queue_options(st)
+    st.add_argument("--export", help="Write every stored row to this CSV.")
+
+    wk = commands.add_parser("worker", help="Lease URLs from the queue until it is empty.")
+    _queue_options(wk)
+    wk.add_argument("--lease-seconds", type=float, default=600.0, help="Visibility timeout of a lease. Default: 600.")
+    wk.add_argument("--lease-batch", type=int, default=5, help="URLs leased at a time. Default: 5.")
+    wk.add_argument("--max-attempts", type=int, default=3, help="Deliveries before a URL is given up on. Default: 3.")
+    wk.add_argument("--poll-seconds", type=float, default=10.0, help="Wait between polls while others hold leases.")
+    wk.add_argument("--workers", type=int, default=1, help="Workers sharing this machine's proxies file.")
+    wk.add_argument("--worker-index", type=int, default=0, help="This worker's share of the proxies (0-based).")
+    wk.add_argument("--max-pages", type=int, default=0, help="Stop after saving N perfumes. Default: 0 (no limit).")
+    wk.add_argument("--delay-seconds", type=float, default=5.0, help="Base politeness delay between requests.")
+    wk.add_argument("--rate-per-proxy", type=float, default=None, help="Requests/second per proxy identity.")
+    wk.add_argument("--global-rate", type=float, default=0.0, help="Requests/second across this worker's proxies.")
+    wk.add_argument("--burst", type=float, default=1.0, help="Token-bucket capacity per proxy.")
+    wk.add_argument("--timeout", type=float, default=20.0, help="HTTP timeout in seconds.")
+    wk.add_argument("--user-agent", default=_DEFAULT_UA, help="User-Agent string used for requests.")
+    wk.add_argument("--session-size", type=int, default=30, help="Perfumes a proxy saves before it rests.")
+    wk.add_argument("--session-break-seconds", type=float, default=900, help="How long a proxy rests, in seconds.")
+    wk.add_argument("--proxy", help="Proxy URL to use for requests.")
+    wk.add_argument("--proxies-file", default="proxies.txt", help="File with one proxy per line.")
+    wk.add_argument("--rotate-every", type=int, default=30, help="Rotate proxy after N requests.")
+    wk.add_argument("--html-parser", choices=("auto",) + HTML_BACKENDS, default="auto", help="HTML parser backend.")
+    wk.add_argument("--db-batch-size", type=int, default=200, help="Commit buffered rows every N rows.")
+    wk.add_argument("--db-flush-seconds", type=float, default=5.0, help="Commit buffered rows at least this often.")
+    wk.add_argument("--fsync", choices=FSYNC_POLICIES, default="none", help="Durability of saved rows.")
+    wk.add_argument("--id-index", default=None, help="Index of perfume IDs already saved (read only).")
+    wk.add_argument("--no-id-index", action="store_true", help="Queue perfumes even if saved before.")
+    wk.add_argument("--aliases", default=None, help="Redirect aliases of perfumes that moved (shared, append-only).")
+    wk.add_argument("--negative-cache", default=None, help="Pages empty on a recent visit, not queued again yet.")
+    wk.add_argument("--no-negative-cache", action="store_true", help="Ignore the negative cache.")
+    wk.add_argument("--cache-dir", default=None, help="On-disk response cache directory.")
+    wk.add_argument("--replay", action="store_true", help="Serve pages only from the cache.")
+    return parser
+
+
+def _read_brands(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    queue = open_work_queue(args.queue, args.queue_name)
+    try:
+        if args.command == "enqueue":
+            brands = list(args.brands) + (_read_brands(args.brands_file) if args.brands_file else [])
+            added = enqueue(queue, brands, args.url)
+            print(f"[queue] {added} new URLs queued in {queue!r}")
+        elif args.command == "status":
+            counts = queue.counts()
+            print(f"[queue] {queue!r}: " + ", ".join(f"{n} {state}" for state, n in counts.items()))
+            if args.export:
+                store = SQLiteStore(args.db)
+                rows = store.export_csv(args.export)
+                store.close()
+                print(f"[csv] {rows} rows from {args.db} -> {args.export}")
+        else:
+            worker = CrawlWorker(args, queue)
+            try:
+                worker.run()
+            finally:
+                worker.close()
+    finally:
+        queue.close()
+    return 0
+
+
+__all__ = ["COMMANDS", "CrawlWorker", "DEFAULT_WORKER_DB", "build_parser", "designer_url", "enqueue", "main"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""Shared work queue for crawl workers (``python -m fragrantica_scraper worker``).
+
+Any number of worker processes, on one machine or several, lease URLs from
+the same queue. A lease hides a URL from every other worker for
+``visibility`` seconds; the worker acks it when the page is stored (or
+skipped for good) and fails it when the fetch should be retried. A worker
+that dies simply stops acking: once its leases time out the URLs are handed
+to someone else. Every URL is queued at most once, so a designer page
+linked from ten places is still fetched once.
+
+Two backends with the same methods:
+
+    SQLiteWorkQueue   one SQLite file, for processes on one machine (or a
+                      shared disk that does proper file locking)
+    RedisWorkQueue    any client with the redis-py command subset used here
+                      (``redis.Redis`` for several machines, or a local
+                      stand-in); needs ``pip install redis`` for redis:// URLs
+
+Within a priority URLs come out in the order they were queued; lower
+priorities first (the frontier's PRIORITY_* values).
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+try:
+    import redis  # type: ignore
+    HAS_REDIS = True
+except ImportError:
+    redis = None  # type: ignore[assignment]
+    HAS_REDIS = False
+
+from .config import STATE_DIR
+
+DEFAULT_WORK_QUEUE: str = os.path.join(STATE_DIR, "work_queue.sqlite3")
+
+QUEUED, LEASED, DONE, FAILED = 0, 1, 2, 3
+
+
+@dataclass
+class Lease:
+    """One URL handed to one worker."""
+
+    url: str
+    priority: int
+    brand: Optional[str]
+    attempts: int  # deliveries so far, this one included
+
+
+class SQLiteWorkQueue:
+    """Work queue in a SQLite file; every lease is one IMMEDIATE transaction."""
+
+    def __init__(self, path: str = DEFAULT_WORK_QUEUE, *, clock: Callable[[], float] = time.time) -> None:
+        self.path = path
+        self.clock = clock
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        # Autocommit; transactions are explicit so a lease is read-and-mark in one step
+        self.conn = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "seq INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE, priority INTEGER NOT NULL, brand TEXT, "
+            "state INTEGER NOT NULL DEFAULT 0, owner TEXT, lease_until REAL NOT NULL DEFAULT 0, "
+            "attempts INTEGER NOT NULL DEFAULT 0)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, priority, seq)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_leases ON jobs (state, lease_until)")
+
+    def put(self, urls: Iterable[str], priority: int, brand: Optional[str] = None) -> int:
+        """Queue every URL that was never queued before; returns how many were new."""
+        rows = [(url, priority, brand) for url in dict.fromkeys(urls)]
+        if not rows:
+            return 0
+        before = self.conn.total_changes
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany("INSERT OR IGNORE INTO jobs (url, priority, brand) VALUES (?, ?, ?)", rows)
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return self.conn.total_changes - before
+
+    def lease(self, owner: str, count: int = 1, visibility: float = 600.0) -> List[Lease]:
+        """Take up to ``count`` URLs for ``visibility`` seconds (expired leases first go back)."""
+        now = self.clock()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, owner = NULL WHERE state = ? AND lease_until < ?", (QUEUED, LEASED, now)
+            )
+            rows = self.conn.execute(
+                "SELECT url, priority, brand, attempts FROM jobs WHERE state = ? ORDER BY priority, seq LIMIT ?",
+                (QUEUED, max(1, count)),
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE jobs SET state = ?, owner = ?, lease_until = ?, attempts = attempts + 1 WHERE url = ?",
+                [(LEASED, owner, now + visibility, url) for url, _, _, _ in rows],
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return [Lease(url, priority, brand, attempts + 1) for url, priority, brand, attempts in rows]
+
+    def _finish(self, lease: Lease, owner: str, state: int) -> bool:
+        # Only the current holder may finish a lease; after a timeout it belongs to someone else
+        cur = self.conn.execute(
+            "UPDATE jobs SET state = ?, owner = NULL, lease_until = 0 WHERE url = ? AND state = ? AND owner = ?",
+            (state, lease.url, LEASED, owner),
+        )
+        return cur.rowcount > 0
+
+    def ack(self, lease: Lease, owner: str) -> bool:
+        """Mark a leased URL done; False if the lease had already run out."""
+        return self._finish(lease, owner, DONE)
+
+    def fail(self, lease: Lease, owner: str, max_attempts: int = 3) -> bool:
+        """Hand the URL back for another try, or give up on it after ``max_attempts``."""
+        return self._finish(lease, owner, FAILED if lease.attempts >= max_attempts else QUEUED)
+
+    def extend(self, lease: Lease, owner: str, visibility: float) -> bool:
+        """Keep a lease for another ``visibility`` seconds from now."""
+        cur = self.conn.execute(
+            "UPDATE jobs SET lease_until = ? WHERE url = ? AND state = ? AND owner = ?",
+            (self.clock() + visibility, lease.url, LEASED, owner),
+        )
+        return cur.rowcount > 0
+
+    def counts(self) -> Dict[str, int]:
+        out = {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+        names = {QUEUED: "queued", LEASED: "leased", DONE: "done", FAILED: "failed"}
+        for state, n in self.conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"):
+            out[names[state]] = n
+        return out
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __repr__(self) -> str:
+        return f"sqlite:{self.path}"
+
+
+class RedisWorkQueue:
+    """Work queue in Redis (or anything speaking the same commands).
+
+    Keys under ``name``:
+
+        :seen      set of every URL ever queued
+        :queue     sorted set, score = priority * 1e12 + queue order
+        :leases    sorted set, score = lease expiry (unix time)
+        :jobs      hash url -> "priority|attempts|owner|brand"
+        :done      counter
+        :failed    set
+
+    Taking a URL is a ZPOPMIN, so two workers never get the same one; an
+    expired lease is moved back by whichever worker wins its ZREM.
+    """
+
+    def __init__(self, client, name: str = "fragrantica", *, clock: Callable[[], float] = time.time) -> None:
+        self.client = client
+        self.name = name
+        self.clock = clock
+
+    def _key(self, part: str) -> str:
+        return f"{self.name}:{part}"
+
+    @staticmethod
+    def _str(value) -> str:
+        return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+    def _job(self, url: str) -> tuple:
+        raw = self.client.hget(self._key("jobs"), url)
+        priority, attempts, owner, brand = self._str(raw).split("|", 3) if raw is not None else ("2", "0", "", "")
+        return int(priority), int(attempts), owner, brand or None
+
+    def _set_job(self, url: str, priority: int, attempts: int, owner: str, brand: Optional[str]) -> None:
+        self.client.hset(self._key("jobs"), url, f"{priority}|{attempts}|{owner}|{brand or ''}")
+
+    def _enqueue(self, url: str, priority: int) -> None:
+        seq = self.client.incr(self._key("seq"))
+        self.client.zadd(self._key("queue"), {url: priority * 1e12 + seq})
+
+    def put(self, urls: Iterable[str], priority: int, brand: Optional[str] = None) -> int:
+        added = 0
+        for url in dict.fromkeys(urls):
+            if self.client.sadd(self._key("seen"), url):
+                self._set_job(url, priority, 0, "", brand)
+                self._enqueue(url, priority)
+                added += 1
+        return added
+
+    def lease(self, owner: str, count: int = 1, visibility: float = 600.0) -> List[Lease]:
+        now = self.clock()
+        for member in self.client.zrangebyscore(self._key("leases"), "-inf", now):
+            url = self._str(member)
+            if self.client.zrem(self._key("leases"), url):
+                self._enqueue(url, self._job(url)[0])
+        leases = []
+        for member, _ in self.client.zpopmin(self._key("queue"), max(1, count)):
+            url = self._str(member)
+            priority, attempts, _, brand = self._job(url)
+            self.client.zadd(self._key("leases"), {url: now + visibility})
+            self._set_job(url, priority, attempts + 1, owner, brand)
+            leases.append(Lease(url, priority, brand, attempts + 1))
+        return leases
+
+    def _release(self, lease: Lease, owner: str) -> bool:
+        if self._job(lease.url)[2] != owner or not self.client.zrem(self._key("leases"), lease.url):
+            return False
+        self._set_job(lease.url, lease.priority, lease.attempts, "", lease.brand)
+        return True
+
+    def ack(self, lease: Lease, owner: str) -> bool:
+        if not self._release(lease, owner):
+            return False
+        self.client.incr(self._key("done"))
+        return True
+
+    def fail(self, lease: Lease, owner: str, max_attempts: int = 3) -> bool:
+        if not self._release(lease, owner):
+            return False
+        if lease.attempts >= max_attempts:
+            self.client.sadd(self._key("failed"), lease.url)
+        else:
+            self._enqueue(lease.url, lease.priority)
+        return True
+
+    def extend(self, lease: Lease, owner: str, visibility: float) -> bool:
+        if self._job(lease.url)[2] != owner or self.client.zscore(self._key("leases"), lease.url) is None:
+            return False
+        self.client.zadd(self._key("leases"), {lease.url: self.clock() + visibility})
+        return True
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "queued": int(self.client.zcard(self._key("queue"))),
+            "leased": int(self.client.zcard(self._key("leases"))),
+            "done": int(self.client.get(self._key("done")) or 0),
+            "failed": int(self.client.scard(self._key("failed"))),
+        }
+
+    def close(self) -> None:
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            close()
+
+    def __repr__(self) -> str:
+        return f"redis:{self.name}"
+
+
+WorkQueue = Union[SQLiteWorkQueue, RedisWorkQueue]
+
+
+def open_work_queue(spec: Optional[str] = None, name: str = "fragrantica") -> WorkQueue:
+    """``redis://...`` opens a RedisWorkQueue, anything else is a SQLite file path."""
+    spec = spec or DEFAULT_WORK_QUEUE
+    if spec.startswith(("redis://", "rediss://", "unix://")):
+        if not HAS_REDIS:
+            raise RuntimeError("A redis:// queue needs the redis package: pip install redis")
+        return RedisWorkQueue(redis.Redis.from_url(spec), name)
+    return SQLiteWorkQueue(spec)
+
+
+__all__ = [
+    "DEFAULT_WORK_QUEUE",
+    "HAS_REDIS",
+    "Lease",
+    "RedisWorkQueue",
+    "SQLiteWorkQueue",
+    "WorkQueue",
+    "open_work_queue",
+]
@@ -10,7 +10,15 @@ import copy
 import sys
 from pathlib import Path
 
+from fragrantica_scraper.config import DEFAULT_CACHE_DIR, SAVED_DATA_DIR, STATE_DIR
 from fragrantica_scraper.crawler import crawl
+from fragrantica_scraper.html_backend import HTML_BACKEND, HTML_BACKENDS
+from fragrantica_scraper.id_index import DEFAULT_ID_INDEX
+from fragrantica_scraper.multi_brand import run_brands_parallel
+from fragrantica_scraper.negative_cache import DEFAULT_NEGATIVE_CACHE
+from fragrantica_scraper.pipeline import default_parse_workers
+from fragrantica_scraper.proxies import build_proxy_pool
+from fragrantica_scraper.storage import DEFAULT_ALIASES, FSYNC_POLICIES
 
 
 def _read_brands_file(path: str) -> list[str]:
@@ -68,6 +76,15 @@ def main() -> None:
             "Runs brand-by-brand and writes one CSV per brand."
         ),
     )
+    parser.add_argument(
+        "--parallel-brands",
+        type=int,
+        default=1,
+        help=(
+            "With --brands/--brands-file: run up to N brands at once, each on its own share of the proxies. "
+            "Proxy sessions, --global-rate and the perfume ID index stay global across them. Default: 1."
+        ),
+    )
     parser.add_argument("--out-csv", default="perfumes.csv", help="Path to output CSV file.")
     parser.add_argument(
         "--max-pages",
@@ -78,6 +95,24 @@ def main() -> None:
     parser.add_argument(
         "--delay-seconds", type=float, default=5.0, help="Base politeness delay between requests."
     )
+    parser.add_argument(
+        "--rate-per-proxy",
+        type=float,
+        default=None,
+        help="Requests/second allowed per proxy identity (default: one per --delay-seconds, with jitter).",
+    )
+    parser.add_argument(
+        "--global-rate",
+        type=float,
+        default=0.0,
+        help="Requests/second allowed against the site across all proxies. 0 = no global cap.",
+    )
+    parser.add_argument(
+        "--burst",
+        type=float,
+        default=1.0,
+        help="Token-bucket capacity: how many requests a rested proxy may send back-to-back.",
+    )
     parser.add_argument("--timeout", type=float, default=20.0, help="HTTP timeout in seconds.")
     parser.add_argument(
         "--user-agent",
@@ -88,13 +123,13 @@ def main() -> None:
         "--session-size",
         type=int,
         default=30,
-        help="Number of perfume pages to save before taking a longer cooldown break.",
+        help="Perfume pages a proxy (or the direct connection) saves before it rests; the others keep going.",
     )
     parser.add_argument(
         "--session-break-seconds",
         type=float,
         default=900,
-        help="Cooldown duration (in seconds) after each session. Default 900s (15 minutes).",
+        help="How long a proxy rests (in seconds) after each session. Default 900s (15 minutes).",
     )
     parser.add_argument(
         "--proxy",
@@ -111,6 +146,130 @@ def main() -> None:
         default=30,
         help="Rotate proxy after N requests (independent of session breaks). Default: 30.",
     )
+    parser.add_argument(
+        "--async-fetch",
+        action="store_true",
+        help=(
+            "Brand mode: fetch perfume pages concurrently with one polite worker per proxy. "
+            "Each proxy keeps the --delay-seconds pacing, so throughput scales with the proxy count."
+        ),
+    )
+    parser.add_argument(
+        "--html-parser",
+        choices=("auto",) + HTML_BACKENDS,
+        default="auto",
+        help=f"HTML parser backend. auto picks the fastest installed one (here: {HTML_BACKEND}); bs4 is the slow fallback.",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help=f"Brand mode: parser processes behind the fetchers (default {default_parse_workers()}; "
+             "0 = parse on the writer thread). Parsed pages are saved by a single writer.",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=("sqlite", "csv"),
+        default="sqlite",
+        help=(
+            "Where rows go. sqlite (default): a WAL-mode database next to the CSV (or --db), "
+            "with batched upserts; the CSV is exported from it at the end of the run. "
+            "csv: append each row to the CSV directly."
+        ),
+    )
+    parser.add_argument("--db", default=None, help="SQLite database path (default: the output CSV path with .sqlite3).")
+    parser.add_argument(
+        "--db-batch-size",
+        type=int,
+        default=200,
+        help="Commit buffered rows to SQLite every N rows (or --db-flush-seconds, whichever comes first).",
+    )
+    parser.add_argument("--db-flush-seconds", type=float, default=5.0, help="Commit buffered rows at least this often.")
+    parser.add_argument(
+        "--csv-flush-rows",
+        type=int,
+        default=50,
+        help="--storage csv: write buffered rows every N rows (or --csv-flush-seconds, or at a session break).",
+    )
+    parser.add_argument("--csv-flush-seconds", type=float, default=10.0, help="--storage csv: write buffered rows at least this often.")
+    parser.add_argument(
+        "--id-index",
+        default=None,
+        help=f"Index of saved perfume IDs across all CSVs in {SAVED_DATA_DIR}/ (default {DEFAULT_ID_INDEX}).",
+    )
+    parser.add_argument(
+        "--no-id-index",
+        action="store_true",
+        help="Only skip perfumes already in the output CSV, not ones saved under other brands.",
+    )
+    parser.add_argument(
+        "--aliases",
+        default=None,
+        help=(
+            "Redirects seen so far (old perfume ID -> new one), so a perfume that moved is not fetched again "
+            f"from its old URL (default {DEFAULT_ALIASES})."
+        ),
+    )
+    parser.add_argument(
+        "--negative-cache",
+        default=None,
+        help=(
+            "Perfume pages that were empty on a recent visit (no ratings yet, 404) and are "
+            f"not fetched again until their retry-after time (default {DEFAULT_NEGATIVE_CACHE})."
+        ),
+    )
+    parser.add_argument(
+        "--no-negative-cache",
+        action="store_true",
+        help="Fetch every page, whatever the negative cache says, and record nothing.",
+    )
+    parser.add_argument(
+        "--frontier",
+        default=None,
+        help=(
+            "Free crawl only: SQLite file holding the crawl queue, checkpointed as it runs so an interrupted "
+            f"crawl continues where it stopped (default {STATE_DIR}/frontier/<csv name>.sqlite3)."
+        ),
+    )
+    parser.add_argument(
+        "--fresh-frontier",
+        action="store_true",
+        help="Free crawl only: drop an unfinished queue from an earlier run and start from the seeds.",
+    )
+    parser.add_argument(
+        "--fsync",
+        choices=FSYNC_POLICIES,
+        default="none",
+        help=(
+            "Durability of saved rows. none: hand each batch to the OS (a crash loses at most one batch). "
+            "batch: also fsync every CSV batch / SQLite commit, which is slower but survives power loss."
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help=f"Keep every fetched page in this compressed on-disk cache (e.g. {DEFAULT_CACHE_DIR}).",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help=(
+            "Offline mode: serve pages only from the cache (--cache-dir, default "
+            f"{DEFAULT_CACHE_DIR}) and never touch the network. Useful after a parser change."
+        ),
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=0.0,
+        help="Prune the cache to this size (oldest pages first) after each run. 0 = unlimited.",
+    )
+    parser.add_argument(
+        "--cache-max-age-days",
+        type=float,
+        default=0.0,
+        help="Drop cached pages older than this after each run. 0 = keep forever.",
+    )
 
     # Provide a friendlier message if no arguments were supplied, instead of argparse error
     if len(sys.argv) == 1:
@@ -159,7 +318,12 @@ def main() -> None:
             print("[error] Do not combine --start-url with --brands/--brands-file", file=sys.stderr)
             sys.exit(2)
 
-        saved_since_break = 0
+        if args.parallel_brands > 1 and len(brands) > 1:
+            run_brands_parallel(args, brands, crawl)
+            return
+
+        # One pool for every brand, so each proxy's session carries over to the next brand
+        pool = build_proxy_pool(args)
 
         for i, brand in enumerate(brands, 1):
             print(f"\n[multi] Brand {i}/{len(brands)}: {brand}")
@@ -169,12 +333,9 @@ def main() -> None:
             # Keep default so crawler auto-names to Saved Data/<brand>.csv
             per_brand_args.out_csv = "perfumes.csv"
 
-            # Carry the "saved since last cooldown" counter across brands so session-size is global.
-            per_brand_args.saved_since_break = saved_since_break
+            per_brand_args.shared_proxy_pool = pool
 
             crawl(per_brand_args)
-
-            saved_since_break = int(getattr(per_brand_args, "saved_since_break_end", saved_since_break) or 0)
         return
 
     crawl(args)
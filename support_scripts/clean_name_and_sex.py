@@ -9,85 +9,127 @@ Changes applied:
   - name: removes a trailing repetition of the brand name, e.g.
           brand="Affinessence", name="Gingembre Latte Affinessence"
           → "Gingembre Latte"
+
+The rules are the ones the crawler applies when a row is created
+(fragrantica_scraper/normalize.py), imported from there, so this script
+only matters for CSVs saved before that.
+
+Files are cleaned in parallel (one per worker process, --jobs). A manifest
+("Saved Data/.state/clean_manifest.json") keeps the size, mtime and SHA-256
+each file had after its last clean run, together with NORMALIZE_VERSION:
+files whose size and mtime still match are skipped without being opened,
+and files that were only touched are skipped once their hash matches, so
+re-running on a clean tree is near-instant. A new rule in normalize.py
+raises NORMALIZE_VERSION, which has every file re-checked. --force ignores
+the manifest.
 """
 
+import argparse
 import csv
+import hashlib
+import io
+import json
 import os
 import shutil
 import sys
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fragrantica_scraper.normalize import NORMALIZE_VERSION, normalize_columns, normalize_row  # noqa: E402
+
 SAVED_DATA = Path(__file__).parent.parent / "Saved Data"
+MANIFEST = SAVED_DATA / ".state" / "clean_manifest.json"
 
 
 def clean_row(row: dict) -> tuple[dict, bool]:
     """Return (cleaned_row, changed) without mutating the original."""
-    changed = False
     cleaned = dict(row)
+    changed = normalize_row(cleaned)
+    return cleaned, bool(changed)
+
 
-    if cleaned.get("sex") == "women and men":
-        cleaned["sex"] = "unisex"
-        changed = True
+def clean_columns(names: list, brands: list, sexes: list) -> tuple[list, list]:
+    """The clean_row rules applied a whole column at a time.
+
+    Returns the new (names, sexes); same result as clean_row on every row,
+    without building a dict per row.
+    """
+    cleaned = normalize_columns({"name": names, "brand": brands, "sex": sexes})
+    return cleaned["name"], cleaned["sex"]
 
-    original_name = cleaned.get("name", "")
-    new_name = original_name.replace("for women and men", "").strip()
-    # Collapse any double spaces left behind (e.g. "Name  Brand" → "Name Brand")
-    new_name = " ".join(new_name.split())
 
-    # Remove trailing brand name repetition
-    # e.g. brand="Affinessence", name="Gingembre Latte Affinessence" → "Gingembre Latte"
-    brand = cleaned.get("brand", "").strip()
-    if brand and new_name.endswith(brand):
-        candidate = new_name[: -len(brand)].strip()
-        if candidate:  # never leave the name empty
-            new_name = candidate
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
 
-    if new_name != original_name:
-        cleaned["name"] = new_name
-        changed = True
 
-    return cleaned, changed
+def _stamp(path: Path, sha256: str) -> dict:
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256, "rules": NORMALIZE_VERSION}
 
 
-def process_csv(path: Path) -> tuple[int, int]:
+def process_csv(path: Path, known_sha256: str | None = None) -> tuple[int, int, dict | None]:
     """
     Clean a single CSV file in place (atomic write).
-    Returns (rows_changed, total_rows).
+    Returns (rows_changed, total_rows, stamp); ``stamp`` describes the file
+    as left on disk. A file whose hash equals ``known_sha256`` is not parsed.
     """
-    rows: list[dict] = []
-    with open(path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        if not reader.fieldnames:
-            return 0, 0
-        fieldnames = list(reader.fieldnames)
-        # Only process files that have both target columns
-        if "name" not in fieldnames and "sex" not in fieldnames:
-            return 0, 0
-        for row in reader:
-            rows.append(row)
-
+    raw = path.read_bytes()
+    sha = _sha256(raw)
+    if known_sha256 is not None and sha == known_sha256:
+        return 0, 0, _stamp(path, sha)
+
+    reader = csv.reader(io.StringIO(raw.decode("utf-8"), newline=""))
+    header = next(reader, None)
+    if not header:
+        return 0, 0, _stamp(path, sha)
+    fieldnames = list(header)
+    # Only process files that have both target columns
+    if "name" not in fieldnames and "sex" not in fieldnames:
+        return 0, 0, _stamp(path, sha)
+    width = len(fieldnames)
+    rows = [r + [""] * (width - len(r)) if len(r) < width else r for r in reader if r]
     if not rows:
-        return 0, 0
-
-    changed_count = 0
-    cleaned_rows: list[dict] = []
-    for row in rows:
-        cleaned, changed = clean_row(row)
-        cleaned_rows.append(cleaned)
-        if changed:
-            changed_count += 1
-
-    if changed_count == 0:
-        return 0, len(rows)
+        return 0, 0, _stamp(path, sha)
+
+    def column(field: str) -> list:
+        if field not in fieldnames:
+            return [""] * len(rows)
+        i = fieldnames.index(field)
+        return [r[i] for r in rows]
+
+    names, sexes = column("name"), column("sex")
+    new_names, new_sexes = clean_columns(names, column("brand"), sexes)
+    if "name" not in fieldnames:
+        new_names = names
+    if "sex" not in fieldnames:
+        new_sexes = sexes
+    changed = [i for i, (a, b, c, d) in enumerate(zip(names, new_names, sexes, new_sexes)) if a != b or c != d]
+    if not changed:
+        return 0, len(rows), _stamp(path, sha)
+
+    name_i = fieldnames.index("name") if "name" in fieldnames else None
+    sex_i = fieldnames.index("sex") if "sex" in fieldnames else None
+    for i in changed:
+        if name_i is not None:
+            rows[i][name_i] = new_names[i]
+        if sex_i is not None:
+            rows[i][sex_i] = new_sexes[i]
+
+    out = io.StringIO(newline="")
+    writer = csv.writer(out, lineterminator="\r\n")
+    writer.writerow(fieldnames)
+    writer.writerows(rows)
+    data = out.getvalue().encode("utf-8")
 
     # Atomic write: temp file → rename
     fd, tmp_path = tempfile.mkstemp(suffix=".csv", dir=path.parent)
     try:
-        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(cleaned_rows)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
         shutil.move(tmp_path, path)
     except Exception:
         try:
@@ -96,32 +138,90 @@ def process_csv(path: Path) -> tuple[int, int]:
             pass
         raise
 
-    return changed_count, len(rows)
+    return len(changed), len(rows), _stamp(path, _sha256(data))
+
+
+def _process(job: tuple[Path, str | None]) -> tuple[Path, tuple | None, str | None]:
+    path, known = job
+    try:
+        return path, process_csv(path, known), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def load_manifest() -> dict:
+    try:
+        with open(MANIFEST, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest: dict) -> None:
+    MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST.with_name(MANIFEST.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, MANIFEST)
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Clean name and sex columns in every CSV under Saved Data/.")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: one per CPU; 1 cleans serially in-process)")
+    parser.add_argument("--force", action="store_true", help="Re-check every file, ignoring the manifest")
+    args = parser.parse_args()
+
     csv_files = sorted(SAVED_DATA.rglob("*.csv"))
 
     if not csv_files:
         print(f"No CSV files found in {SAVED_DATA}")
         sys.exit(0)
 
-    total_files_changed = 0
-    total_rows_changed = 0
-
+    previous = {} if args.force else load_manifest()
+    manifest: dict[str, dict] = {}
+    jobs: list[tuple[Path, str | None]] = []
     for csv_path in csv_files:
+        rel = csv_path.relative_to(SAVED_DATA).as_posix()
+        entry = previous.get(rel)
+        if entry and entry.get("rules") != NORMALIZE_VERSION:
+            entry = None
         try:
-            rows_changed, total_rows = process_csv(csv_path)
-        except Exception as e:
-            print(f"  [error] {csv_path.relative_to(SAVED_DATA)}: {e}", file=sys.stderr)
+            st = csv_path.stat()
+        except OSError:
+            continue
+        if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+            manifest[rel] = entry  # untouched since it was last cleaned
             continue
+        jobs.append((csv_path, entry.get("sha256") if entry else None))
 
+    skipped = len(csv_files) - len(jobs)
+    total_files_changed = 0
+    total_rows_changed = 0
+
+    if args.jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(jobs))) as pool:
+            results = list(pool.map(_process, jobs, chunksize=max(1, len(jobs) // (4 * args.jobs))))
+    else:
+        results = [_process(job) for job in jobs]
+
+    for csv_path, result, error in results:
+        rel = csv_path.relative_to(SAVED_DATA)
+        if error is not None:
+            print(f"  [error] {rel}: {error}", file=sys.stderr)
+            continue
+        rows_changed, total_rows, stamp = result
+        if stamp is not None:
+            manifest[rel.as_posix()] = stamp
         if rows_changed > 0:
-            rel = csv_path.relative_to(SAVED_DATA)
             print(f"  {rel}: {rows_changed}/{total_rows} rows updated")
             total_files_changed += 1
             total_rows_changed += rows_changed
 
+    save_manifest(manifest)
+
+    if skipped:
+        print(f"Skipped {skipped} file(s) unchanged since the last clean run.")
     if total_files_changed == 0:
         print("Nothing to clean — all files are already up to date.")
     else:
@@ -4,20 +4,48 @@ join_fragrances.py
 Merges all brand CSV files from "Saved Data/" into the master all_brands_clean.csv,
 deduplicates by URL, and sorts alphabetically by brand then fragrance name.
 
+A perfume that moved on Fragrantica can be in the files under its old and its new URL.
+The crawler records every redirect it follows in "Saved Data/.state/perfume_aliases.tsv"
+(see fragrantica_scraper.storage.AliasMap); URLs are compared after following those
+aliases, so the two collapse into one row, the one saved under the current URL.
+
 Only files directly inside "Saved Data/" are included — subdirectories (e.g. Perfumerie/)
 are ignored. Files whose columns do not exactly match the master schema are skipped with
 a warning so no malformed data enters the master.
 
+Runs are incremental. A manifest ("Saved Data/.state/join_manifest.json") records the
+size, mtime and SHA-256 of every brand file already merged and of the master as last
+written. Unchanged brand files are skipped without being opened (a file is only hashed
+when its size or mtime moved). Changed files are sorted on their own and streamed into
+the already-sorted master with a k-way merge, so memory stays proportional to the
+changed brands rather than the whole corpus, and the master is not rewritten at all when
+they bring no new URLs. If the master was edited by hand since the last join (or there
+is no manifest yet), or new redirects were recorded, the whole corpus is re-merged once.
+
 Usage:
-    python support_scripts/join_fragrances.py
+    python support_scripts/join_fragrances.py          # incremental
+    python support_scripts/join_fragrances.py --full   # re-merge every brand file
 """
 
+import argparse
 import csv
+import hashlib
+import heapq
+import json
+import os
 import sys
 from pathlib import Path
+from typing import Iterator
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fragrantica_scraper.storage import AliasMap  # noqa: E402
 
 SAVED_DATA = Path(__file__).parent.parent / "Saved Data"
 MASTER_CSV = SAVED_DATA / "all_brands_clean.csv"
+MANIFEST = SAVED_DATA / ".state" / "join_manifest.json"
+ALIASES = SAVED_DATA / ".state" / "perfume_aliases.tsv"
 COLUMNS = ["brand", "name", "rating", "votes", "url", "last_crawled", "sex", "fragrance_category"]
 
 
@@ -42,18 +70,47 @@ def check_columns(path: Path) -> bool:
     return True
 
 
-def read_csv(path: Path) -> list[dict]:
-    rows = []
+def iter_csv(path: Path) -> Iterator[dict]:
+    """Stream the rows of a CSV, skipping rows without a URL."""
     try:
         with open(path, newline="", encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if not row.get("url", "").strip():
+            for row in csv.DictReader(f):
+                if not (row.get("url") or "").strip():
                     continue
-                rows.append(row)
+                yield row
+    except FileNotFoundError:
+        return
     except Exception as e:
         print(f"  Warning: could not read {path.name}: {e}", file=sys.stderr)
-    return rows
+
+
+def read_csv(path: Path) -> list[dict]:
+    return list(iter_csv(path))
+
+
+def sort_key(row: dict) -> tuple:
+    """Brand (case-insensitive), then name."""
+    return ((row.get("brand") or "").casefold(), (row.get("name") or "").casefold())
+
+
+def dedupe_key(url: str, aliases: AliasMap | None) -> str:
+    """The URL a row is deduplicated by: its own, or the one it redirects to."""
+    url = url.strip()
+    return aliases.canonical_url(url) if aliases is not None else url
+
+
+def keep_row(seen: dict, key: str, row: dict) -> bool:
+    """Keep ``row`` under ``key`` unless a row is there already; True if the key is new.
+
+    A row saved under the canonical URL replaces one saved under an alias.
+    """
+    current = seen.get(key)
+    if current is None:
+        seen[key] = row
+        return True
+    if row["url"].strip() == key and current["url"].strip() != key:
+        seen[key] = row
+    return False
 
 
 def collect_brand_csvs() -> list[Path]:
@@ -64,46 +121,197 @@ def collect_brand_csvs() -> list[Path]:
     )
 
 
-def main():
-    # --- Load master ---
+# --- Manifest ---------------------------------------------------------------
+
+def file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_stamp(path: Path, previous: dict | None = None) -> dict | None:
+    """Size, mtime and hash of ``path``; the hash is reused while size and mtime match."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    stamp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if previous and all(previous.get(k) == v for k, v in stamp.items()):
+        stamp["sha256"] = previous.get("sha256")
+    else:
+        stamp["sha256"] = file_hash(path)
+    return stamp
+
+
+def load_manifest() -> dict:
+    try:
+        with open(MANIFEST, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"master": None, "files": {}, "aliases": None}
+    manifest.setdefault("master", None)
+    manifest.setdefault("files", {})
+    manifest.setdefault("aliases", None)
+    return manifest
+
+
+def save_manifest(manifest: dict) -> None:
+    MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST.with_name(MANIFEST.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, MANIFEST)
+
+
+# --- Writing ----------------------------------------------------------------
+
+def write_master(rows) -> int:
+    """Write ``rows`` to a temporary file and swap it in; returns the row count."""
+    tmp = MASTER_CSV.with_name(MASTER_CSV.name + ".tmp")
+    count = 0
+    with open(tmp, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    os.replace(tmp, MASTER_CSV)
+    return count
+
+
+def full_join(brand_csvs: list[Path], aliases: AliasMap | None = None) -> tuple[int, int]:
+    """Re-merge every brand file into the master (in memory); returns (new, total)."""
     print(f"Reading master: {MASTER_CSV.name}")
     master_rows = read_csv(MASTER_CSV)
     print(f"  {len(master_rows)} existing rows")
 
-    seen_urls: dict[str, dict] = {row["url"]: row for row in master_rows}
+    seen_urls: dict[str, dict] = {}
+    for row in master_rows:
+        keep_row(seen_urls, dedupe_key(row["url"], aliases), row)
     new_count = 0
 
-    # --- Load brand files ---
-    brand_csvs = collect_brand_csvs()
-    print(f"\nFound {len(brand_csvs)} brand CSV file(s) to merge:")
-
+    print(f"\nMerging {len(brand_csvs)} brand CSV file(s):")
     for csv_path in brand_csvs:
-        if not check_columns(csv_path):
-            continue
         rows = read_csv(csv_path)
         added = 0
         for row in rows:
-            url = row["url"].strip()
-            if url not in seen_urls:
-                seen_urls[url] = row
+            if keep_row(seen_urls, dedupe_key(row["url"], aliases), row):
                 added += 1
         print(f"  {csv_path.name}: {len(rows)} rows, {added} new")
         new_count += added
 
-    # --- Sort: brand (case-insensitive), then name ---
-    merged = sorted(
-        seen_urls.values(),
-        key=lambda r: (r.get("brand", "").casefold(), r.get("name", "").casefold()),
+    total = write_master(sorted(seen_urls.values(), key=sort_key))
+    return new_count, total
+
+
+def incremental_join(changed: list[Path], aliases: AliasMap | None = None) -> tuple[int, int | None]:
+    """Stream ``changed`` brand files into the sorted master with a k-way merge.
+
+    Returns (new, total); total is None when nothing new was found and the
+    master was left untouched.
+    """
+    # Candidate rows from the changed files only; the first file to list a URL wins
+    # (unless a later one has the perfume under its canonical URL)
+    candidates: dict[str, tuple[int, dict]] = {}
+    print(f"Merging {len(changed)} changed brand CSV file(s):")
+    for i, csv_path in enumerate(changed):
+        rows = 0
+        for row in iter_csv(csv_path):
+            rows += 1
+            key = dedupe_key(row["url"], aliases)
+            current = candidates.get(key)
+            if current is None or (row["url"].strip() == key and current[1]["url"].strip() != key):
+                candidates[key] = (i, row)
+        print(f"  {csv_path.name}: {rows} rows")
+
+    # One streaming pass drops the URLs the master already has. A master row
+    # saved under an alias gives way to a candidate under the canonical URL.
+    replaced: set[str] = set()
+    for row in iter_csv(MASTER_CSV):
+        url = row["url"].strip()
+        key = dedupe_key(url, aliases)
+        candidate = candidates.get(key)
+        if candidate is None:
+            continue
+        if url != key and candidate[1]["url"].strip() == key:
+            replaced.add(row["url"])
+        else:
+            candidates.pop(key)
+    if not candidates:
+        return 0, None
+
+    # One sorted run per file; heapq.merge keeps the master's rows first and
+    # the files in order on ties, matching the stable sort of a full join.
+    runs: list[list[dict]] = [[] for _ in changed]
+    for i, row in candidates.values():
+        runs[i].append(row)
+    for run in runs:
+        run.sort(key=sort_key)
+    master = (row for row in iter_csv(MASTER_CSV) if row["url"] not in replaced)
+    total = write_master(heapq.merge(master, *runs, key=sort_key))
+    new_count = len(candidates) - sum(1 for row in replaced if dedupe_key(row, aliases) in candidates)
+    return new_count, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge brand CSVs into the master CSV.")
+    parser.add_argument("--full", action="store_true", help="Re-merge every brand file, ignoring the manifest")
+    args = parser.parse_args()
+
+    manifest = load_manifest()
+    master_stamp = file_stamp(MASTER_CSV, manifest["master"])
+    aliases_stamp = file_stamp(ALIASES, manifest["aliases"])
+    aliases = AliasMap(str(ALIASES)) if aliases_stamp is not None else None
+    full = (
+        args.full
+        or master_stamp is None
+        or manifest["master"] is None
+        or master_stamp["sha256"] != manifest["master"].get("sha256")
     )
+    if full and not args.full:
+        print("Master is new or was edited since the last join; re-merging everything.")
+    elif (aliases_stamp or {}).get("sha256") != (manifest["aliases"] or {}).get("sha256"):
+        # Rows merged earlier may be aliases of each other now
+        print("New redirect aliases since the last join; re-merging everything.")
+        full = True
 
-    # --- Write master ---
-    with open(MASTER_CSV, "w", newline="", encoding="utf-8-sig") as f:
-        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
-        writer.writeheader()
-        writer.writerows(merged)
+    # --- Find brand files that changed since they were last merged ---
+    brand_csvs = collect_brand_csvs()
+    files: dict[str, dict] = {}
+    changed: list[Path] = []
+    for csv_path in brand_csvs:
+        previous = manifest["files"].get(csv_path.name)
+        stamp = file_stamp(csv_path, previous)
+        if stamp is None:
+            continue
+        if not full and previous and stamp["sha256"] == previous.get("sha256"):
+            files[csv_path.name] = stamp
+            continue
+        if not check_columns(csv_path):
+            continue
+        files[csv_path.name] = stamp
+        changed.append(csv_path)
+    print(f"Found {len(brand_csvs)} brand CSV file(s), {len(changed)} to merge.\n")
+
+    if full:
+        new_count, total = full_join(changed, aliases)
+    elif changed:
+        new_count, total = incremental_join(changed, aliases)
+    else:
+        new_count, total = 0, None
+
+    if total is not None:
+        master_stamp = file_stamp(MASTER_CSV)
+    manifest = {"master": master_stamp, "files": files, "aliases": aliases_stamp}
+    save_manifest(manifest)
 
-    print(f"\nDone. {new_count} new fragrances added. Master now has {len(merged)} rows.")
-    print(f"Saved to: {MASTER_CSV}")
+    if total is None:
+        print(f"\nDone. No new fragrances; {MASTER_CSV.name} left unchanged.")
+    else:
+        print(f"\nDone. {new_count} new fragrances added. Master now has {total} rows.")
+        print(f"Saved to: {MASTER_CSV}")
 
 
 if __name__ == "__main__":
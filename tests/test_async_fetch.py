@@ -0,0 +1,126 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Ensure repository root is importable under pytest's import mode.
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fragrantica_scraper import async_fetch
+from fragrantica_scraper.async_fetch import AsyncFetchEngine, FetchResult
+from fragrantica_scraper.cache import ResponseCache
+from fragrantica_scraper.network import RateLimiter
+from fragrantica_scraper.proxies import ProxyPool
+
+URL = "https://www.fragrantica.com/perfume/Chanel/Chance-610.html"
+OTHER = "https://www.fragrantica.com/perfume/Chanel/No-5-40069.html"
+
+
+class StubSession:
+    """Stands in for ``_WorkerSession``: answers with a fixed status per proxy."""
+
+    statuses: dict = {}
+    calls: list = []
+
+    def __init__(self, proxy, user_agent, timeout) -> None:
+        self.proxy = proxy
+
+    async def open(self) -> None:
+        pass
+
+    async def get(self, url, headers=None) -> FetchResult:
+        self.calls.append((self.proxy, url, headers))
+        status = self.statuses.get(self.proxy, 200)
+        return FetchResult(url=url, final_url=url, status=status, text="<html/>", content=b"<html/>",
+                           headers={"ETag": '"v1"'}, encoding="utf-8", latency=0.01)
+
+    async def close(self) -> None:
+        pass
+
+
+class TestAsyncFetchEngine(unittest.TestCase):
+    def setUp(self) -> None:
+        StubSession.statuses = {}
+        StubSession.calls = []
+        self._patch = mock.patch.object(async_fetch, "_WorkerSession", StubSession)
+        self._patch.start()
+        self._print = mock.patch("builtins.print")
+        self._print.start()
+
+    def tearDown(self) -> None:
+        self._print.stop()
+        self._patch.stop()
+
+    def _run(self, proxies, urls, *, max_retries=3, cache=None, block_cooldown=0.0) -> list:
+        pool = ProxyPool(proxies, block_cooldown=block_cooldown)
+        engine = AsyncFetchEngine(pool, user_agent="test", timeout=5.0, limiter=RateLimiter(0.0),
+                                  max_retries=max_retries, cache=cache)
+        results: list = []
+        engine.run(urls, results.append)
+        return results
+
+    def test_blocked_url_is_requeued_to_another_proxy(self) -> None:
+        StubSession.statuses = {"http://a": 403}
+        # The blocked proxy sits out its cooldown, so the other worker takes the URL
+        results = self._run(["http://a", "http://b"], [URL], block_cooldown=60.0)
+        self.assertEqual(len(results), 1)
+        self.assertTrue(results[0].ok)
+        self.assertEqual((results[0].proxy, results[0].attempts), ("http://b", 2))
+        self.assertEqual([c[0] for c in StubSession.calls], ["http://a", "http://b"])
+
+    def test_gives_up_after_max_retries(self) -> None:
+        StubSession.statuses = {"http://a": 429}
+        results = self._run(["http://a"], [URL], max_retries=2)
+        self.assertEqual(len(StubSession.calls), 2)
+        self.assertEqual([(r.status, r.attempts, r.ok) for r in results], [(429, 2, False)])
+
+    def test_replay_serves_hits_and_reports_misses_without_the_network(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            cache = ResponseCache(root)
+            cache.put(URL, status=200, content=b"<html>cached</html>", encoding="utf-8")
+            cache.replay = True
+            results = {r.url: r for r in self._run(["http://a"], [URL, OTHER], cache=cache)}
+        self.assertEqual(StubSession.calls, [])
+        self.assertTrue(results[URL].ok and results[URL].from_cache)
+        self.assertEqual(results[URL].content, b"<html>cached</html>")
+        self.assertFalse(results[OTHER].ok)
+        self.assertEqual(results[OTHER].status, 504)
+
+    def test_not_modified_is_served_from_the_cache(self) -> None:
+        StubSession.statuses = {"http://a": 304}
+        with tempfile.TemporaryDirectory() as root:
+            cache = ResponseCache(root)
+            cache.put(URL, status=200, content=b"<html>cached</html>", headers={"ETag": '"v1"'}, encoding="utf-8")
+            results = self._run(["http://a"], [URL], cache=cache)
+        self.assertEqual(StubSession.calls[0][2], {"If-None-Match": '"v1"'})
+        self.assertTrue(results[0].ok and results[0].not_modified)
+        self.assertEqual(results[0].content, b"<html>cached</html>")
+
+    def test_a_blocking_handler_does_not_stall_the_other_workers(self) -> None:
+        both_fetched = threading.Event()
+        waited = []
+
+        class TrackingSession(StubSession):
+            async def get(self, url, headers=None) -> FetchResult:
+                result = await super().get(url, headers)
+                if len(self.calls) == 2:
+                    both_fetched.set()
+                return result
+
+        def on_result(result: FetchResult) -> None:
+            # Like ParsePipeline.submit with the writer behind
+            if not waited:
+                waited.append(both_fetched.wait(timeout=5.0))
+
+        engine = AsyncFetchEngine(ProxyPool(["http://a", "http://b"]), user_agent="test", timeout=5.0,
+                                  limiter=RateLimiter(0.0))
+        with mock.patch.object(async_fetch, "_WorkerSession", TrackingSession):
+            engine.run([URL, OTHER], on_result)
+        self.assertEqual(waited, [True])
+
+
+if __name__ == "__main__":
+    unittest.main()
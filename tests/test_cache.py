@@ -0,0 +1,131 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+# Ensure repository root is importable under pytest's import mode.
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fragrantica_scraper.cache import ResponseCache
+from fragrantica_scraper.network import fetch
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def get(self, url, timeout=None, **kwargs):
+        self.calls += 1
+        raise AssertionError("replay mode must not touch the network")
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.url = ""
+        self.encoding = "utf-8"
+
+
+class RevalidatingSession:
+    """Answers 304 whenever the request carries the matching ETag."""
+
+    def __init__(self, etag: str) -> None:
+        self.etag = etag
+        self.sent_headers = []
+
+    def get(self, url, timeout=None, headers=None, **kwargs):
+        self.sent_headers.append(headers or {})
+        if (headers or {}).get("If-None-Match") == self.etag:
+            return FakeResponse(304, headers={"ETag": self.etag})
+        return FakeResponse(200, b"fresh page", headers={"ETag": self.etag})
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_round_trip_keeps_body_and_validators(self) -> None:
+        cache = ResponseCache(self.root)
+        body = "<html>Chanel — Chance</html>".encode("utf-8")
+        self.assertTrue(cache.put(
+            "https://fragrantica.com/perfume/Chanel/Chance-21.html#reviews",
+            status=200,
+            content=body,
+            headers={"etag": '"abc"', "Set-Cookie": "x=1"},
+            encoding="utf-8",
+        ))
+        resp = cache.get("https://www.fragrantica.com/perfume/Chanel/Chance-21.html")
+        self.assertIsNotNone(resp)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.content, body)
+        self.assertIn("Chance", resp.text)
+        self.assertEqual(resp.headers, {"ETag": '"abc"'})
+
+    def test_blocked_responses_are_not_cached(self) -> None:
+        cache = ResponseCache(self.root)
+        self.assertFalse(cache.put("https://www.fragrantica.com/x.html", status=429, content=b"slow down"))
+        self.assertIsNone(cache.get("https://www.fragrantica.com/x.html"))
+
+    def test_identical_bodies_share_one_blob(self) -> None:
+        cache = ResponseCache(self.root)
+        cache.put("https://www.fragrantica.com/a.html", status=200, content=b"same")
+        cache.put("https://www.fragrantica.com/b.html", status=200, content=b"same")
+        blobs = [f for _, _, files in os.walk(os.path.join(self.root, "blobs")) for f in files]
+        self.assertEqual(len(blobs), 1)
+
+    def test_replay_serves_hits_and_504s_misses_offline(self) -> None:
+        ResponseCache(self.root).put("https://www.fragrantica.com/a.html", status=200, content=b"page")
+        cache = ResponseCache(self.root, replay=True)
+        session = FakeSession()
+        hit = fetch(session, "https://www.fragrantica.com/a.html", timeout=1.0, cache=cache)
+        miss = fetch(session, "https://www.fragrantica.com/b.html", timeout=1.0, cache=cache)
+        self.assertEqual(hit.text, "page")
+        self.assertEqual(miss.status_code, 504)
+        self.assertTrue(miss.from_cache)
+        self.assertEqual(session.calls, 0)
+
+    def test_revalidation_turns_304_into_cached_page(self) -> None:
+        cache = ResponseCache(self.root)
+        session = RevalidatingSession('"v1"')
+        url = "https://www.fragrantica.com/perfume/Chanel/Chance-21.html"
+
+        first = fetch(session, url, timeout=1.0, cache=cache, headers={"Referer": "x"})
+        self.assertFalse(getattr(first, "not_modified", False))
+        self.assertNotIn("If-None-Match", session.sent_headers[0])
+
+        second = fetch(session, url, timeout=1.0, cache=cache, headers={"Referer": "x"})
+        self.assertEqual(session.sent_headers[1], {"If-None-Match": '"v1"', "Referer": "x"})
+        self.assertTrue(second.not_modified)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.text, "fresh page")
+        # A 304 is a revalidation, not a cache hit
+        self.assertEqual((cache.hits, cache.revalidated), (0, 1))
+
+    def test_prune_drops_oldest_until_under_size_limit(self) -> None:
+        cache = ResponseCache(self.root)
+        for i in range(3):
+            cache.put(f"https://www.fragrantica.com/{i}.html", status=200, content=os.urandom(4096))
+        # Make fetch order deterministic
+        for i, (path, meta) in enumerate(sorted(cache.iter_entries(), key=lambda e: e[1]["url"])):
+            meta["fetched_ts"] = float(i)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+        cache.max_bytes = 2 * 4096 + 1024
+        removed, freed = cache.prune()
+        self.assertEqual(removed, 1)
+        self.assertGreater(freed, 0)
+        self.assertIsNone(cache.get("https://www.fragrantica.com/0.html"))
+        self.assertIsNotNone(cache.get("https://www.fragrantica.com/2.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import csv
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+_spec = importlib.util.spec_from_file_location("clean_name_and_sex", ROOT / "support_scripts" / "clean_name_and_sex.py")
+clean = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(clean)
+
+ROWS = [
+    {"brand": "Affinessence", "name": "Gingembre Latte Affinessence", "sex": "women and men"},
+    {"brand": "Dior", "name": "Sauvage Dior for women and men", "sex": "men"},
+    {"brand": "Dior", "name": "Dior", "sex": "women"},
+    {"brand": " Chanel ", "name": "  No  5   Chanel", "sex": ""},
+    {"brand": "", "name": "Plain", "sex": "unisex"},
+    {"brand": "Guerlain", "name": "for women and men", "sex": "women and men"},
+    {"brand": "Guerlain", "name": "", "sex": ""},
+]
+
+
+class TestCleanNameAndSex(unittest.TestCase):
+    def test_column_rules_match_clean_row(self) -> None:
+        # Column-wise: the rules are mapped over the lists, never row by row
+        with mock.patch.object(clean, "normalize_row", side_effect=AssertionError("per-row pass")):
+            names, sexes = clean.clean_columns(
+                [r["name"] for r in ROWS], [r["brand"] for r in ROWS], [r["sex"] for r in ROWS]
+            )
+        expected = [clean.clean_row(r)[0] for r in ROWS]
+        self.assertEqual(names, [r["name"] for r in expected])
+        self.assertEqual(sexes, [r["sex"] for r in expected])
+
+    def test_second_run_skips_cleaned_files(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            root = Path(root)
+            path = root / "Dior.csv"
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=["brand", "name", "sex"])
+                writer.writeheader()
+                writer.writerows(ROWS)
+
+            def run():
+                with mock.patch.multiple(clean, SAVED_DATA=root, MANIFEST=root / ".state" / "m.json"), \
+                        mock.patch("sys.argv", ["clean", "--jobs", "1"]), mock.patch("builtins.print"):
+                    clean.main()
+
+            run()
+            with open(path, newline="", encoding="utf-8") as f:
+                self.assertEqual([r["sex"] for r in csv.DictReader(f)][0], "unisex")
+            with mock.patch.object(clean, "process_csv", side_effect=AssertionError("file was re-read")):
+                run()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import csv
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Ensure repository root is importable under pytest's import mode.
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "perfume_pages"
+FIELDS = ["brand", "name", "rating", "votes", "url", "last_crawled", "sex", "fragrance_category"]
+
+
+class TestConcurrentEnrich(unittest.TestCase):
+    def _run(self, argv) -> None:
+        import enrich
+
+        with patch("sys.argv", ["enrich.py"] + argv), self.assertRaises(SystemExit) as exit_:
+            enrich.main()
+        self.assertEqual(exit_.exception.code, 0)
+
+    def test_async_fetch_enriches_rows_and_resumes(self) -> None:
+        from fragrantica_scraper.cache import ResponseCache
+
+        page = (FIXTURES / "chanel_chance.html").read_bytes()
+        urls = [f"https://www.fragrantica.com/perfume/Chanel/Perfume-{i}-{100 + i}.html" for i in range(3)]
+        with tempfile.TemporaryDirectory() as td:
+            cache_dir = os.path.join(td, "cache")
+            cache = ResponseCache(cache_dir)
+            for url in urls:
+                cache.put(url, status=200, content=page, encoding="utf-8")
+            csv_path = os.path.join(td, "all.csv")
+            with open(csv_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                for url in urls:
+                    writer.writerow({"brand": "Chanel", "name": "Chance", "rating": "4.2", "votes": "10", "url": url})
+
+            common = ["--csv", csv_path, "--async-fetch", "--replay", "--cache-dir", cache_dir,
+                      "--proxies-file", os.path.join(td, "none.txt"), "--parse-workers", "0"]
+            self._run(common + ["--max-pages", "2"])
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual(sum(bool(r["fragrance_category"]) for r in rows), 2)
+            # The processed rows are remembered, so the next run only does the third
+            self.assertTrue(os.path.exists(csv_path + ".patches.jsonl"))
+
+            self._run(common)
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+            self.assertTrue(all(r["fragrance_category"] for r in rows))
+            self.assertFalse(os.path.exists(csv_path + ".patches.jsonl"))
+
+    def test_async_refresh_logs_unchanged_pages_on_the_writer(self) -> None:
+        from fragrantica_scraper import async_fetch
+        from fragrantica_scraper.async_fetch import FetchResult
+        from fragrantica_scraper.cache import ResponseCache
+
+        url = "https://www.fragrantica.com/perfume/Chanel/Chance-610.html"
+        logged = []
+
+        class NotModified:
+            def __init__(self, proxy, user_agent, timeout) -> None:
+                pass
+
+            async def open(self) -> None:
+                pass
+
+            async def get(self, url, headers=None) -> FetchResult:
+                return FetchResult(url=url, final_url=url, status=304, headers={})
+
+            async def close(self) -> None:
+                pass
+
+        def append(log, url, changes) -> None:
+            logged.append((threading.current_thread().name, url, changes))
+
+        with tempfile.TemporaryDirectory() as td:
+            cache_dir = os.path.join(td, "cache")
+            ResponseCache(cache_dir).put(url, status=200, content=b"<html/>", headers={"ETag": '"v1"'}, encoding="utf-8")
+            csv_path = os.path.join(td, "all.csv")
+            with open(csv_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerow({"brand": "Chanel", "name": "Chance", "rating": "4.2", "votes": "10", "url": url})
+            with patch.object(async_fetch, "_WorkerSession", NotModified), \
+                    patch("fragrantica_scraper.storage.PatchLog.append", append), patch("builtins.print"):
+                self._run(["--csv", csv_path, "--async-fetch", "--refresh", "--cache-dir", cache_dir,
+                           "--proxies-file", os.path.join(td, "none.txt"), "--parse-workers", "0",
+                           "--delay-seconds", "0"])
+        self.assertEqual(logged, [("pipeline-writer", url, {})])
+
+
+if __name__ == "__main__":
+    unittest.main()
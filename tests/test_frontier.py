@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+# Ensure repository root is importable under pytest's import mode.
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fragrantica_scraper.crawler import _link_priority
+from fragrantica_scraper.frontier import PRIORITY_DESIGNER, PRIORITY_OTHER, PRIORITY_PERFUME, Frontier
+from fragrantica_scraper.seen import SeenSet
+
+SAVED = "https://www.fragrantica.com/perfume/Chanel/Chance-610.html"
+NEW = "https://www.fragrantica.com/perfume/Chanel/No-5-40069.html"
+CHANEL = "https://www.fragrantica.com/designers/Chanel.html"
+DIOR = "https://www.fragrantica.com/designers/Dior.html"
+NEWS = "https://www.fragrantica.com/news/some-article.html"
+
+
+class TestFrontier(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "frontier", "Chanel.sqlite3")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_link_priorities(self) -> None:
+        existing = {SAVED}
+        self.assertEqual(_link_priority(NEW, existing, "chanel"), PRIORITY_PERFUME)
+        self.assertEqual(_link_priority(SAVED, existing, "chanel"), PRIORITY_OTHER)
+        self.assertEqual(_link_priority(CHANEL, existing, "chanel"), PRIORITY_DESIGNER)
+        self.assertEqual(_link_priority(DIOR, existing, "chanel"), PRIORITY_OTHER)
+        self.assertEqual(_link_priority(DIOR, existing, None), PRIORITY_DESIGNER)
+
+    def test_pops_by_priority_then_in_order(self) -> None:
+        frontier = Frontier(self.path)
+        frontier.add(NEWS, PRIORITY_OTHER)
+        frontier.add(DIOR, PRIORITY_DESIGNER)
+        frontier.add(CHANEL, PRIORITY_DESIGNER)
+        frontier.add(NEW, PRIORITY_PERFUME)
+        self.assertFalse(frontier.add(NEW, PRIORITY_PERFUME))
+        self.assertEqual([frontier.pop() for _ in range(4)], [NEW, DIOR, CHANEL, NEWS])
+        self.assertIsNone(frontier.pop())
+        frontier.close()
+
+    def test_restart_continues_where_it_stopped(self) -> None:
+        frontier = Frontier(self.path, checkpoint_every=1)
+        frontier.add(CHANEL, PRIORITY_DESIGNER)
+        self.assertEqual(frontier.pop(), CHANEL)
+        frontier.add(NEW, PRIORITY_PERFUME)
+        frontier.add(SAVED, PRIORITY_PERFUME)
+        frontier.done(CHANEL)
+        self.assertEqual(frontier.pop(), NEW)
+        # Crash while NEW is being fetched: no close()
+
+        resumed = Frontier(self.path)
+        self.assertEqual(resumed.resumed, 2)
+        self.assertIn(CHANEL, resumed)  # done, not fetched again
+        self.assertEqual([resumed.pop(), resumed.pop(), resumed.pop()], [NEW, SAVED, None])
+        resumed.done(NEW)
+        resumed.done(SAVED)
+        resumed.close()
+
+        # Finished: the next run starts over from the seeds
+        again = Frontier(self.path)
+        self.assertEqual((again.resumed, len(again)), (0, 0))
+        self.assertTrue(again.add(CHANEL, PRIORITY_DESIGNER))
+        again.close()
+
+    def test_window_spills_to_disk_in_order(self) -> None:
+        frontier = Frontier(self.path, window=3)
+        urls = [f"https://www.fragrantica.com/designers/D{i}.html" for i in range(10)]
+        for url in urls[:5]:
+            frontier.add(url, PRIORITY_DESIGNER)
+        frontier.add(NEW, PRIORITY_PERFUME)
+        for url in urls[5:]:
+            frontier.add(url, PRIORITY_DESIGNER)
+        self.assertLessEqual(sum(len(w) for w in frontier._windows.values()), 4)
+        popped = [frontier.pop() for _ in range(12)]
+        self.assertEqual(popped, [NEW] + urls + [None])
+        frontier.close()
+
+
+class TestSeenSet(unittest.TestCase):
+    def test_perfumes_exact_others_probable(self) -> None:
+        seen = SeenSet(initial_capacity=1000, error_rate=0.01)
+        self.assertTrue(seen.add(NEW))
+        # Same perfume ID under another slug
+        self.assertFalse(seen.add("https://www.fragrantica.com/perfume/Chanel-Paris/No-5-40069.html"))
+        self.assertNotIn(SAVED, seen)
+        others = [f"https://www.fragrantica.com/designers/D{i}.html" for i in range(5000)]
+        for url in others[:2500]:
+            seen.add(url)
+        self.assertTrue(all(u in seen for u in others[:2500]))
+        false_positives = sum(u in seen for u in others[2500:])
+        self.assertLess(false_positives, 2500 * 0.01 * 2)
+        self.assertGreater(len(seen.others.filters), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
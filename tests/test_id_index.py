@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+# Ensure repository root is importable under pytest's import mode.
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fragrantica_scraper.id_index import PerfumeIdIndex, perfume_id
+from fragrantica_scraper.storage import SQLiteStore
+
+
+def _write_csv(path: str, urls: list) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("brand,name,rating,votes,url,last_crawled,sex,fragrance_category\n")
+        for url in urls:
+            f.write(f"B,N,4.0,10,{url},,,\n")
+
+
+class TestPerfumeIdIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.path = os.path.join(self.root, ".state", "perfume_ids.bin")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_perfume_id(self) -> None:
+        self.assertEqual(perfume_id("https://www.fragrantica.com/perfume/Chanel/Chance-610.html"), 610)
+        self.assertIsNone(perfume_id("https://www.fragrantica.com/designers/Chanel.html"))
+
+    def test_dedupes_across_brand_files(self) -> None:
+        chanel = os.path.join(self.root, "Chanel.csv")
+        dior = os.path.join(self.root, "Dior.csv")
+        _write_csv(chanel, ["https://www.fragrantica.com/perfume/Chanel/Chance-610.html"])
+        _write_csv(dior, ["https://www.fragrantica.com/perfume/Dior/Sauvage-31861.html"])
+        index = PerfumeIdIndex(self.path)
+        self.assertEqual(index.sync_sources([chanel, dior]), 2)
+        # Same perfume reached under another brand slug / URL spelling
+        self.assertIn("https://www.fragrantica.com/perfume/Christian-Dior/Sauvage-31861.html", index)
+        self.assertNotIn("https://www.fragrantica.com/perfume/Dior/Fahrenheit-228.html", index)
+        index.close()
+
+        # Unchanged files are not read again
+        index = PerfumeIdIndex(self.path)
+        self.assertEqual(index.sync_sources([chanel, dior]), 0)
+        self.assertEqual(len(index), 2)
+
+    def test_saves_survive_a_crash_through_the_log(self) -> None:
+        url = "https://www.fragrantica.com/perfume/Chanel/Chance-610.html"
+        index = PerfumeIdIndex(self.path)
+        self.assertTrue(index.add(url))
+        self.assertFalse(index.add(url))
+        # Crash before the store flushed the row: the ID is not kept
+        self.assertNotIn(url, PerfumeIdIndex(self.path))
+        self.assertEqual(index.log_saved([url]), 1)
+        # No close(): only the log has it
+        reopened = PerfumeIdIndex(self.path)
+        self.assertIn(url, reopened)
+        reopened.close()
+        self.assertEqual(os.path.getsize(self.path + ".log"), 0)
+        self.assertEqual(len(PerfumeIdIndex(self.path)), 1)
+
+    def test_ids_are_logged_when_the_store_commits(self) -> None:
+        urls = [f"https://www.fragrantica.com/perfume/Chanel/Perfume-{i}.html" for i in range(1, 4)]
+        store = SQLiteStore(os.path.join(self.root, "Chanel.sqlite3"), batch_size=2, flush_seconds=3600)
+        index = PerfumeIdIndex(self.path)
+        store.on_flush = index.log_saved
+        for url in urls:
+            index.add(url)
+            store.upsert({"brand": "Chanel", "name": "N", "rating": 4.0, "votes": 10, "url": url})
+        # Crash: the third row is still in the store's buffer, so its ID is not logged
+        self.assertEqual([u in PerfumeIdIndex(self.path) for u in urls], [True, True, False])
+        store.close()
+        self.assertIn(urls[2], PerfumeIdIndex(self.path))
+
+if __name__ == "__main__":
+    unittest.main()
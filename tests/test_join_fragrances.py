@@ -0,0 +1,105 @@
+import csv
+import importlib.util
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+_spec = importlib.util.spec_from_file_location("join_fragrances", ROOT / "support_scripts" / "join_fragrances.py")
+join = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(join)
+
+
+def _write(path: Path, rows: list) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(join.COLUMNS)
+        for brand, name, pid in rows:
+            writer.writerow([brand, name, "4.0", "10", f"https://www.fragrantica.com/perfume/{brand}/{name}-{pid}.html", "", "", ""])
+
+
+def _urls(path: Path) -> list:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [r["url"] for r in csv.DictReader(f)]
+
+
+class TestJoinFragrances(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self._patch = mock.patch.multiple(
+            join,
+            SAVED_DATA=self.root,
+            MASTER_CSV=self.root / "all_brands_clean.csv",
+            MANIFEST=self.root / ".state" / "join_manifest.json",
+            ALIASES=self.root / ".state" / "perfume_aliases.tsv",
+        )
+        self._patch.start()
+
+    def tearDown(self) -> None:
+        self._patch.stop()
+        self._tmp.cleanup()
+
+    def _run(self, *argv: str) -> None:
+        with mock.patch("sys.argv", ["join_fragrances.py", *argv]), mock.patch("builtins.print"):
+            join.main()
+
+    def test_incremental_merge_matches_a_full_join(self) -> None:
+        _write(self.root / "Chanel.csv", [("Chanel", "No-5", 40069), ("Chanel", "Chance", 610)])
+        _write(self.root / "Dior.csv", [("Dior", "Sauvage", 31861)])
+        self._run()
+        master = self.root / "all_brands_clean.csv"
+        first = master.stat().st_mtime_ns
+
+        # Nothing changed: the master is not rewritten
+        self._run()
+        self.assertEqual(master.stat().st_mtime_ns, first)
+
+        # One brand changes: a new perfume and one the master already has
+        _write(self.root / "Armani.csv", [("Armani", "Code", 411), ("Chanel", "Chance", 610)])
+        _write(self.root / "Dior.csv", [("Dior", "Sauvage", 31861), ("Dior", "Fahrenheit", 228)])
+        with mock.patch.object(join, "full_join", side_effect=AssertionError("should be incremental")):
+            self._run()
+        incremental = _urls(master)
+
+        self._run("--full")
+        self.assertEqual(_urls(master), incremental)
+        self.assertEqual([u.rsplit("/", 1)[1] for u in incremental], [
+            "Code-411.html", "Chance-610.html", "No-5-40069.html", "Fahrenheit-228.html", "Sauvage-31861.html",
+        ])
+
+    def test_hand_edited_master_triggers_a_full_join(self) -> None:
+        _write(self.root / "Dior.csv", [("Dior", "Sauvage", 31861)])
+        self._run()
+        master = self.root / "all_brands_clean.csv"
+        _write(master, [("Zara", "Red-Temptation", 1), ("Dior", "Sauvage", 31861)])  # out of order
+        os.utime(master, ns=(0, 0))
+        self._run()
+        self.assertEqual([u.rsplit("/", 1)[1] for u in _urls(master)], ["Sauvage-31861.html", "Red-Temptation-1.html"])
+
+    def test_aliases_collapse_to_the_canonical_row(self) -> None:
+        old = "https://www.fragrantica.com/perfume/Dior/Eau-Sauvage-100.html"
+        new = "https://www.fragrantica.com/perfume/Dior/Sauvage-31861.html"
+        _write(self.root / "Dior.csv", [("Dior", "Eau-Sauvage", 100)])
+        self._run()
+        master = self.root / "all_brands_clean.csv"
+
+        # The perfume moved: a later crawl saves it under the new URL
+        aliases = join.AliasMap(str(self.root / ".state" / "perfume_aliases.tsv"))
+        aliases.add(old, new)
+        aliases.close()
+        _write(self.root / "Dior.csv", [("Dior", "Eau-Sauvage", 100), ("Dior", "Sauvage", 31861)])
+        self._run()
+        self.assertEqual(_urls(master), [new])
+
+        # Already collapsed: a plain incremental run keeps it that way
+        _write(self.root / "Armani.csv", [("Armani", "Code", 411)])
+        with mock.patch.object(join, "full_join", side_effect=AssertionError("should be incremental")):
+            self._run()
+        self.assertEqual(_urls(master), ["https://www.fragrantica.com/perfume/Armani/Code-411.html", new])
+
+
+if __name__ == "__main__":
+    unittest.main()
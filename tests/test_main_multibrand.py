@@ -5,6 +5,7 @@ from unittest.mock import patch
 
 # Ensure repository root is importable under pytest's import mode.
 import sys
+import threading
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
@@ -141,15 +142,13 @@ class TestMainMultiBrand(unittest.TestCase):
         # Main should not sleep in multi-brand mode; crawler handles session breaks.
         sleep.assert_not_called()
 
-    def test_multi_brand_carries_saved_since_break_between_brands(self) -> None:
+    def test_multi_brand_shares_proxy_pool_between_brands(self) -> None:
         import main as main_mod
 
-        saved_since_break_seen = []
+        pools = []
 
         def fake_crawl(ns):
-            saved_since_break_seen.append(getattr(ns, "saved_since_break", None))
-            # Simulate saving 3 new fragrances for each brand.
-            ns.saved_since_break_end = int(getattr(ns, "saved_since_break", 0) or 0) + 3
+            pools.append(ns.shared_proxy_pool)
             return 3
 
         argv = [
@@ -172,8 +171,49 @@ class TestMainMultiBrand(unittest.TestCase):
         ):
             main_mod.main()
 
-        # First brand starts with 0; second brand should receive the carried counter.
-        self.assertEqual(saved_since_break_seen, [0, 3])
+        # Both brands save through one pool, so a proxy's session carries over
+        self.assertEqual(len(pools), 2)
+        self.assertIs(pools[0], pools[1])
+        self.assertEqual((pools[0].session_size, pools[0].session_break), (35, 900))
+
+    def test_parallel_brands_share_limiter_and_split_proxies(self) -> None:
+        import main as main_mod
+
+        calls = []
+        lock = threading.Lock()
+
+        def fake_crawl(ns):
+            with lock:
+                calls.append(ns)
+            return 1
+
+        with tempfile.TemporaryDirectory() as td:
+            proxies_file = Path(td) / "proxies.txt"
+            proxies_file.write_text("http://p1\nhttp://p2\nhttp://p3\nhttp://p4\n", encoding="utf-8")
+            argv = [
+                "main.py",
+                "--brands", "Chanel", "--brands", "Dior", "--brands", "Guerlain",
+                "--parallel-brands", "2",
+                "--proxies-file", str(proxies_file),
+                "--no-id-index",
+            ]
+            with (
+                patch.object(main_mod, "crawl", side_effect=fake_crawl),
+                patch("sys.argv", argv),
+            ):
+                main_mod.main()
+
+        self.assertEqual(sorted(c.brand for c in calls), ["Chanel", "Dior", "Guerlain"])
+        # One limiter for the whole run
+        self.assertEqual(len({id(c.shared_limiter) for c in calls}), 1)
+        # Each brand gets one of two disjoint halves of the proxies, with that half's pool
+        subsets = {tuple(c.proxy_list) for c in calls}
+        self.assertTrue(subsets <= {("http://p1", "http://p3"), ("http://p2", "http://p4")})
+        for c in calls:
+            self.assertEqual(c.shared_proxy_pool.proxies, c.proxy_list)
+        for c in calls:
+            self.assertIsNone(c.start_url)
+            self.assertEqual(c.out_csv, "perfumes.csv")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from argparse import Namespace
+from pathlib import Path
+
+# Ensure repository root is importable under pytest's import mode.
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fragrantica_scraper.negative_cache import (
+    CRAWL_REASONS,
+    DEFAULT_TTLS,
+    ENRICH_REASONS,
+    MAX_BACKOFF,
+    NO_CATEGORY,
+    NO_RATINGS,
+    NOT_FOUND,
+    NegativeCache,
+    build_negative_cache,
+)
+
+URL = "https://www.fragrantica.com/perfume/Chanel/Chance-21.html"
+DAY = 86400.0
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestNegativeCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "negative.sqlite3")
+        self.clock = FakeClock()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_entry_expires_after_its_ttl(self) -> None:
+        cache = NegativeCache(self.path, clock=self.clock)
+        self.assertEqual(cache.add(URL, NO_RATINGS), DEFAULT_TTLS[NO_RATINGS])
+        # Keyed by perfume ID, so another URL form of the same perfume matches
+        self.assertTrue(cache.skip("https://www.fragrantica.com/perfume/Chanel/Chance-Eau-Tendre-21.html"))
+        self.clock.now += DEFAULT_TTLS[NO_RATINGS]
+        self.assertFalse(cache.skip(URL))
+        self.assertEqual(cache.skipped, 1)
+        cache.close()
+
+    def test_reasons_limit_what_is_skipped(self) -> None:
+        cache = NegativeCache(self.path, clock=self.clock)
+        cache.add(URL, NO_CATEGORY)
+        # A page without a category may still have ratings, and vice versa
+        self.assertFalse(cache.skip(URL, CRAWL_REASONS))
+        self.assertTrue(cache.skip(URL, ENRICH_REASONS))
+        cache.add(URL, NOT_FOUND)
+        self.assertTrue(cache.skip(URL, CRAWL_REASONS))
+        self.assertEqual(cache.add("https://www.fragrantica.com/designers/Chanel.html", NOT_FOUND), 0.0)
+        cache.close()
+
+    def test_persists_backs_off_and_forgets_saved_pages(self) -> None:
+        cache = NegativeCache(self.path, clock=self.clock)
+        ttls = [cache.add(URL, NO_RATINGS) for _ in range(6)]
+        base = DEFAULT_TTLS[NO_RATINGS]
+        self.assertEqual(ttls, [base, 2 * base, 4 * base, MAX_BACKOFF * base, MAX_BACKOFF * base, MAX_BACKOFF * base])
+        cache.close()
+
+        cache = NegativeCache(self.path, clock=self.clock)
+        self.assertEqual(cache.reason(URL), NO_RATINGS)
+        cache.discard(URL)
+        cache.close()
+        cache = NegativeCache(self.path, clock=self.clock)
+        self.assertIsNone(cache.reason(URL))
+        self.assertEqual(cache.add(URL, NO_RATINGS), base)
+        cache.close()
+
+    def test_replay_and_opt_out_build_nothing(self) -> None:
+        self.assertIsNone(build_negative_cache(Namespace(replay=True, negative_cache=self.path)))
+        self.assertIsNone(build_negative_cache(Namespace(no_negative_cache=True, negative_cache=self.path)))
+        cache = build_negative_cache(Namespace(negative_cache=self.path))
+        self.assertEqual(cache.path, self.path)
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
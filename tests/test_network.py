@@ -0,0 +1,125 @@
+import unittest
+from pathlib import Path
+
+# Ensure repository root is importable under pytest's import mode.
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fragrantica_scraper.network import RateLimiter, SessionPool, TokenBucket
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_first_request_is_free_then_paced(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(rate=0.2, capacity=1.0, clock=clock)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 5.0)
+        # A third caller queues behind the second one
+        self.assertAlmostEqual(bucket.reserve(), 10.0)
+
+    def test_refills_while_idle(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(rate=0.2, capacity=1.0, clock=clock)
+        bucket.reserve()
+        clock.now += 60
+        self.assertEqual(bucket.reserve(), 0.0)
+
+    def test_zero_rate_is_unlimited(self) -> None:
+        bucket = TokenBucket(rate=0.0)
+        for _ in range(10):
+            self.assertEqual(bucket.reserve(), 0.0)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_identities_are_independent(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(per_identity_rate=0.2, clock=clock, sleep=clock.sleep)
+        self.assertEqual(limiter.acquire("p1"), 0.0)
+        # A fresh proxy can be used immediately
+        self.assertEqual(limiter.acquire("p2"), 0.0)
+        self.assertAlmostEqual(limiter.acquire("p1"), 5.0)
+
+    def test_global_bucket_caps_combined_rate(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(per_identity_rate=10.0, global_rate=1.0, clock=clock, sleep=clock.sleep)
+        self.assertEqual(limiter.acquire("p1"), 0.0)
+        self.assertAlmostEqual(limiter.acquire("p2"), 1.0)
+
+    def test_penalize_only_affects_one_identity(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(per_identity_rate=1.0, clock=clock, sleep=clock.sleep)
+        limiter.penalize("p1", 30.0)
+        self.assertEqual(limiter.acquire("p2"), 0.0)
+        self.assertAlmostEqual(limiter.acquire("p1"), 31.0)
+
+    def test_jitter_is_charged_to_the_bucket(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(per_identity_rate=0.2, jitter=2.0, clock=clock, sleep=clock.sleep)
+        limiter.acquire("p1")
+        for _ in range(20):
+            # Back-to-back requests never come closer than the base delay
+            self.assertGreaterEqual(limiter.acquire("p1"), 5.0)
+
+
+class FakeSession:
+    def __init__(self, ua, timeout, proxy=None, accept_language=None):
+        self.key = (proxy, ua, accept_language)
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestSessionPool(unittest.TestCase):
+    def test_reuses_session_when_rotation_comes_back(self) -> None:
+        clock = FakeClock()
+        pool = SessionPool(10.0, factory=FakeSession, clock=clock)
+        s1, ua1, lang1 = pool.session_for("p1", lambda: "UA-1")
+        s2, _, _ = pool.session_for("p2", lambda: "UA-2")
+        again, ua, lang = pool.session_for("p1", lambda: "UA-other")
+        self.assertIs(again, s1)
+        self.assertEqual((ua, lang), (ua1, lang1))
+        self.assertIsNot(s1, s2)
+        self.assertEqual((pool.created, pool.reused), (2, 1))
+
+    def test_idle_sessions_are_closed(self) -> None:
+        clock = FakeClock()
+        pool = SessionPool(10.0, max_idle_seconds=60.0, factory=FakeSession, clock=clock)
+        s1 = pool.get("UA", "p1", "en-US")
+        clock.now += 61
+        s2 = pool.get("UA", "p1", "en-US")
+        self.assertTrue(s1.closed)
+        self.assertIsNot(s1, s2)
+        self.assertEqual(pool.evicted, 1)
+
+    def test_lru_cap(self) -> None:
+        pool = SessionPool(10.0, max_size=2, factory=FakeSession, clock=FakeClock())
+        first = pool.get("UA", "p1", "en-US")
+        pool.get("UA", "p2", "en-US")
+        pool.get("UA", "p3", "en-US")
+        self.assertTrue(first.closed)
+
+    def test_discard_forgets_identity(self) -> None:
+        pool = SessionPool(10.0, factory=FakeSession, clock=FakeClock())
+        s1, _, _ = pool.session_for("p1", lambda: "UA-1")
+        pool.discard("p1")
+        s2, ua, _ = pool.session_for("p1", lambda: "UA-2")
+        self.assertTrue(s1.closed)
+        self.assertEqual(ua, "UA-2")
+        self.assertIsNot(s1, s2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+from pathlib import Path
+
+# Ensure repository root is importable under pytest's import mode.
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bs4 import BeautifulSoup
+
+from fragrantica_scraper.html_backend import HAS_SELECTOLAX, parse_html
+from fragrantica_scraper.network import extract_links
+from fragrantica_scraper.parsing import (
+    extract_page,
+    parse_brand_from_page,
+    parse_category_and_sex,
+    parse_name_from_page,
+    parse_rating_votes_from_text,
+    scrape_perfume_bytes,
+    scrape_perfume_page,
+)
+
+FIXTURES = sorted((Path(__file__).parent / "fixtures" / "perfume_pages").glob("*.html"))
+
+
+class TestSinglePassExtractor(unittest.TestCase):
+    def test_matches_tree_search_on_fixtures(self) -> None:
+        self.assertTrue(FIXTURES)
+        for path in FIXTURES:
+            for parser in ("lxml", "html.parser"):
+                with self.subTest(page=path.name, parser=parser):
+                    soup = BeautifulSoup(path.read_text(encoding="utf-8"), parser)
+                    page = extract_page(soup)
+                    self.assertEqual(page.text, soup.get_text(" ", strip=True))
+                    self.assertEqual(
+                        page.rating_votes(), parse_rating_votes_from_text(soup.get_text(" ", strip=True))
+                    )
+                    self.assertEqual(page.brand(), parse_brand_from_page(soup))
+                    self.assertEqual(page.name(), parse_name_from_page(soup))
+                    self.assertEqual(page.category_and_sex(), parse_category_and_sex(soup))
+
+    def test_backends_agree_with_bs4(self) -> None:
+        backends = ["lxml"] + (["selectolax"] if HAS_SELECTOLAX else [])
+        url = "https://www.fragrantica.com/perfume/Chanel/Chance-Eau-de-Parfum-610.html"
+        for path in FIXTURES:
+            html = path.read_text(encoding="utf-8")
+            reference = parse_html(html, "bs4")
+            expected = extract_page(reference)
+            for backend in backends:
+                with self.subTest(page=path.name, backend=backend):
+                    doc = parse_html(html, backend)
+                    self.assertEqual(doc.backend, backend)
+                    page = extract_page(doc)
+                    self.assertEqual(page.text, expected.text)
+                    self.assertEqual(page.brand(), expected.brand())
+                    self.assertEqual(page.name(), expected.name())
+                    self.assertEqual(page.category_and_sex(), expected.category_and_sex())
+                    self.assertEqual(doc.links(), reference.links())
+                    self.assertEqual(extract_links(url, doc), extract_links(url, reference))
+
+    def test_scrape_perfume_page(self) -> None:
+        html = (Path(__file__).parent / "fixtures" / "perfume_pages" / "chanel_chance.html").read_text(encoding="utf-8")
+        data = scrape_perfume_page(
+            "https://www.fragrantica.com/perfume/Chanel/Chance-Eau-de-Parfum-610.html",
+            BeautifulSoup(html, "lxml"),
+        )
+        self.assertEqual(data, {
+            "brand": "Chanel",
+            "name": "Chance Eau de Parfum",
+            "rating": 4.21,
+            "votes": 12345,
+            "sex": "women",
+            "fragrance_category": "Chypre Floral",
+        })
+
+    def test_bytes_fast_path_matches_dom(self) -> None:
+        url = "https://www.fragrantica.com/perfume/Chanel/Chance-Eau-de-Parfum-610.html"
+        for path in FIXTURES:
+            with self.subTest(page=path.name):
+                content = path.read_bytes()
+                expected = scrape_perfume_page(url, parse_html(content.decode("utf-8"), "bs4"))
+                self.assertEqual(scrape_perfume_bytes(url, content, "utf-8", "bs4"), expected)
+
+    def test_bytes_fast_path_reads_json_ld_rating(self) -> None:
+        content = (
+            b'<html><head><script type="application/ld+json">'
+            b'{"@type": "Product", "aggregateRating": {"ratingValue": "4.12", "ratingCount": "1,024"}}'
+            b"</script></head><body><h1>Chance Chanel for women</h1></body></html>"
+        )
+        data = scrape_perfume_bytes("https://www.fragrantica.com/perfume/Chanel/Chance-610.html", content)
+        self.assertEqual((data["rating"], data["votes"]), (4.12, 1024))
+        self.assertEqual(data["name"], "Chance")
+
+
+if __name__ == "__main__":
+    unittest.main()
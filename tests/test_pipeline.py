@@ -0,0 +1,69 @@
+import threading
+import unittest
+from pathlib import Path
+
+# Ensure repository root is importable under pytest's import mode.
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fragrantica_scraper.parsing import scrape_perfume_bytes
+from fragrantica_scraper.pipeline import ParsePipeline
+
+FIXTURE = Path(__file__).parent / "fixtures" / "perfume_pages" / "chanel_chance.html"
+
+
+def _double(x):
+    if x < 0:
+        raise ValueError("negative")
+    return 2 * x
+
+
+class TestParsePipeline(unittest.TestCase):
+    def test_single_writer_gets_every_result_and_error(self) -> None:
+        stored = []
+        writer_threads = set()
+
+        def store(job, data, error):
+            writer_threads.add(threading.current_thread().name)
+            stored.append((job, data, type(error).__name__ if error else None))
+
+        with ParsePipeline(_double, store, workers=0) as pipeline:
+            for i in (1, 2, -1, 3):
+                pipeline.submit(f"job{i}", i)
+            # Already parsed: goes to the same writer, in turn
+            pipeline.submit_parsed("ready", "as is")
+        self.assertEqual(sorted(stored, key=str), sorted([
+            ("job1", 2, None), ("job2", 4, None), ("job-1", None, "ValueError"), ("job3", 6, None),
+            ("ready", "as is", None),
+        ], key=str))
+        self.assertEqual(stored[-1][0], "ready")
+        self.assertEqual(writer_threads, {"pipeline-writer"})
+        self.assertEqual((pipeline.stored, pipeline.errors), (5, 1))
+
+    def test_submit_blocks_when_writer_falls_behind(self) -> None:
+        release = threading.Event()
+        pipeline = ParsePipeline(_double, lambda job, data, error: release.wait(5), workers=0, max_pending=2)
+        pipeline.submit(1, 1)
+        pipeline.submit(2, 2)
+        third = threading.Thread(target=pipeline.submit, args=(3, 3))
+        third.start()
+        third.join(0.2)
+        self.assertTrue(third.is_alive(), "third submit should wait for a free slot")
+        release.set()
+        third.join(5)
+        pipeline.close()
+        self.assertEqual(pipeline.stored, 3)
+        self.assertGreater(pipeline.blocked_seconds, 0.0)
+
+    def test_process_pool_parses_raw_bytes(self) -> None:
+        url = "https://www.fragrantica.com/perfume/Chanel/Chance-Eau-de-Parfum-610.html"
+        content = FIXTURE.read_bytes()
+        results = []
+        with ParsePipeline(scrape_perfume_bytes, lambda job, data, error: results.append((data, error)), workers=1) as pipeline:
+            pipeline.submit(url, url, content, "utf-8", "bs4")
+        self.assertEqual(results, [(scrape_perfume_bytes(url, content, "utf-8", "bs4"), None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
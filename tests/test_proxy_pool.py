@@ -0,0 +1,101 @@
+import unittest
+from pathlib import Path
+
+# Ensure repository root is importable under pytest's import mode.
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fragrantica_scraper.proxies import ProxyPool
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestProxyPool(unittest.TestCase):
+    def test_no_proxies_means_direct(self) -> None:
+        pool = ProxyPool([])
+        self.assertFalse(pool)
+        self.assertIsNone(pool.next_proxy())
+        # Recording against a direct connection is a no-op
+        pool.record_block(None, 429)
+        pool.record_success(None, 0.1)
+
+    def test_blocked_proxy_is_benched_until_cooldown_ends(self) -> None:
+        clock = FakeClock()
+        pool = ProxyPool(["a", "b"], block_cooldown=60.0, clock=clock)
+        pool.record_block("a", 403)
+        for _ in range(5):
+            self.assertEqual(pool.next_proxy(), "b")
+        clock.now += 61
+        self.assertIn("a", {pool.next_proxy(exclude="b") for _ in range(2)})
+
+    def test_block_cooldown_grows_exponentially(self) -> None:
+        clock = FakeClock()
+        pool = ProxyPool(["a"], block_cooldown=10.0, max_cooldown=35.0, clock=clock)
+        self.assertEqual(pool.record_block("a", 429), 10.0)
+        self.assertEqual(pool.record_block("a", 429), 20.0)
+        self.assertEqual(pool.record_block("a", 429), 35.0)
+        pool.record_success("a", 0.5)
+        self.assertEqual(pool.record_block("a", 429), 10.0)
+
+    def test_prefers_fast_reliable_proxy(self) -> None:
+        clock = FakeClock()
+        pool = ProxyPool(["slow", "fast"], clock=clock)
+        for _ in range(5):
+            pool.record_success("slow", 4.0)
+            pool.record_success("fast", 0.3)
+        self.assertEqual(pool.next_proxy(), "fast")
+        # Rotation moves away from the current proxy when there is a choice
+        self.assertEqual(pool.next_proxy(exclude="fast"), "slow")
+
+    def test_connection_errors_bench_after_threshold(self) -> None:
+        clock = FakeClock()
+        pool = ProxyPool(["a", "b"], max_consecutive_failures=3, clock=clock)
+        self.assertEqual(pool.record_failure("a"), 0.0)
+        self.assertEqual(pool.record_failure("a"), 0.0)
+        self.assertGreater(pool.record_failure("a"), 0.0)
+        self.assertGreater(pool.cooldown_remaining("a"), 0.0)
+
+    def test_all_cooling_down_returns_first_to_recover(self) -> None:
+        clock = FakeClock()
+        pool = ProxyPool(["a", "b"], block_cooldown=60.0, clock=clock)
+        pool.record_block("a", 403)
+        clock.now += 30
+        pool.record_block("b", 403)
+        self.assertEqual(pool.next_proxy(), "a")
+
+    def test_session_rest_benches_only_that_proxy(self) -> None:
+        clock = FakeClock()
+        pool = ProxyPool(["a", "b"], session_size=2, session_break=600.0, clock=clock)
+        self.assertEqual(pool.record_save("a"), 0.0)
+        self.assertEqual(pool.record_save("a"), 600.0)
+        self.assertEqual(pool.rest_remaining("b"), 0.0)
+        # The others keep going while "a" rests
+        self.assertEqual(pool.ready("a"), ("b", 0.0))
+        self.assertEqual(pool.next_proxy(), "b")
+        clock.now += 600
+        self.assertEqual(pool.ready("a"), ("a", 0.0))
+
+    def test_wait_only_when_every_identity_rests(self) -> None:
+        clock = FakeClock()
+        pool = ProxyPool(["a", "b"], session_size=1, session_break=600.0, clock=clock)
+        pool.record_save("a")
+        clock.now += 100
+        pool.record_save("b")
+        self.assertEqual(pool.ready("b"), ("a", 500.0))
+        self.assertEqual(pool.rests, 2)
+
+        # Without proxies the direct connection rests the same way
+        direct = ProxyPool([], session_size=1, session_break=600.0, clock=clock)
+        direct.record_save(None)
+        self.assertEqual(direct.ready(None), (None, 600.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,240 @@
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from argparse import Namespace
+from pathlib import Path
+
+# Ensure repository root is importable under pytest's import mode.
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fragrantica_scraper.config import CSV_FIELDS
+from fragrantica_scraper.normalize import NORMALIZE_VERSION
+from fragrantica_scraper.id_index import PerfumeIdIndex
+from fragrantica_scraper.storage import AliasMap, CsvWriter, PatchLog, SQLiteStore, apply_patches, open_aliases
+
+
+def _row(url: str, rating: float = 4.0, votes: int = 10) -> dict:
+    return {
+        "brand": "Chanel",
+        "name": "Chance",
+        "rating": rating,
+        "votes": votes,
+        "url": url,
+        "last_crawled": "2024-01-01T00:00:00",
+        "sex": "women",
+        "fragrance_category": "Chypre Floral",
+    }
+
+
+class TestSQLiteStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self._tmp.name, "perfumes.sqlite3")
+        self.csv = os.path.join(self._tmp.name, "perfumes.csv")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_batches_upserts_and_keeps_one_row_per_url(self) -> None:
+        store = SQLiteStore(self.db, exports=[self.csv], batch_size=2, flush_seconds=3600)
+        store.upsert(_row("https://www.fragrantica.com/perfume/Chanel/Chance-1.html"))
+        self.assertEqual(store.commits, 0)
+        store.upsert(_row("https://www.fragrantica.com/perfume/Chanel/Chance-1.html", rating=4.5, votes=11))
+        self.assertEqual(store.commits, 1)
+        store.upsert(_row("https://www.fragrantica.com/perfume/Chanel/Chance-2.html"))
+        store.close()
+
+        conn = sqlite3.connect(self.db)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(
+            conn.execute("SELECT rating, votes FROM perfumes WHERE url LIKE '%Chance-1.html'").fetchall(), [(4.5, 11)]
+        )
+        indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertTrue({"perfumes_brand", "perfumes_last_crawled"} <= indexes)
+        conn.close()
+
+        with open(self.csv, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(list(rows[0].keys()), CSV_FIELDS)
+        self.assertEqual([r["votes"] for r in rows], ["11", "10"])
+
+    def test_merges_csv_edited_after_the_last_export(self) -> None:
+        store = SQLiteStore(self.db, exports=[self.csv])
+        store.upsert(_row("https://www.fragrantica.com/perfume/Chanel/Chance-1.html"))
+        store.close()
+
+        # Untouched export: nothing to merge
+        store = SQLiteStore(self.db, exports=[self.csv])
+        self.assertEqual(store.imported, 0)
+        store.close()
+
+        # An outside edit (e.g. enrich.py filling a column) is picked up
+        with open(self.csv, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        rows[0]["fragrance_category"] = "Floral"
+        time.sleep(0.01)
+        with open(self.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        os.utime(self.csv, (time.time() + 5, time.time() + 5))
+        store = SQLiteStore(self.db, exports=[self.csv])
+        self.assertEqual(store.imported, 1)
+        self.assertEqual(store.urls(), {"https://www.fragrantica.com/perfume/Chanel/Chance-1.html"})
+        category = store.conn.execute("SELECT fragrance_category FROM perfumes").fetchone()[0]
+        self.assertEqual(category, "Floral")
+        store.close()
+
+    def test_rows_from_before_normalization_are_upgraded_on_open(self) -> None:
+        conn = sqlite3.connect(self.db)
+        conn.execute(
+            "CREATE TABLE perfumes (url TEXT PRIMARY KEY, brand TEXT, name TEXT, rating REAL, votes INTEGER, "
+            "last_crawled TEXT, sex TEXT, fragrance_category TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO perfumes VALUES ('u1', 'Nishane', 'Istanbul Nishane', 4.1, 9, '', 'women and men', '')"
+        )
+        conn.commit()
+        conn.close()
+
+        store = SQLiteStore(self.db)
+        self.assertEqual(store.renormalized, 1)
+        row = store.conn.execute("SELECT name, sex, norm_version FROM perfumes").fetchone()
+        self.assertEqual(row, ("Istanbul", "unisex", NORMALIZE_VERSION))
+        store.close()
+        store = SQLiteStore(self.db)
+        self.assertEqual(store.renormalized, 0)
+        store.close()
+
+
+class TestCsvWriter(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.csv = os.path.join(self._tmp.name, "perfumes.csv")
+        self.mirror = os.path.join(self._tmp.name, "mirror", "perfumes.csv")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _lines(self, path: str) -> list:
+        with open(path, encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_buffers_rows_until_a_batch_is_full(self) -> None:
+        writer = CsvWriter([self.csv, self.mirror], flush_rows=2, flush_seconds=3600)
+        writer.write(_row("https://www.fragrantica.com/perfume/Chanel/Chance-1.html"))
+        self.assertEqual(len(self._lines(self.csv)), 1)  # header only
+        writer.write(_row("https://www.fragrantica.com/perfume/Chanel/Chance-2.html"))
+        self.assertEqual(len(self._lines(self.csv)), 3)
+        writer.write(_row("https://www.fragrantica.com/perfume/Chanel/Chance-3.html"))
+        writer.close()
+        self.assertEqual(self._lines(self.csv), self._lines(self.mirror))
+        self.assertEqual(len(self._lines(self.csv)), 4)
+        with open(self.csv + ".progress", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["rows_flushed"], 3)
+
+    def test_reopening_cuts_off_a_half_written_row(self) -> None:
+        writer = CsvWriter([self.csv], flush_rows=1)
+        writer.write(_row("https://www.fragrantica.com/perfume/Chanel/Chance-1.html"))
+        writer.close()
+        with open(self.csv, "a", encoding="utf-8") as f:
+            f.write("Chanel,Chance,4.")
+        writer = CsvWriter([self.csv], flush_rows=1)
+        self.assertEqual(writer.previous[self.csv], 1)
+        writer.write(_row("https://www.fragrantica.com/perfume/Chanel/Chance-2.html"))
+        writer.close()
+        with open(self.csv, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([r["url"][-13:] for r in rows], ["Chance-1.html", "Chance-2.html"])
+
+
+class TestPatchLog(unittest.TestCase):
+    def test_replays_edits_and_keeps_processed_markers(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            log = PatchLog(os.path.join(root, "all.csv"))
+            log.append("u1", {"sex": "women"})
+            log.append("u2", {})
+            log.append("u1", {"fragrance_category": "Floral"})
+            log.close()
+            with open(log.path, "a", encoding="utf-8") as f:
+                f.write('{"url": "u3", "fie')  # torn by a crash
+
+            patches = PatchLog(os.path.join(root, "all.csv")).load()
+            self.assertEqual(patches, {"u1": {"sex": "women", "fragrance_category": "Floral"}, "u2": {}})
+            rows = [{"url": "u1", "sex": "", "fragrance_category": ""}, {"url": "u2", "sex": "men"}]
+            self.assertEqual(apply_patches(rows, patches), 1)
+            self.assertEqual(rows[0], {"url": "u1", "sex": "women", "fragrance_category": "Floral"})
+
+            log.reset(patches)
+            self.assertEqual(log.load(), {"u1": {}, "u2": {}})
+            log.discard()
+            self.assertFalse(os.path.exists(log.path))
+
+
+class TestAliasMap(unittest.TestCase):
+    OLD = "https://www.fragrantica.com/perfume/Chanel/Chance-1.html"
+    MID = "https://www.fragrantica.com/perfume/Chanel/Chance-Eau-Vive-2.html"
+    NEW = "https://www.fragrantica.com/perfume/Chanel/Chance-Eau-Vive-3.html"
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, ".state", "aliases.tsv")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_redirects_persist_and_follow_chains(self) -> None:
+        aliases = AliasMap(self.path)
+        self.assertTrue(aliases.add(self.OLD, self.MID))
+        self.assertFalse(aliases.add(self.OLD, self.MID))
+        self.assertTrue(aliases.add(self.MID, self.NEW))
+        aliases.close()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("4\t5\thttps://www.fragrantica")  # torn by a crash
+
+        aliases = AliasMap(self.path)
+        self.assertEqual(len(aliases), 2)
+        self.assertEqual(aliases.canonical_url(self.OLD), self.NEW)
+        self.assertEqual(aliases.expand({self.NEW}), {self.OLD, self.MID, self.NEW})
+        # The perfume moved back: the old URL is canonical again
+        aliases.add(self.NEW, self.OLD)
+        self.assertEqual(aliases.canonical_url(self.MID), self.OLD)
+        self.assertEqual(aliases.canonical_url(self.OLD), self.OLD)
+        aliases.close()
+
+    def test_store_and_index_treat_the_old_url_as_saved(self) -> None:
+        db = os.path.join(self._tmp.name, "perfumes.sqlite3")
+        store = SQLiteStore(db, aliases=AliasMap(self.path))
+        store.upsert(_row(self.NEW))
+        self.assertTrue(store.record_redirect(self.OLD, self.NEW))
+        self.assertEqual(store.urls(), {self.OLD, self.NEW})
+        store.close()
+
+        index = PerfumeIdIndex(os.path.join(self._tmp.name, "ids.bin"))
+        index.add(self.NEW)
+        self.assertNotIn(self.OLD, index)
+        index.aliases = AliasMap(self.path)
+        self.assertIn(self.OLD, index)
+
+    def test_shared_map_is_used_by_every_store(self) -> None:
+        shared = AliasMap(self.path)
+        args = Namespace(aliases=self.path, shared_aliases=shared)
+        stores = [SQLiteStore(os.path.join(self._tmp.name, f"{i}.sqlite3"), aliases=open_aliases(args)) for i in range(2)]
+        stores[0].record_redirect(self.OLD, self.NEW)
+        stores[0].close()
+        # Closing one store leaves the map usable for the others
+        self.assertTrue(stores[1].record_redirect(self.MID, self.NEW))
+        stores[1].upsert(_row(self.NEW))
+        self.assertEqual(stores[1].urls(), {self.OLD, self.MID, self.NEW})
+        stores[1].close()
+        self.assertEqual(len(AliasMap(self.path)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
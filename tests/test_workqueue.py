@@ -0,0 +1,207 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+# Ensure repository root is importable under pytest's import mode.
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fragrantica_scraper.frontier import PRIORITY_DESIGNER, PRIORITY_PERFUME
+from fragrantica_scraper.workqueue import RedisWorkQueue, SQLiteWorkQueue
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "perfume_pages"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class LocalRedis:
+    """In-process stand-in for the redis-py commands RedisWorkQueue uses."""
+
+    def __init__(self) -> None:
+        self.data: dict = {}
+
+    def sadd(self, key, member):
+        s = self.data.setdefault(key, set())
+        new = member not in s
+        s.add(member)
+        return int(new)
+
+    def scard(self, key):
+        return len(self.data.get(key, ()))
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field] = value
+
+    def hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    def zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    def zrem(self, key, member):
+        return int(self.data.get(key, {}).pop(member, None) is not None)
+
+    def zscore(self, key, member):
+        return self.data.get(key, {}).get(member)
+
+    def zcard(self, key):
+        return len(self.data.get(key, {}))
+
+    def zrangebyscore(self, key, low, high):
+        return [m for m, s in sorted(self.data.get(key, {}).items(), key=lambda kv: kv[1]) if s <= high]
+
+    def zpopmin(self, key, count):
+        z = self.data.get(key, {})
+        out = sorted(z.items(), key=lambda kv: kv[1])[:count]
+        for m, _ in out:
+            del z[m]
+        return out
+
+
+def _lease_until_empty(path: str, owner: str, out) -> None:
+    queue = SQLiteWorkQueue(path)
+    while True:
+        leases = queue.lease(owner, 3)
+        if not leases:
+            break
+        for lease in leases:
+            out.put(lease.url)
+            queue.ack(lease, owner)
+    queue.close()
+
+
+class QueueContract:
+    """The same behaviour from every backend."""
+
+    def make_queue(self, clock):
+        raise NotImplementedError
+
+    def test_priority_order_and_no_duplicates(self) -> None:
+        q = self.make_queue(FakeClock())
+        self.assertEqual(q.put(["d1", "d2"], PRIORITY_DESIGNER, "Chanel"), 2)
+        self.assertEqual(q.put(["p1", "d1", "p1"], PRIORITY_PERFUME), 1)
+        leases = q.lease("a", 10)
+        self.assertEqual([l.url for l in leases], ["p1", "d1", "d2"])
+        self.assertEqual(leases[1].brand, "Chanel")
+        self.assertEqual(q.lease("b", 10), [])
+        for lease in leases:
+            self.assertTrue(q.ack(lease, "a"))
+        # Done URLs are never queued again
+        self.assertEqual(q.put(["p1"], PRIORITY_PERFUME), 0)
+        self.assertEqual(q.counts(), {"queued": 0, "leased": 0, "done": 3, "failed": 0})
+
+    def test_expired_lease_goes_to_another_worker(self) -> None:
+        clock = FakeClock()
+        q = self.make_queue(clock)
+        q.put(["p1"], PRIORITY_PERFUME)
+        (first,) = q.lease("a", 1, visibility=60)
+        clock.now += 30
+        self.assertTrue(q.extend(first, "a", 60))
+        clock.now += 59  # still held thanks to the extension
+        self.assertEqual(q.lease("b", 1, visibility=60), [])
+        clock.now += 2
+        (second,) = q.lease("b", 1, visibility=60)
+        self.assertEqual((second.url, second.attempts), ("p1", 2))
+        # The first worker's late ack does not count; the new holder's does
+        self.assertFalse(q.ack(first, "a"))
+        self.assertTrue(q.ack(second, "b"))
+
+    def test_failed_urls_are_retried_then_given_up(self) -> None:
+        q = self.make_queue(FakeClock())
+        q.put(["p1"], PRIORITY_PERFUME)
+        for attempt in (1, 2):
+            (lease,) = q.lease("a", 1)
+            self.assertEqual(lease.attempts, attempt)
+            self.assertTrue(q.fail(lease, "a", max_attempts=2))
+        self.assertEqual(q.lease("a", 1), [])
+        self.assertEqual(q.counts()["failed"], 1)
+
+
+class TestSQLiteWorkQueue(QueueContract, unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "queue.sqlite3")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def make_queue(self, clock):
+        return SQLiteWorkQueue(self.path, clock=clock)
+
+    def test_concurrent_processes_never_lease_the_same_url(self) -> None:
+        urls = [f"https://www.fragrantica.com/perfume/B/P-{i}.html" for i in range(300)]
+        q = SQLiteWorkQueue(self.path)
+        q.put(urls, PRIORITY_PERFUME)
+        q.close()
+        ctx = multiprocessing.get_context("spawn")
+        out = ctx.Queue()
+        procs = [ctx.Process(target=_lease_until_empty, args=(self.path, f"w{i}", out)) for i in range(4)]
+        for p in procs:
+            p.start()
+        leased = [out.get(timeout=30) for _ in urls]
+        for p in procs:
+            p.join(timeout=30)
+        self.assertEqual(sorted(leased), sorted(urls))
+
+
+class TestRedisWorkQueue(QueueContract, unittest.TestCase):
+    def make_queue(self, clock):
+        return RedisWorkQueue(LocalRedis(), "test", clock=clock)
+
+
+class TestCrawlWorker(unittest.TestCase):
+    def test_worker_expands_designer_page_and_stores_perfumes(self) -> None:
+        from fragrantica_scraper.cache import ResponseCache
+        from fragrantica_scraper.storage import SQLiteStore
+        from fragrantica_scraper.worker import CrawlWorker, build_parser, designer_url, enqueue
+
+        page = (FIXTURES / "chanel_chance.html").read_bytes()
+        perfumes = [f"https://www.fragrantica.com/perfume/Chanel/Perfume-{i}-{100 + i}.html" for i in range(3)]
+        listing = "<html><body>" + "x" * 6000 + "".join(
+            f'<a href="{u[len("https://www.fragrantica.com"):]}">p</a>' for u in perfumes
+        ) + '<a href="/perfume/Dior/Other-1.html">x</a>' * 3 + "</body></html>"
+
+        with tempfile.TemporaryDirectory() as td:
+            cache = ResponseCache(os.path.join(td, "cache"))
+            cache.put(designer_url("Chanel"), status=200, content=listing.encode(), encoding="utf-8")
+            for url in perfumes:
+                cache.put(url, status=200, content=page, encoding="utf-8")
+
+            db = os.path.join(td, "workers.sqlite3")
+            args = build_parser().parse_args([
+                "worker", "--queue", os.path.join(td, "q.sqlite3"), "--db", db, "--replay",
+                "--cache-dir", os.path.join(td, "cache"), "--no-id-index", "--proxies-file", "none.txt",
+                "--max-attempts", "1",
+            ])
+            queue = SQLiteWorkQueue(args.queue)
+            enqueue(queue, ["Chanel"])
+            worker = CrawlWorker(args, queue)
+            self.assertEqual(worker.run(), 3)
+            worker.close()
+            # Page 2 of the listing was queued and missed in replay
+            self.assertEqual(queue.counts(), {"queued": 0, "leased": 0, "done": 4, "failed": 1})
+            queue.close()
+
+            store = SQLiteStore(db)
+            self.assertEqual(store.urls(), set(perfumes))
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()